@@ -5,6 +5,8 @@ from sqlalchemy import pool
 
 from alembic import context
 from app.models.user_model import Base  # adjust "myapp.models" to the actual location of your Base
+import app.models.email_outbox_model  # registers the email_outbox table on Base.metadata
+import app.models.notification_job_model  # registers the notification_jobs table on Base.metadata
 
 
 # this is the Alembic Config object, which provides
@@ -0,0 +1,47 @@
+"""add notification jobs
+
+Revision ID: b84e0d6c1f52
+Revises: 7c1f4b2a9d3e
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b84e0d6c1f52'
+down_revision: Union[str, None] = '7c1f4b2a9d3e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('notification_jobs',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('email_type', sa.String(length=50), nullable=False),
+    sa.Column('filters', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+    sa.Column('context', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+    sa.Column('requested_by', sa.String(length=255), nullable=True),
+    sa.Column('status', sa.Enum('QUEUED', 'RUNNING', 'INTERRUPTED', 'COMPLETED', 'FAILED', name='NotificationJobStatus', create_constraint=True), nullable=False),
+    sa.Column('total', sa.Integer(), nullable=False),
+    sa.Column('sent', sa.Integer(), nullable=False),
+    sa.Column('failed', sa.Integer(), nullable=False),
+    sa.Column('last_error', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('started_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('finished_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('cursor', sa.UUID(), nullable=True),
+    sa.Column('leased_until', sa.DateTime(timezone=True), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_notification_jobs_status_created_at', 'notification_jobs', ['status', 'created_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_notification_jobs_status_created_at', table_name='notification_jobs')
+    op.drop_table('notification_jobs')
+    sa.Enum(name='NotificationJobStatus').drop(op.get_bind(), checkfirst=True)
@@ -1,3 +1,6 @@
+import contextlib
+
+from sqlalchemy import text
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import declarative_base, sessionmaker
 
@@ -9,17 +12,55 @@ class Database:
     _session_factory = None
 
     @classmethod
-    def initialize(cls, database_url: str, echo: bool = False):
-        """Initialize the async engine and sessionmaker."""
+    def initialize(cls, database_url: str, echo: bool = False, slow_query_recorder=None,
+                   pool_size: int = 5, max_overflow: int = 10):
+        """Initialize the async engine and sessionmaker, optionally recording slow queries on the engine."""
         if cls._engine is None:  # Ensure engine is created once
-            cls._engine = create_async_engine(database_url, echo=echo, future=True)
+            cls._engine = create_async_engine(
+                database_url, echo=echo, future=True, pool_size=pool_size, max_overflow=max_overflow
+            )
+            if slow_query_recorder is not None:
+                slow_query_recorder.install(cls._engine)
             cls._session_factory = sessionmaker(
                 bind=cls._engine, class_=AsyncSession, expire_on_commit=False, future=True
             )
 
+    @classmethod
+    def get_engine(cls):
+        """Returns the engine, or None before `initialize()`."""
+        return cls._engine
+
     @classmethod
     def get_session_factory(cls):
         """Returns the session factory, ensuring it's initialized."""
         if cls._session_factory is None:
             raise ValueError("Database not initialized. Call `initialize()` first.")
         return cls._session_factory
+
+    @classmethod
+    async def warm_up(cls, connections: int, prepare=None):
+        """
+        Open `connections` pooled connections at once, check each with ``SELECT 1`` and run
+        `prepare(session)` on it, then return them to the pool. Statements prepared there
+        stay cached on the connection, so the first requests skip both connection setup
+        and statement preparation. Raises if the database can't be reached.
+        """
+        engine = cls._engine
+        if engine is None:
+            raise ValueError("Database not initialized. Call `initialize()` first.")
+        async with contextlib.AsyncExitStack() as stack:
+            # Held together, so the pool really has this many connections open afterwards
+            opened = [await stack.enter_async_context(engine.connect()) for _ in range(connections)]
+            for conn in opened:
+                await conn.execute(text("SELECT 1"))
+                if prepare is not None:
+                    async with AsyncSession(bind=conn, expire_on_commit=False) as session:
+                        await prepare(session)
+
+    @classmethod
+    async def dispose(cls):
+        """Close every pooled connection and forget the engine; `initialize()` creates a new one."""
+        if cls._engine is not None:
+            await cls._engine.dispose()
+        cls._engine = None
+        cls._session_factory = None
@@ -3,19 +3,19 @@ from fastapi import Depends, HTTPException
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.database import Database
-from app.utils.template_manager import TemplateManager
+from app.services.container import container
 from app.services.email_service import EmailService
 from app.services.jwt_service import decode_token
 from settings.config import Settings
 from fastapi import Depends
 
 def get_settings() -> Settings:
-    """Return application settings."""
-    return Settings()
+    """Return application settings, shared by the whole worker."""
+    return container.settings
 
 def get_email_service() -> EmailService:
-    template_manager = TemplateManager()
-    return EmailService(template_manager=template_manager)
+    """Return the worker's email service; it is built once, not per request."""
+    return container.email_service
 
 async def get_db() -> AsyncSession:
     """Dependency that provides a database session for each request."""
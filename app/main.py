@@ -1,11 +1,88 @@
-from builtins import Exception
+from builtins import Exception, OSError, bool, getattr, min
+import asyncio
+import logging
+import signal
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from sqlalchemy.exc import SQLAlchemyError
 from starlette.responses import JSONResponse
 from starlette.middleware.cors import CORSMiddleware  # Import the CORSMiddleware
 from app.database import Database
 from app.dependencies import get_settings
-from app.routers import user_routes
+from app.services.container import container
+from app.services.user_service import UserService
+from app.routers import admin_routes, health_routes, metrics_routes, notification_routes, user_routes
+from app.utils.admission import AdmissionControlMiddleware
 from app.utils.api_description import getDescription
+from app.utils.common import setup_logging, stop_logging
+from app.utils.compression import CompressionMiddleware
+from app.utils.lifecycle import InFlightMiddleware
+from app.utils.metrics import MULTIPROCESS_DIR, MetricsMiddleware
+from app.utils.server_timing import ServerTimingMiddleware, install_sql_instrumentation
+from app.utils.structured_logging import RequestIdMiddleware
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+
+async def warm_up_database() -> bool:
+    """Open and warm the minimum pool; the worker reports ready once this succeeds."""
+    connections = min(settings.db_warmup_connections, settings.db_pool_size)
+    try:
+        await Database.warm_up(connections, prepare=UserService.warm_up)
+    except (OSError, asyncio.TimeoutError, SQLAlchemyError) as e:
+        logger.warning("Database warm-up failed: %s", e)
+        return False
+    # Unless a stop signal arrived while warming up
+    if not container.server_state.draining:
+        container.server_state.ready = True
+    logger.info("Warmed up %d database connections", connections)
+    return True
+
+
+async def retry_warm_up():
+    while not await warm_up_database():
+        await asyncio.sleep(settings.db_warmup_retry_interval)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    setup_logging()
+    slow_queries = container.slow_query_recorder if settings.slow_query_log_enabled else None
+    Database.initialize(settings.database_url, settings.debug, slow_query_recorder=slow_queries,
+                        pool_size=settings.db_pool_size, max_overflow=settings.db_max_overflow)
+    container.startup()
+    if settings.loop_monitor_enabled:
+        container.start_loop_monitor()
+    if settings.email_outbox_enabled:
+        container.start_outbox_dispatcher(Database.get_session_factory())
+    if settings.bulk_notification_enabled:
+        container.start_notification_dispatcher(Database.get_session_factory())
+    user_routes.static_pages.load_all()
+    # `kill -HUP <pid>` re-reads .env and rebuilds the shared services
+    sighup = getattr(signal, "SIGHUP", None)
+    if sighup is not None:
+        asyncio.get_running_loop().add_signal_handler(sighup, container.reload)
+    gauges = None
+    if settings.metrics_enabled and MULTIPROCESS_DIR:
+        gauges = asyncio.create_task(metrics_routes.refresh_resource_gauges(settings.metrics_gauge_interval))
+    # If the database is down the worker still starts, not ready, and keeps trying in the background
+    retry = None if await warm_up_database() else asyncio.create_task(retry_warm_up())
+    yield
+    state = container.server_state
+    state.begin_drain()
+    for task in (retry, gauges):
+        if task is not None:
+            task.cancel()
+    # uvicorn has already waited for open requests by now, so this returns at once under
+    # it; the wait is for ASGI servers that run the lifespan shutdown before draining
+    if not await state.wait_idle(settings.shutdown_drain_timeout):
+        logger.warning("Shutting down with %d requests still in flight", state.in_flight)
+    await container.shutdown()
+    await Database.dispose()
+    stop_logging()
+
+
 app = FastAPI(
     title="User Management",
     description=getDescription(),
@@ -16,6 +93,7 @@ app = FastAPI(
         "email": "support@example.com",
     },
     license_info={"name": "MIT", "url": "https://opensource.org/licenses/MIT"},
+    lifespan=lifespan,
 )
 # CORS middleware configuration
 # This middleware will enable CORS and allow requests from any origin
@@ -27,16 +105,45 @@ app.add_middleware(
     allow_methods=["*"],  # Allowed HTTP methods
     allow_headers=["*"],  # Allowed HTTP headers
 )
-
-@app.on_event("startup")
-async def startup_event():
-    settings = get_settings()
-    Database.initialize(settings.database_url, settings.debug)
+# Compress JSON and HTML responses above the configured size with brotli or gzip
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.compression_minimum_size,
+    gzip_level=settings.compression_gzip_level,
+    brotli_quality=settings.compression_brotli_quality,
+)
+# Per-request SQL counts and phase timings, reported in a Server-Timing header
+if settings.server_timing_enabled:
+    install_sql_instrumentation()
+    app.add_middleware(
+        ServerTimingMiddleware,
+        query_warning_threshold=settings.sql_query_warning_threshold,
+        repeated_statement_threshold=settings.sql_repeated_statement_threshold,
+    )
+# Request ids for log records, also returned in the X-Request-ID header
+app.add_middleware(RequestIdMiddleware)
+# Bounded concurrency per route class; the excess gets a fast 503 instead of a slow timeout
+if settings.admission_control_enabled:
+    app.add_middleware(
+        AdmissionControlMiddleware,
+        limits=container.admission_limits,
+        retry_after=settings.admission_retry_after,
+    )
+# Wraps the rest of the stack so it times the whole request
+if settings.metrics_enabled:
+    app.add_middleware(MetricsMiddleware)
+# Added last so it is the outermost middleware: shutdown waits for every request it has let in
+app.add_middleware(InFlightMiddleware, state=container.server_state)
 
 @app.exception_handler(Exception)
 async def exception_handler(request, exc):
     return JSONResponse(status_code=500, content={"message": "An unexpected error occurred."})
 
 app.include_router(user_routes.router)
+app.include_router(notification_routes.router)
+app.include_router(admin_routes.router)
+app.include_router(health_routes.router)
+if settings.metrics_enabled:
+    app.include_router(metrics_routes.router)
 
 
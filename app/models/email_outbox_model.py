@@ -0,0 +1,51 @@
+from builtins import int, str
+from datetime import datetime
+from enum import Enum
+import uuid
+from sqlalchemy import Column, Index, String, Integer, DateTime, Text, func, Enum as SQLAlchemyEnum
+from sqlalchemy.dialects.postgresql import UUID, JSONB
+from sqlalchemy.orm import Mapped, mapped_column
+from app.database import Base
+
+class OutboxStatus(Enum):
+    """Delivery state of a queued email."""
+    PENDING = "PENDING"
+    SENT = "SENT"
+    FAILED = "FAILED"
+
+class EmailOutbox(Base):
+    """
+    An email waiting to be sent, written in the same transaction as the change that triggers it.
+
+    The dispatcher in app.services.outbox_service claims due rows with SKIP LOCKED, sends them
+    and records the outcome, so request handling never waits on the mail server.
+
+    Attributes:
+        id (UUID): Unique identifier for the message.
+        email_type (str): Template / subject key understood by EmailService.send_user_email.
+        recipient (str): Address the email goes to.
+        payload (dict): Template context, including the recipient under "email".
+        status (OutboxStatus): PENDING until delivered (SENT) or out of attempts (FAILED).
+        attempts (int): Number of delivery attempts so far.
+        next_attempt_at (datetime): Earliest time the message may be claimed again.
+        last_error (str): Error from the most recent failed attempt.
+        created_at (datetime): When the message was queued.
+        sent_at (datetime): When the message was delivered.
+    """
+    __tablename__ = "email_outbox"
+    # The dispatcher looks up due messages by status and next_attempt_at
+    __table_args__ = (Index("ix_email_outbox_status_next_attempt_at", "status", "next_attempt_at"),)
+
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    email_type: Mapped[str] = Column(String(50), nullable=False)
+    recipient: Mapped[str] = Column(String(255), nullable=False)
+    payload: Mapped[dict] = Column(JSONB, nullable=False)
+    status: Mapped[OutboxStatus] = Column(SQLAlchemyEnum(OutboxStatus, name='OutboxStatus', create_constraint=True), nullable=False, default=OutboxStatus.PENDING)
+    attempts: Mapped[int] = Column(Integer, nullable=False, default=0)
+    next_attempt_at: Mapped[datetime] = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    last_error: Mapped[str] = Column(Text, nullable=True)
+    created_at: Mapped[datetime] = Column(DateTime(timezone=True), server_default=func.now())
+    sent_at: Mapped[datetime] = Column(DateTime(timezone=True), nullable=True)
+
+    def __repr__(self) -> str:
+        return f"<EmailOutbox {self.email_type} to {self.recipient}, Status: {self.status.name}>"
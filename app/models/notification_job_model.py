@@ -0,0 +1,63 @@
+from builtins import int, str
+from datetime import datetime
+from enum import Enum
+import uuid
+from sqlalchemy import Column, Index, String, Integer, DateTime, Text, func, Enum as SQLAlchemyEnum
+from sqlalchemy.dialects.postgresql import UUID, JSONB
+from sqlalchemy.orm import Mapped, mapped_column
+from app.database import Base
+
+class NotificationJobStatus(Enum):
+    """Lifecycle of a bulk notification job."""
+    QUEUED = "QUEUED"
+    RUNNING = "RUNNING"
+    INTERRUPTED = "INTERRUPTED"
+    COMPLETED = "COMPLETED"
+    FAILED = "FAILED"
+
+class NotificationJob(Base):
+    """
+    A bulk email sent to every user matching a filter, with its progress.
+
+    Attributes:
+        id (UUID): Unique identifier for the job.
+        email_type (str): Template / subject key understood by EmailService.send_user_email.
+        filters (dict): Recipient filter, see RecipientFilter.
+        context (dict): Template values shared by every recipient, e.g. the announcement message.
+        requested_by (str): Subject of the token that created the job.
+        status (NotificationJobStatus): QUEUED, RUNNING, then COMPLETED or FAILED; INTERRUPTED
+            when a worker shut down while sending, until a dispatcher resumes it.
+        total (int): Number of matching recipients when the job was created.
+        sent (int): Emails delivered so far.
+        failed (int): Emails that could not be delivered.
+        last_error (str): Most recent delivery or job error.
+        cursor (UUID): Id of the last recipient, in id order, whose email is settled and counted;
+            a resumed job continues after it.
+        leased_until (datetime): While RUNNING, when the dispatcher's claim runs out. A RUNNING
+            job past its lease belongs to a worker that died and may be claimed again.
+        created_at (datetime): When the job was created.
+        started_at (datetime): When sending started.
+        finished_at (datetime): When the job completed or failed.
+    """
+    __tablename__ = "notification_jobs"
+    # The dispatcher looks up claimable jobs by status
+    __table_args__ = (Index("ix_notification_jobs_status_created_at", "status", "created_at"),)
+
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    email_type: Mapped[str] = Column(String(50), nullable=False)
+    filters: Mapped[dict] = Column(JSONB, nullable=False, default=dict)
+    context: Mapped[dict] = Column(JSONB, nullable=False, default=dict)
+    requested_by: Mapped[str] = Column(String(255), nullable=True)
+    status: Mapped[NotificationJobStatus] = Column(SQLAlchemyEnum(NotificationJobStatus, name='NotificationJobStatus', create_constraint=True), nullable=False, default=NotificationJobStatus.QUEUED)
+    total: Mapped[int] = Column(Integer, nullable=False, default=0)
+    sent: Mapped[int] = Column(Integer, nullable=False, default=0)
+    failed: Mapped[int] = Column(Integer, nullable=False, default=0)
+    last_error: Mapped[str] = Column(Text, nullable=True)
+    cursor: Mapped[uuid.UUID] = Column(UUID(as_uuid=True), nullable=True)
+    leased_until: Mapped[datetime] = Column(DateTime(timezone=True), nullable=True)
+    created_at: Mapped[datetime] = Column(DateTime(timezone=True), server_default=func.now())
+    started_at: Mapped[datetime] = Column(DateTime(timezone=True), nullable=True)
+    finished_at: Mapped[datetime] = Column(DateTime(timezone=True), nullable=True)
+
+    def __repr__(self) -> str:
+        return f"<NotificationJob {self.email_type}, Status: {self.status.name}, {self.sent}/{self.total} sent>"
@@ -0,0 +1,77 @@
+"""
+Diagnostics for administrators. The data is per worker: each process answers with what it
+has recorded itself, and says which process it is (`worker_pid`, or the X-Worker-PID header
+of a profile). Behind `python -m app.serve` successive requests may reach different workers.
+"""
+
+from builtins import bool, dict, float, int, min, str
+import os
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import PlainTextResponse
+from app.dependencies import get_settings, require_role
+from app.schemas.admin_schemas import LoopBlockEntry, LoopBlockListResponse, SlowQueryEntry, SlowQueryListResponse
+from app.services.container import container
+from app.utils.sampling_profiler import profile_worker
+
+router = APIRouter(prefix="/admin", tags=["Diagnostics Requires (Admin Role)"])
+settings = get_settings()
+
+
+@router.get("/slow-queries", response_model=SlowQueryListResponse, name="list_slow_queries")
+async def list_slow_queries(current_user: dict = Depends(require_role(["ADMIN"]))):
+    """Statements that exceeded the slow-query threshold, newest first, with their plans when captured."""
+    recorder = container.slow_query_recorder
+    items = [
+        SlowQueryEntry(statement=entry.statement, parameters=entry.parameters, duration_ms=entry.duration * 1000,
+                       occurred_at=entry.occurred_at, explain=entry.explain)
+        for entry in recorder.recent()
+    ]
+    return SlowQueryListResponse(worker_pid=os.getpid(), threshold_ms=recorder.threshold * 1000, items=items)
+
+
+@router.delete("/slow-queries", status_code=status.HTTP_204_NO_CONTENT, name="clear_slow_queries")
+async def clear_slow_queries(current_user: dict = Depends(require_role(["ADMIN"]))):
+    container.slow_query_recorder.clear()
+
+
+@router.get("/loop-blocks", response_model=LoopBlockListResponse, name="list_loop_blocks")
+async def list_loop_blocks(current_user: dict = Depends(require_role(["ADMIN"]))):
+    """Times the event loop was blocked by synchronous code, newest first, with the stack that blocked it."""
+    monitor = container.loop_monitor
+    items = [
+        LoopBlockEntry(duration_ms=entry.duration * 1000, task=entry.task, stack=entry.stack, occurred_at=entry.occurred_at)
+        for entry in monitor.recent()
+    ]
+    return LoopBlockListResponse(worker_pid=os.getpid(), threshold_ms=monitor.threshold * 1000, last_lag_ms=monitor.last_lag * 1000,
+                                 max_lag_ms=monitor.max_lag * 1000, blocked_total=monitor.blocked_count, items=items)
+
+
+@router.delete("/loop-blocks", status_code=status.HTTP_204_NO_CONTENT, name="clear_loop_blocks")
+async def clear_loop_blocks(current_user: dict = Depends(require_role(["ADMIN"]))):
+    container.loop_monitor.clear()
+
+
+@router.get("/profile", response_class=PlainTextResponse, name="profile_worker")
+async def profile(seconds: float = Query(5.0, gt=0, description="How long to sample; capped at profiler_max_seconds."),
+                  interval_ms: int = Query(10, ge=1, le=1000, description="Time between samples."),
+                  include_idle: bool = Query(False, description="Keep samples of threads and the event loop while they wait."),
+                  current_user: dict = Depends(require_role(["ADMIN"]))):
+    """
+    Sample the stacks of the worker that serves this request and return them collapsed,
+    one "frame;frame;frame count" line per stack, for flamegraph.pl or speedscope.
+
+    Event loop stacks are rooted at the running task's coroutine. Sampling slows down on
+    its own if it costs more than profiler_max_overhead of the run.
+    """
+    duration = min(seconds, settings.profiler_max_seconds)
+    sampler = await profile_worker(duration, interval_ms / 1000, settings.profiler_max_overhead, include_idle)
+    if sampler is None:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="A profile is already running on this worker")
+    headers = {
+        "X-Worker-PID": str(os.getpid()),
+        "X-Profile-Samples": str(sampler.samples),
+        "X-Profile-Seconds": f"{sampler.elapsed:.2f}",
+        "X-Profile-Overhead": f"{sampler.overhead / sampler.elapsed:.4f}" if sampler.elapsed else "0",
+        "X-Profile-Interval-Ms": f"{sampler.interval * 1000:g}",
+    }
+    return PlainTextResponse(sampler.collapsed(), headers=headers)
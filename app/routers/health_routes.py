@@ -0,0 +1,25 @@
+"""
+Probe endpoints for Docker, nginx and orchestrators.
+
+``/healthz`` answers as long as the worker's event loop runs and does no I/O; use it for
+liveness. ``/readyz`` answers 503 until startup has warmed the database pool, once
+shutdown has begun, and while the database or the password hashing pool can't keep up;
+use it to decide whether the worker gets traffic. See ReadinessChecker for the checks.
+"""
+
+from fastapi import APIRouter
+from starlette.responses import JSONResponse
+from app.services.container import container
+
+router = APIRouter()
+
+
+@router.get("/healthz", include_in_schema=False)
+async def healthz():
+    return JSONResponse({"status": "ok"})
+
+
+@router.get("/readyz", include_in_schema=False)
+async def readyz():
+    ready, body = await container.readiness.check()
+    return JSONResponse(body, status_code=200 if ready else 503, headers={"Cache-Control": "no-store"})
@@ -0,0 +1,55 @@
+"""
+Prometheus scrape endpoint.
+
+Request metrics are recorded by MetricsMiddleware as requests are served; the resource
+gauges (database pool, bcrypt pool, SMTP pool, email outbox) are sampled here on each scrape.
+Under `python -m app.serve` a scrape reaches only one worker, so every worker also refreshes
+its own pool gauges on a timer (`refresh_resource_gauges`) and the scrape reports all of them.
+"""
+
+from builtins import Exception, float, max
+import asyncio
+import logging
+from fastapi import APIRouter, Depends, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import Database
+from app.dependencies import get_db
+from app.services.container import container
+from app.services.outbox_service import outbox_backlog
+from app.utils import metrics
+from app.utils.security import bcrypt_pool
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+
+
+def sample_resource_gauges():
+    engine = Database.get_engine()
+    if engine is not None:
+        pool = engine.pool
+        metrics.DB_POOL_SIZE.set(pool.size())
+        metrics.DB_POOL_CHECKED_OUT.set(pool.checkedout())
+        metrics.DB_POOL_OVERFLOW.set(max(pool.overflow(), 0))
+    metrics.BCRYPT_POOL_WORKERS.set(bcrypt_pool.max_workers)
+    metrics.BCRYPT_POOL_ACTIVE.set(bcrypt_pool.active)
+    metrics.BCRYPT_POOL_QUEUED.set(bcrypt_pool.pending - bcrypt_pool.active)
+    smtp_client = container.email_service.smtp_client
+    metrics.SMTP_CONNECTIONS_IN_USE.set(smtp_client.in_use)
+    metrics.SMTP_CONNECTIONS_IDLE.set(smtp_client.idle)
+
+
+async def refresh_resource_gauges(interval: float):
+    while True:
+        sample_resource_gauges()
+        await asyncio.sleep(interval)
+
+
+@router.get("/metrics", include_in_schema=False)
+async def get_metrics(db: AsyncSession = Depends(get_db)):
+    sample_resource_gauges()
+    try:
+        metrics.EMAIL_OUTBOX_PENDING.set(await outbox_backlog(db))
+    except Exception as e:  # still serve the other metrics while the database is unavailable
+        logger.warning("Could not count the email outbox backlog: %s", e)
+    body, content_type = metrics.render_metrics()
+    return Response(content=body, media_type=content_type)
@@ -0,0 +1,46 @@
+"""
+Admin endpoints for sending one email to a cohort of users, such as everyone with a given
+role, and for following the progress of those sends.
+
+A bulk notification is created as a job and answered with 202 right away; a worker's
+NotificationJobDispatcher claims the job and sends the emails outside the request, and
+the job resource reports how many went out.
+"""
+
+from builtins import dict, str
+from uuid import UUID
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.dependencies import get_db, require_role
+from app.schemas.notification_schemas import BulkNotificationRequest, NotificationJobResponse
+from app.services.container import container
+from app.services.notification_service import NotificationService
+
+router = APIRouter()
+
+
+@router.post("/notifications/bulk", response_model=NotificationJobResponse, status_code=status.HTTP_202_ACCEPTED, name="create_bulk_notification", tags=["Notifications Requires (Admin Role)"])
+async def create_bulk_notification(notification: BulkNotificationRequest, request: Request, response: Response,
+                                   db: AsyncSession = Depends(get_db), current_user: dict = Depends(require_role(["ADMIN"]))):
+    """
+    Email every user matching the filter.
+
+    The job is recorded as QUEUED with the number of matching recipients. A background
+    dispatcher picks it up and sends at `bulk_notification_rate` emails per second; a job
+    cut off by a restart is resumed where it stopped. Poll the URL in the Location header
+    for progress.
+    """
+    job = await NotificationService.create_job(db, notification, current_user["user_id"])
+    if container.notification_dispatcher is not None:
+        container.notification_dispatcher.wake()
+    response.headers["Location"] = str(request.url_for("get_bulk_notification", job_id=job.id))
+    return NotificationJobResponse.model_validate(job)
+
+
+@router.get("/notifications/bulk/{job_id}", response_model=NotificationJobResponse, name="get_bulk_notification", tags=["Notifications Requires (Admin Role)"])
+async def get_bulk_notification(job_id: UUID, db: AsyncSession = Depends(get_db), current_user: dict = Depends(require_role(["ADMIN"]))):
+    """Report the status and progress of a bulk notification job."""
+    job = await NotificationService.get_job(db, job_id)
+    if not job:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Notification job not found")
+    return NotificationJobResponse.model_validate(job)
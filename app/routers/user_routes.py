@@ -20,66 +20,74 @@ Key Highlights:
 
 from builtins import dict, int, len, str
 from datetime import timedelta
+from pathlib import Path
+from typing import List, Optional
 from uuid import UUID
-from fastapi import APIRouter, Depends, HTTPException, Response, status, Request
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status, Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import HTMLResponse, JSONResponse
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.dependencies import get_current_user, get_db, get_email_service, require_role
-from app.schemas.pagination_schema import EnhancedPagination
+from app.dependencies import get_current_user, get_db, get_email_service, get_settings, require_role
+from app.models.user_model import User
 from app.schemas.token_schema import TokenResponse
-from app.schemas.user_schemas import LoginRequest, UserBase, UserCreate, UserListResponse, UserResponse, UserUpdate
-from app.services.user_service import *
+from app.schemas.user_schemas import UserBatchItem, UserBatchRequest, UserBatchResponse, UserCreate, UserListResponse, UserResponse, UserUpdate
+from app.services.email_service import EmailService
 from app.services.jwt_service import create_access_token
+from app.services.user_service import UserService
 from app.utils.link_generation import create_user_links, generate_pagination_links
-from app.dependencies import get_settings
-from app.services.email_service import EmailService
-# 
-from fastapi.responses import HTMLResponse
-from fastapi import Depends, FastAPI, HTTPException
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
-from sqlalchemy.future import select
-from sqlalchemy.orm import sessionmaker
-
-# 
+from app.utils.serialization import ModelJSONResponse, user_response, user_responses
+from app.utils.static_pages import StaticPageCache
 
 router = APIRouter()
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="login")
 settings = get_settings()
-from app.models.user_model import User
 
-from fastapi import APIRouter, Depends, HTTPException
-from fastapi.responses import JSONResponse, FileResponse
-from sqlalchemy.ext.asyncio import AsyncSession
-from app.models.user_model import User  # Import the User model
-from app.services.user_service import UserService
-from app.schemas.user_schemas import UserCreate, UserUpdate
-from app.dependencies import get_db
+# HTML pages are read and compressed once, then served from memory
+static_pages = StaticPageCache(
+    Path(__file__).resolve().parent.parent / "templates",
+    cache_control=settings.static_pages_cache_control,
+    watch=settings.debug,
+)
 
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.ext.asyncio import AsyncSession
-from app.services.user_service import UserService
-from app.models.user_model import User
 
-router = APIRouter()
-
-
-@router.get("/loginpage/", response_class=FileResponse, tags=["Login and Registration"])
-async def get_login_page():
+@router.get("/loginpage/", response_class=HTMLResponse, tags=["Login and Registration"])
+async def get_login_page(request: Request):
     # Endpoint to serve the LOGIN PAGE
-    return "app/templates/login.html"
+    return static_pages.response(request, "login.html")
 
-@router.get("/", response_class=FileResponse, tags=["Login and Registration"])
-async def get_register_page():
+@router.get("/", response_class=HTMLResponse, tags=["Login and Registration"])
+async def get_register_page(request: Request):
     # Endpoint to serve the REGISTER PAGE
-    return "app/templates/register.html"
+    return static_pages.response(request, "register.html")
 
-@router.get("/profile/{user_id}", response_class=FileResponse, tags=["User Profile"])
+@router.get("/profile/{user_id}", response_class=HTMLResponse, tags=["User Profile"])
 async def get_user_profile_page(request: Request, user_id: str):
-    # Fetch user data from the database based on user_id
-    return "app/templates/index.html"
+    # The profile page is static; user data is filled in client side
+    return static_pages.response(request, "index.html")
+
+# Fields that can be requested with ?fields=, i.e. UserResponse fields backed by a users column
+SPARSE_FIELDS = [name for name in UserResponse.model_fields if name in User.__table__.columns]
+FIELDS_QUERY = Query(None, description=f"Comma separated subset of fields to return: {', '.join(SPARSE_FIELDS)}", examples=["nickname,bio"])
+
+def parse_fields(fields: Optional[str]) -> Optional[List[str]]:
+    """
+    Turn a ?fields= value into the list of columns to select, always including id.
+
+    Raises:
+        HTTPException: 400 if an unknown field is requested.
+    """
+    if not fields:
+        return None
+    requested = [field.strip() for field in fields.split(",") if field.strip()]
+    unknown = [field for field in requested if field not in SPARSE_FIELDS]
+    if unknown:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Unknown fields: {', '.join(unknown)}")
+    return ["id"] + [field for field in dict.fromkeys(requested) if field != "id"]
 
 @router.get("/users/{user_id}", response_model=UserResponse, name="get_user", tags=["User Management Requires (Admin or Manager Roles)"])
-async def get_user(user_id: UUID, request: Request, db: AsyncSession = Depends(get_db), token: str = Depends(oauth2_scheme), current_user: dict = Depends(require_role(["ADMIN", "MANAGER"]))):
+async def get_user(user_id: UUID, request: Request, fields: Optional[str] = FIELDS_QUERY, db: AsyncSession = Depends(get_db), token: str = Depends(oauth2_scheme), current_user: dict = Depends(require_role(["ADMIN", "MANAGER"]))):
     """
     Endpoint to fetch a user by their unique identifier (UUID).
 
@@ -89,9 +97,17 @@ async def get_user(user_id: UUID, request: Request, db: AsyncSession = Depends(g
     Args:
         user_id: UUID of the user to fetch.
         request: The request object, used to generate full URLs in the response.
+        fields: Optional comma separated list of fields; only those columns are queried and returned.
         db: Dependency that provides an AsyncSession for database access.
         token: The OAuth2 access token obtained through OAuth2PasswordBearer dependency.
     """
+    selected = parse_fields(fields)
+    if selected:
+        user_fields = await UserService.get_fields_by_id(db, user_id, selected)
+        if not user_fields:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+        return JSONResponse(content=jsonable_encoder(user_fields))
+
     user = await UserService.get_by_id(db, user_id)
     if not user:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
@@ -212,26 +228,64 @@ async def list_users(
     request: Request,
     skip: int = 0,
     limit: int = 10,
+    fields: Optional[str] = FIELDS_QUERY,
     db: AsyncSession = Depends(get_db),
     current_user: dict = Depends(require_role(["ADMIN", "MANAGER"]))
 ):
+    selected = parse_fields(fields)
     total_users = await UserService.count(db)
+    if selected:
+        # Sparse fieldset: only the requested columns are selected and serialized
+        user_fields = await UserService.list_user_fields(db, selected, skip, limit)
+        return JSONResponse(content=jsonable_encoder({
+            "items": user_fields,
+            "total": total_users,
+            "page": skip // limit + 1,
+            "size": len(user_fields),
+        }))
+
     users = await UserService.list_users(db, skip, limit)
 
-    user_responses = [
-        UserResponse.model_validate(user) for user in users
-    ]
+    items = user_responses(users)
     
     pagination_links = generate_pagination_links(request, skip, limit, total_users)
     
-    # Construct the final response with pagination details
-    return UserListResponse(
-        items=user_responses,
+    # Construct the final response with pagination details; rows come from our own
+    # database, so the models are built without validation and serialized in one pass
+    return ModelJSONResponse(UserListResponse.model_construct(
+        items=items,
         total=total_users,
         page=skip // limit + 1,
-        size=len(user_responses),
+        size=len(items),
         links=pagination_links  # Ensure you have appropriate logic to create these links
-    )
+    ))
+
+
+@router.post("/users/batch-get", response_model=UserBatchResponse, name="batch_get_users", tags=["User Management Requires (Admin or Manager Roles)"])
+async def batch_get_users(batch: UserBatchRequest, request: Request, db: AsyncSession = Depends(get_db), current_user: dict = Depends(require_role(["ADMIN"]))):
+    """
+    Resolve many users by id and/or email in one request.
+
+    All keys are looked up with a single query. The response has one item per requested id,
+    followed by one per requested email, in request order; keys that match no user are
+    returned with `found: false`.
+    """
+    if len(batch.ids) + len(batch.emails) > settings.batch_get_max_items:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"At most {settings.batch_get_max_items} ids and emails per request")
+
+    users = await UserService.get_many(db, batch.ids, batch.emails)
+    by_id = {user.id: user for user in users}
+    by_email = {user.email: user for user in users}
+    matches = [(str(user_id), by_id.get(user_id)) for user_id in batch.ids]
+    matches += [(email, by_email.get(email)) for email in batch.emails]
+
+    items = []
+    for key, user in matches:
+        if user is None:
+            items.append(UserBatchItem.model_construct(key=key, found=False, user=None))
+        else:
+            items.append(UserBatchItem.model_construct(key=key, found=True, user=user_response(user)))
+    return ModelJSONResponse(UserBatchResponse.model_construct(items=items))
 
 
 @router.post("/register/", response_model=UserResponse, tags=["Login and Registration"])
@@ -258,23 +312,6 @@ async def login(form_data: OAuth2PasswordRequestForm = Depends(), session: Async
         return {"access_token": access_token, "token_type": "bearer"}
     raise HTTPException(status_code=401, detail="Incorrect email or password.")
 
-@router.post("/login/", include_in_schema=False, response_model=TokenResponse, tags=["Login and Registration"])
-async def login(form_data: OAuth2PasswordRequestForm = Depends(), session: AsyncSession = Depends(get_db)):
-    if await UserService.is_account_locked(session, form_data.username):
-        raise HTTPException(status_code=400, detail="Account locked due to too many failed login attempts.")
-
-    user = await UserService.login_user(session, form_data.username, form_data.password)
-    if user:
-        access_token_expires = timedelta(minutes=settings.access_token_expire_minutes)
-
-        access_token = create_access_token(
-            data={"sub": user.email, "role": str(user.role.name)},
-            expires_delta=access_token_expires
-        )
-
-        return {"access_token": access_token, "token_type": "bearer"}
-    raise HTTPException(status_code=401, detail="Incorrect email or password.")
-
 
 @router.get("/verify-email/{user_id}/{token}", status_code=status.HTTP_200_OK, name="verify_email", tags=["Login and Registration"])
 async def verify_email(user_id: UUID, token: str, db: AsyncSession = Depends(get_db), email_service: EmailService = Depends(get_email_service)):
@@ -372,7 +409,7 @@ async def update_github_profile(user_id: UUID, github_profile_url: str, db: Asyn
 
 #professional update
 @router.put("/users/{user_id}/professional/", response_model=UserResponse, name="upgrade_to_professional", tags=["User Management Requires (Admin or Manager Roles)"])
-async def upgrade_to_professional(user_id: UUID, db: AsyncSession = Depends(get_db), email_service: EmailService = Depends(get_email_service), current_user: dict = Depends(require_role(["ADMIN", "MANAGER"]))):
+async def upgrade_to_professional(user_id: UUID, request: Request, db: AsyncSession = Depends(get_db), email_service: EmailService = Depends(get_email_service), current_user: dict = Depends(require_role(["ADMIN", "MANAGER"]))):
     """
     Upgrade a user to professional status.
 
@@ -383,21 +420,16 @@ async def upgrade_to_professional(user_id: UUID, db: AsyncSession = Depends(get_
         current_user (dict): The current authenticated user (must be an admin or manager).
 
     Returns:
-        UserResponse: The updated user details with the professional role.
+        UserResponse: The updated user details with professional status set.
 
     Raises:
         HTTPException: If the user is not found or the current user is not authorized.
     """
-    user = await UserService.get_by_id(db, user_id)
-    if not user:
+    # Sets the professional flag and queues the notification email in one transaction
+    updated_user = await UserService.upgrade_to_professional(db, user_id, email_service)
+    if not updated_user:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
 
-    # Update the user's role to 'PROFESSIONAL'
-    updated_user = await UserService.update(db, user_id, {"role": UserRole.PROFESSIONAL})
-
-    # Send notification email to the user
-    await send_professional_upgrade_notification(updated_user.email, str(updated_user.role), email_service)
-
     return UserResponse.model_construct(
         id=updated_user.id,
         nickname=updated_user.nickname,
@@ -408,11 +440,12 @@ async def upgrade_to_professional(user_id: UUID, db: AsyncSession = Depends(get_
         github_profile_url=updated_user.github_profile_url,
         linkedin_profile_url=updated_user.linkedin_profile_url,
         role=updated_user.role,
+        is_professional=updated_user.is_professional,
         email=updated_user.email,
         last_login_at=updated_user.last_login_at,
         created_at=updated_user.created_at,
         updated_at=updated_user.updated_at,
-        links=create_user_links(updated_user.id, Request)  # Assuming you have a function to create HATEOAS links
+        links=create_user_links(updated_user.id, request)  # Assuming you have a function to create HATEOAS links
     )
 
 
@@ -452,25 +485,6 @@ async def get_user_id(email: str, db: AsyncSession = Depends(get_db)):
         raise HTTPException(status_code=404, detail="User not found")
     return {"user_id": user_id}
 
-async def send_professional_upgrade_notification(user_email: str, new_role: str, email_service: EmailService):
-    """
-    Sends a notification email to the user when their professional status is upgraded.
-
-    Args:
-        user_email (str): The email address of the user.
-        new_role (str): The new role of the user (e.g., 'PROFESSIONAL').
-        email_service (EmailService): An instance of the EmailService.
-    """
-    subject = "Professional Status Upgrade Notification"
-    message = f"Hello,\n\nYour user account has been upgraded to {new_role}.\n\nThank you for using our platform."
-    
-    try:
-        await email_service.send_email(user_email, subject, message)
-    except Exception as e:
-        # Handle any exceptions that might occur during email sending
-        print(f"Failed to send email notification to {user_email}: {str(e)}")
-
-
 # Get user's nickname
 @router.get("/users/{user_id}/nickname", tags=["User Profile"])
 async def get_user_nickname(user_id: UUID, db: AsyncSession = Depends(get_db)):
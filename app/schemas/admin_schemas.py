@@ -0,0 +1,30 @@
+from builtins import float, int, str
+from datetime import datetime
+from typing import List, Optional
+from pydantic import BaseModel, Field
+
+class SlowQueryEntry(BaseModel):
+    statement: str = Field(..., example="SELECT users.id, users.email FROM users WHERE users.email = ?")
+    parameters: List[str] = Field(..., description="Types of the bound parameters, in order.", example=["str"])
+    duration_ms: float = Field(..., example=412.7)
+    occurred_at: datetime
+    explain: Optional[str] = Field(None, description="EXPLAIN (ANALYZE off) output, once captured.", example="Seq Scan on users  (cost=0.00..35.50 rows=10 width=1032)")
+
+class SlowQueryListResponse(BaseModel):
+    worker_pid: int = Field(..., description="Process that answered; each worker keeps its own buffer.", example=4182)
+    threshold_ms: float = Field(..., example=200.0)
+    items: List[SlowQueryEntry] = Field(..., description="Most recent first; the buffer keeps the last slow_query_buffer_size entries.")
+
+class LoopBlockEntry(BaseModel):
+    duration_ms: float = Field(..., example=812.4)
+    task: str = Field(..., description="The asyncio task that was running, or \"loop callbacks\".", example="task Task-42 (RequestResponseCycle.run_asgi)")
+    stack: str = Field(..., description="Stack of the event loop thread captured while it was blocked, innermost frame last.")
+    occurred_at: datetime
+
+class LoopBlockListResponse(BaseModel):
+    worker_pid: int = Field(..., description="Process that answered; each worker monitors its own event loop.", example=4182)
+    threshold_ms: float = Field(..., example=100.0)
+    last_lag_ms: float = Field(..., description="Lag measured by the latest probe.", example=0.3)
+    max_lag_ms: float = Field(..., description="Highest lag measured since the worker started.", example=812.4)
+    blocked_total: int = Field(..., description="Blocks detected since the worker started.", example=3)
+    items: List[LoopBlockEntry] = Field(..., description="Most recent first; the buffer keeps the last loop_monitor_buffer_size entries.")
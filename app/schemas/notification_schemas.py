@@ -0,0 +1,42 @@
+from builtins import bool, dict, int, str
+from datetime import datetime
+from typing import Literal, Optional
+import uuid
+from pydantic import BaseModel, Field, model_validator
+from app.models.notification_job_model import NotificationJobStatus
+from app.models.user_model import UserRole
+
+# Templates that only need the recipient's name plus shared values, so they can go to a cohort
+BULK_EMAIL_TYPES = ("announcement", "professional_upgrade")
+
+class RecipientFilter(BaseModel):
+    role: Optional[UserRole] = Field(None, example="AUTHENTICATED")
+    is_professional: Optional[bool] = Field(None, example=False)
+    email_verified: Optional[bool] = Field(None, example=True)
+
+class BulkNotificationRequest(BaseModel):
+    email_type: Literal[BULK_EMAIL_TYPES] = Field(..., example="announcement")
+    filter: RecipientFilter = Field(default_factory=RecipientFilter, description="Users matching every given field receive the email; locked accounts are skipped.")
+    message: Optional[str] = Field(None, max_length=5000, example="We will be down for maintenance on Saturday from 02:00 to 04:00 UTC.")
+
+    @model_validator(mode="after")
+    def check_message(self):
+        if self.email_type == "announcement" and not self.message:
+            raise ValueError("An announcement needs a message")
+        return self
+
+class NotificationJobResponse(BaseModel):
+    id: uuid.UUID = Field(..., example="8c1c1a5e-4e1d-4b8a-9d8e-2f6f1c2a3b4d")
+    email_type: str = Field(..., example="announcement")
+    filters: dict = Field(..., example={"role": "AUTHENTICATED"})
+    status: NotificationJobStatus = Field(..., example="RUNNING")
+    total: int = Field(..., example=1200)
+    sent: int = Field(..., example=450)
+    failed: int = Field(..., example=2)
+    last_error: Optional[str] = None
+    created_at: Optional[datetime] = None
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
@@ -6,7 +6,10 @@ from enum import Enum
 import uuid
 import re
 from app.models.user_model import UserRole
-from app.utils.nickname_gen import generate_nickname
+
+# Fixed values for the OpenAPI examples, so the generated schema is the same on every start
+EXAMPLE_USER_ID = uuid.UUID("123e4567-e89b-12d3-a456-426614174000")
+EXAMPLE_NICKNAME = "clever_panda_123"
 
 
 def validate_url(url: Optional[str]) -> Optional[str]:
@@ -19,7 +22,7 @@ def validate_url(url: Optional[str]) -> Optional[str]:
 
 class UserBase(BaseModel):
     email: EmailStr = Field(..., example="john.doe@example.com")
-    nickname: Optional[str] = Field(None, min_length=3, pattern=r'^[\w-]+$', example=generate_nickname())
+    nickname: Optional[str] = Field(None, min_length=3, pattern=r'^[\w-]+$', example=EXAMPLE_NICKNAME)
     first_name: Optional[str] = Field(None, example="John")
     last_name: Optional[str] = Field(None, example="Doe")
     bio: Optional[str] = Field(None, example="Experienced software developer specializing in web applications.")
@@ -55,9 +58,9 @@ class UserUpdate(UserBase):
         return values
 
 class UserResponse(UserBase):
-    id: uuid.UUID = Field(..., example=uuid.uuid4())
+    id: uuid.UUID = Field(..., example=EXAMPLE_USER_ID)
     email: EmailStr = Field(..., example="john.doe@example.com")
-    nickname: Optional[str] = Field(None, min_length=3, pattern=r'^[\w-]+$', example=generate_nickname())    
+    nickname: Optional[str] = Field(None, min_length=3, pattern=r'^[\w-]+$', example=EXAMPLE_NICKNAME)    
     is_professional: Optional[bool] = Field(default=False, example=True)
     role: UserRole
 
@@ -71,7 +74,7 @@ class ErrorResponse(BaseModel):
 
 class UserListResponse(BaseModel):
     items: List[UserResponse] = Field(..., example=[{
-        "id": uuid.uuid4(), "nickname": generate_nickname(), "email": "john.doe@example.com",
+        "id": EXAMPLE_USER_ID, "nickname": EXAMPLE_NICKNAME, "email": "john.doe@example.com",
         "first_name": "John", "bio": "Experienced developer", "role": "AUTHENTICATED",
         "last_name": "Doe", "bio": "Experienced developer", "role": "AUTHENTICATED",
         "profile_picture_url": "https://example.com/profiles/john.jpg", 
@@ -81,3 +84,15 @@ class UserListResponse(BaseModel):
     total: int = Field(..., example=100)
     page: int = Field(..., example=1)
     size: int = Field(..., example=10)
+
+class UserBatchRequest(BaseModel):
+    ids: List[uuid.UUID] = Field(default_factory=list, example=[EXAMPLE_USER_ID])
+    emails: List[str] = Field(default_factory=list, example=["john.doe@example.com"])
+
+class UserBatchItem(BaseModel):
+    key: str = Field(..., description="The id or email as given in the request.", example="john.doe@example.com")
+    found: bool = Field(..., example=True)
+    user: Optional[UserResponse] = None
+
+class UserBatchResponse(BaseModel):
+    items: List[UserBatchItem] = Field(..., description="One entry per requested id, then per requested email, in request order.")
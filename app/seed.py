@@ -0,0 +1,176 @@
+"""
+Bulk seeder for staging and benchmark databases.
+
+Run with ``python -m app.seed --count 10000000``. Users are generated with realistic
+names, bios and profile links and written with ``COPY`` by ``--workers`` processes in
+parallel, each generating and loading its own batches on its own connection. Every user
+gets the same password (``--password``), hashed once, so seeding costs no bcrypt time.
+
+The data is deterministic: the same ``--seed`` and ``--start`` produce the same users,
+whatever the number of workers. Emails and nicknames end in the row's index, which keeps
+them unique; to add users to a seeded database, continue from the last index with
+``--start``.
+"""
+from builtins import int, max, min, print, range, sorted, str, sum
+import argparse
+import asyncio
+import multiprocessing
+import random
+import re
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+
+import asyncpg
+from faker import Faker
+from sqlalchemy.engine import make_url
+
+from app.models.user_model import UserRole
+from app.utils.security import hash_password
+from settings.config import settings
+
+COLUMNS = (
+    "id", "nickname", "email", "first_name", "last_name", "bio", "profile_picture_url",
+    "linkedin_profile_url", "github_profile_url", "role", "is_professional",
+    "professional_status_updated_at", "last_login_at", "failed_login_attempts", "is_locked",
+    "created_at", "updated_at", "verification_token", "email_verified", "hashed_password",
+)
+ROLES = [role.name for role in (UserRole.AUTHENTICATED, UserRole.MANAGER, UserRole.ADMIN, UserRole.ANONYMOUS)]
+ROLE_WEIGHTS = [0.95, 0.03, 0.005, 0.015]
+POOL_SIZE = 1000
+# Accounts are spread over this period before SEED_EPOCH, so reruns produce identical timestamps
+HISTORY_SECONDS = 3 * 365 * 24 * 3600
+SEED_EPOCH = datetime(2024, 1, 1, tzinfo=timezone.utc)
+_NAME_RE = re.compile(r"^[A-Za-z]+$")
+
+# Built once per worker process by `_init_worker`
+_pools: Dict[str, List[str]] = {}
+_password_hash = ""
+_dsn = ""
+
+
+def build_pools(seed: int) -> Dict[str, List[str]]:
+    """Names, words, bios and domains to draw users from; Faker is too slow to call per row."""
+    fake = Faker("en_US")
+    fake.seed_instance(seed)
+
+    def unique(make, keep=lambda value: True) -> List[str]:
+        values = {value for value in (make() for _ in range(POOL_SIZE * 3)) if keep(value)}
+        return sorted(values)[:POOL_SIZE]
+
+    return {
+        "first_names": unique(fake.first_name, _NAME_RE.match),
+        "last_names": unique(fake.last_name, _NAME_RE.match),
+        "words": unique(lambda: fake.word().lower(), _NAME_RE.match),
+        "bios": unique(lambda: fake.sentence(nb_words=12)[:500]),
+        "domains": unique(fake.free_email_domain),
+    }
+
+
+def generate_batch(pools: Dict[str, List[str]], password_hash: str, seed: int, start: int, size: int) -> List[Tuple]:
+    """Rows `start` to `start + size - 1`, as tuples in COLUMNS order."""
+    rng = random.Random(f"{seed}:{start}")
+    first_names, last_names, words = pools["first_names"], pools["last_names"], pools["words"]
+    bios, domains = pools["bios"], pools["domains"]
+    roles = rng.choices(ROLES, ROLE_WEIGHTS, k=size)
+    rows = []
+    for offset in range(size):
+        index = start + offset
+        first, last = rng.choice(first_names), rng.choice(last_names)
+        handle = f"{first.lower()}{last.lower()}{index}"
+        created_at = SEED_EPOCH - timedelta(seconds=rng.randrange(HISTORY_SECONDS))
+        is_professional = rng.random() < 0.1
+        rows.append((
+            uuid.UUID(int=rng.getrandbits(128), version=4),
+            f"{rng.choice(words)}_{last.lower()}_{index}",
+            f"{first.lower()}.{last.lower()}{index}@{rng.choice(domains)}",
+            first,
+            last,
+            rng.choice(bios) if rng.random() < 0.7 else None,
+            f"https://example.com/profiles/{handle}.jpg" if rng.random() < 0.5 else None,
+            f"https://linkedin.com/in/{handle}" if rng.random() < 0.4 else None,
+            f"https://github.com/{handle}" if rng.random() < 0.3 else None,
+            roles[offset],
+            is_professional,
+            created_at + timedelta(days=rng.randrange(1, 365)) if is_professional else None,
+            created_at + timedelta(seconds=rng.randrange(HISTORY_SECONDS)) if rng.random() < 0.8 else None,
+            0,
+            False,
+            created_at,
+            created_at,
+            None,
+            rng.random() < 0.9,
+            password_hash,
+        ))
+    return rows
+
+
+def asyncpg_dsn(database_url: str) -> str:
+    """The SQLAlchemy URL from settings as a DSN asyncpg accepts."""
+    return make_url(database_url).set(drivername="postgresql").render_as_string(hide_password=False)
+
+
+async def copy_rows(dsn: str, rows: List[Tuple]):
+    connection = await asyncpg.connect(dsn)
+    try:
+        # Losing the last batches in a crash is fine for generated data; waiting for each flush is not
+        await connection.execute("SET synchronous_commit TO off")
+        await connection.copy_records_to_table("users", records=rows, columns=COLUMNS)
+    finally:
+        await connection.close()
+
+
+def _init_worker(dsn: str, seed: int, password_hash: str):
+    global _dsn, _pools, _password_hash
+    _dsn, _pools, _password_hash = dsn, build_pools(seed), password_hash
+
+
+def _load_batch(seed: int, start: int, size: int) -> int:
+    asyncio.run(copy_rows(_dsn, generate_batch(_pools, _password_hash, seed, start, size)))
+    return size
+
+
+def seed_users(database_url: str, count: int, seed: int = 0, start: int = 0, workers: int = 4,
+               batch_size: int = 50_000, password: str = "Seeded*Pass123", progress: bool = False) -> int:
+    """Insert `count` generated users; returns the number inserted. Call it outside an event loop."""
+    dsn = asyncpg_dsn(database_url)
+    password_hash = hash_password(password)
+    batches = [(seed, batch_start, min(batch_size, start + count - batch_start))
+               for batch_start in range(start, start + count, batch_size)]
+    began = time.perf_counter()
+    if workers <= 1:
+        _init_worker(dsn, seed, password_hash)
+        return sum(_load_batch(*batch) for batch in batches)
+    done = 0
+    # spawn: forking a process that holds connections and threads is not safe
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=_init_worker,
+                             initargs=(dsn, seed, password_hash)) as pool:
+        for future in as_completed([pool.submit(_load_batch, *batch) for batch in batches]):
+            done += future.result()
+            if progress:
+                elapsed = time.perf_counter() - began
+                print(f"{done:,}/{count:,} users, {done / max(elapsed, 1e-9):,.0f} per second")
+    return done
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--count", type=int, required=True, help="Number of users to insert")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the generated data")
+    parser.add_argument("--start", type=int, default=0, help="Index of the first user, to add to an already seeded database")
+    parser.add_argument("--workers", type=int, default=multiprocessing.cpu_count(), help="Processes generating and copying batches")
+    parser.add_argument("--batch-size", type=int, default=50_000, help="Users per COPY")
+    parser.add_argument("--password", default="Seeded*Pass123", help="Password of every seeded user")
+    parser.add_argument("--database-url", default=settings.database_url, help="Defaults to DATABASE_URL")
+    args = parser.parse_args(argv)
+    began = time.perf_counter()
+    inserted = seed_users(args.database_url, args.count, args.seed, args.start, args.workers, args.batch_size, args.password, progress=True)
+    elapsed = time.perf_counter() - began
+    print(f"Inserted {inserted:,} users in {elapsed:.1f} s ({inserted / max(elapsed, 1e-9):,.0f} per second)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,239 @@
+"""
+Production server: ``python -m app.serve``.
+
+Runs the app under gunicorn with one uvicorn worker process per available CPU (or
+``--workers``). Defaults come from the "Server" settings.
+
+- The app is imported once in the master and forked into the workers (``--no-preload`` to
+  import it in each worker instead), so workers start faster and share memory.
+- uvloop and httptools are used when installed (``pip install uvloop httptools``);
+  ``--loop`` and ``--http`` pick an implementation explicitly.
+- SIGTERM drains: workers fail ``/readyz`` at once, stop accepting connections, finish
+  in-flight requests and run the shutdown handlers, all within ``--graceful-timeout``
+  seconds (see `shutdown_budget`).
+- Each worker is replaced after ``--max-requests`` requests, plus a random jitter of up
+  to ``--max-requests-jitter`` so they don't all restart at once.
+- Every worker logs how long it took to become ready, split into app import and startup.
+- Prometheus metrics are shared between the workers through files in
+  ``PROMETHEUS_MULTIPROC_DIR`` (a fresh temporary directory unless set), so ``/metrics``
+  on any worker reports the whole server. The ``/admin`` diagnostics stay per worker.
+
+For development, ``uvicorn app.main:app --reload`` still works.
+"""
+from builtins import float, int, len, max, min, open, str, type
+import argparse
+import asyncio
+import os
+import shutil
+import sys
+import tempfile
+import time
+from typing import Dict, List, Optional, Tuple
+
+from gunicorn.app.base import BaseApplication
+from gunicorn.arbiter import Arbiter
+from uvicorn.main import Server
+from uvicorn.workers import UvicornWorker
+
+from settings.config import settings
+
+
+def available_cpus() -> int:
+    """CPUs this process may use, honouring CPU affinity and a cgroup v2 quota (containers)."""
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+    try:
+        with open("/sys/fs/cgroup/cpu.max", encoding="utf-8") as file:
+            quota, period = file.read().split()
+        if quota != "max":
+            cpus = min(cpus, max(1, int(int(quota) / int(period))))
+    except (OSError, ValueError):
+        pass
+    return cpus
+
+
+# Seconds of gunicorn's graceful timeout kept for the app's shutdown handlers
+SHUTDOWN_RESERVE = 5.0
+
+
+def shutdown_budget(graceful_timeout: float) -> Tuple[float, float]:
+    """
+    Split gunicorn's graceful timeout between uvicorn and the app's lifespan shutdown.
+
+    Gunicorn kills a worker `graceful_timeout` seconds after asking it to stop. uvicorn
+    first waits for open connections, then runs the lifespan shutdown (the app's drain,
+    stopping the dispatchers, closing the SMTP and database pools); if uvicorn's wait took
+    the whole timeout, the kill would land in the middle of that. Returns uvicorn's
+    `timeout_graceful_shutdown` and the longest the app's drain may wait, which leaves as
+    much again for the rest of the shutdown.
+    """
+    reserve = min(SHUTDOWN_RESERVE, graceful_timeout / 2)
+    return graceful_timeout - reserve, reserve / 2
+
+
+def prepare_metrics_dir() -> str:
+    """
+    Point prometheus_client at an empty directory shared by all workers.
+
+    Must run before the app (and so prometheus_client's metrics) is imported: the client
+    picks its multiprocess value store when the first metric is created.
+    """
+    path = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+    if path:
+        os.makedirs(path, exist_ok=True)
+        # Samples left by an earlier run would be added to this one's
+        for name in os.listdir(path):
+            if name.endswith(".db"):
+                os.remove(os.path.join(path, name))
+    else:
+        path = tempfile.mkdtemp(prefix="prometheus-")
+    os.environ["PROMETHEUS_MULTIPROC_DIR"] = path
+    return path
+
+
+def child_exit(server, worker):
+    # Gunicorn hook, run in the master: drop the exited worker's "live" gauges from scrapes
+    from prometheus_client import multiprocess
+    multiprocess.mark_process_dead(worker.pid)
+
+
+class _TimedServer(Server):
+    """
+    uvicorn Server that reports when startup (lifespan handlers included) has finished, and
+    marks the worker not ready as soon as it is told to stop.
+    """
+
+    def __init__(self, config, on_started, state):
+        super().__init__(config=config)
+        self.on_started = on_started
+        self.state = state
+
+    async def startup(self, sockets=None):
+        await super().startup(sockets=sockets)
+        if not self.should_exit:
+            self.on_started()
+
+    def handle_exit(self, sig, frame):
+        # Runs in the signal handler, before uvicorn closes its sockets and waits for open
+        # requests; the lifespan shutdown, which would flip readiness too, only runs after that
+        self.state.begin_drain()
+        super().handle_exit(sig, frame)
+
+
+class AppWorker(UvicornWorker):
+    """
+    UvicornWorker that honours gunicorn's graceful timeout and logs its startup time.
+
+    CONFIG_KWARGS (loop and HTTP implementation) is set by `serve()` in the master before
+    the workers are forked.
+    """
+
+    CONFIG_KWARGS = {"loop": "auto", "http": "auto"}
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Without this, uvicorn waits for open connections forever and gunicorn kills the worker
+        uvicorn_timeout, drain_timeout = shutdown_budget(self.cfg.graceful_timeout)
+        self.config.timeout_graceful_shutdown = uvicorn_timeout
+        if settings.shutdown_drain_timeout > drain_timeout:
+            # Also through the environment, so a SIGHUP reload keeps the cap
+            settings.shutdown_drain_timeout = drain_timeout
+            os.environ["SHUTDOWN_DRAIN_TIMEOUT"] = str(drain_timeout)
+        self.boot_started = 0.0
+        self.import_seconds = 0.0
+
+    def init_process(self):
+        self.boot_started = time.perf_counter()
+        super().init_process()
+
+    def load_wsgi(self):
+        start = time.perf_counter()
+        super().load_wsgi()
+        self.import_seconds = time.perf_counter() - start
+
+    def _report_ready(self):
+        total = time.perf_counter() - self.boot_started
+        self.log.info("Worker %s ready in %.2fs (app import %.2fs, startup %.2fs, loop=%s, http=%s, max requests %s)",
+                      self.pid, total, self.import_seconds, total - self.import_seconds,
+                      type(asyncio.get_running_loop()).__module__, self.config.http_protocol_class.__name__, self.max_requests)
+
+    async def _serve(self):
+        # UvicornWorker._serve, with a server that reports when it is ready
+        # Imported here: the app, and with it prometheus_client, loads after prepare_metrics_dir()
+        from app.services.container import container
+        self.config.app = self.wsgi
+        server = _TimedServer(self.config, self._report_ready, container.server_state)
+        self._install_sigquit_handler()
+        await server.serve(sockets=self.sockets)
+        if not server.started:
+            sys.exit(Arbiter.WORKER_BOOT_ERROR)
+
+
+class Launcher(BaseApplication):
+    def __init__(self, options: Dict):
+        self.options = options
+        super().__init__()
+
+    def load_config(self):
+        for key, value in self.options.items():
+            self.cfg.set(key, value)
+
+    def load(self):
+        from app.main import app
+        return app
+
+
+def gunicorn_options(args: argparse.Namespace) -> Dict:
+    return {
+        "bind": args.bind,
+        "workers": args.workers or available_cpus(),
+        "worker_class": "app.serve.AppWorker",
+        "preload_app": args.preload,
+        "graceful_timeout": args.graceful_timeout,
+        # Workers that stop heartbeating (a blocked event loop) are restarted after this long
+        "timeout": max(args.graceful_timeout, 30),
+        "keepalive": args.keepalive,
+        "max_requests": args.max_requests,
+        "max_requests_jitter": args.max_requests_jitter,
+        "accesslog": "-" if args.access_log else None,
+        "errorlog": "-",
+        "proc_name": "user-management",
+        "child_exit": child_exit,
+    }
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--bind", default=settings.server_bind, help="Address to listen on, host:port or unix:path")
+    parser.add_argument("--workers", type=int, default=settings.server_workers, help="Worker processes; 0 starts one per available CPU")
+    parser.add_argument("--loop", choices=("auto", "asyncio", "uvloop"), default="auto", help="Event loop; auto uses uvloop when installed")
+    parser.add_argument("--http", choices=("auto", "h11", "httptools"), default="auto", help="HTTP parser; auto uses httptools when installed")
+    parser.add_argument("--preload", action=argparse.BooleanOptionalAction, default=settings.server_preload, help="Import the app in the master before forking workers")
+    parser.add_argument("--graceful-timeout", type=int, default=settings.server_graceful_timeout, help="Seconds in-flight requests get to finish on SIGTERM")
+    parser.add_argument("--keepalive", type=int, default=settings.server_keepalive, help="Seconds an idle keep-alive connection is kept open")
+    parser.add_argument("--max-requests", type=int, default=settings.server_max_requests, help="Requests after which a worker is replaced; 0 never replaces it")
+    parser.add_argument("--max-requests-jitter", type=int, default=settings.server_max_requests_jitter, help="Random extra requests per worker, so workers restart at different times")
+    parser.add_argument("--access-log", action=argparse.BooleanOptionalAction, default=False, help="Log every request")
+    return parser.parse_args(argv)
+
+
+def serve(argv: Optional[List[str]] = None):
+    args = parse_args(argv)
+    AppWorker.CONFIG_KWARGS = {"loop": args.loop, "http": args.http}
+    created_metrics_dir = "PROMETHEUS_MULTIPROC_DIR" not in os.environ
+    metrics_dir = prepare_metrics_dir()
+    master = os.getpid()
+    try:
+        Launcher(gunicorn_options(args)).run()
+    finally:
+        # Exiting workers unwind through here too; only the master removes the directory
+        if created_metrics_dir and os.getpid() == master:
+            shutil.rmtree(metrics_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    # Under `python -m` this file is __main__; configure the app.serve copy, which gunicorn loads AppWorker from
+    from app.serve import serve as run_server
+    run_server()
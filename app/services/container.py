@@ -0,0 +1,162 @@
+from builtins import object
+import asyncio
+import contextlib
+import logging
+from typing import Optional
+
+from settings.config import Settings, settings as default_settings
+from app.services.email_service import EmailService
+from app.services.health_service import ReadinessChecker
+from app.services.notification_service import NotificationJobDispatcher
+from app.utils.admission import ConcurrencyLimit
+from app.services.outbox_service import OutboxDispatcher
+from app.utils.lifecycle import ServerState
+from app.utils.loop_monitor import LoopMonitor
+from app.utils.slow_queries import SlowQueryRecorder
+from app.utils.template_manager import TemplateManager
+
+logger = logging.getLogger(__name__)
+
+
+class ServiceContainer:
+    """
+    Holds the per-worker singletons shared by every request: settings, the template
+    manager, the email service, the slow-query recorder, the event loop monitor and the
+    worker's readiness, its /readyz checks, its in-flight request count and the
+    admission limits per route class.
+
+    Services are built on first use (or eagerly by `startup()`), so dependencies that
+    hand them out are just attribute lookups. `reload()` re-reads the environment and
+    `.env` and rebuilds the services after a configuration change.
+    """
+
+    def __init__(self, settings: Settings = default_settings):
+        self.settings = settings
+        self._template_manager: Optional[TemplateManager] = None
+        self._email_service: Optional[EmailService] = None
+        self.outbox_dispatcher: Optional[OutboxDispatcher] = None
+        self.notification_dispatcher: Optional[NotificationJobDispatcher] = None
+        self.slow_query_recorder = SlowQueryRecorder(
+            threshold=settings.slow_query_threshold_ms / 1000,
+            capture_explain=settings.slow_query_explain,
+            buffer_size=settings.slow_query_buffer_size,
+        )
+        self.loop_monitor = LoopMonitor(
+            interval=settings.loop_monitor_interval,
+            threshold=settings.loop_monitor_threshold_ms / 1000,
+            buffer_size=settings.loop_monitor_buffer_size,
+        )
+        self.server_state = ServerState()
+        self.readiness = ReadinessChecker(
+            self.server_state,
+            cache_ttl=settings.readyz_cache_ttl,
+            db_timeout=settings.readyz_db_timeout,
+            max_overflow=settings.db_max_overflow,
+            max_email_backlog=settings.readyz_max_email_backlog,
+            max_hash_queue=settings.readyz_max_hash_queue,
+        )
+        self.admission_limits = {
+            route_class: ConcurrencyLimit(route_class, *self._admission_config(route_class))
+            for route_class in ("auth", "read", "write")
+        }
+
+    def _admission_config(self, route_class: str):
+        return (
+            getattr(self.settings, f"admission_{route_class}_concurrency"),
+            getattr(self.settings, f"admission_{route_class}_queue"),
+            self.settings.admission_queue_timeout,
+        )
+
+    @property
+    def template_manager(self) -> TemplateManager:
+        if self._template_manager is None:
+            self._template_manager = TemplateManager()
+        return self._template_manager
+
+    @property
+    def email_service(self) -> EmailService:
+        if self._email_service is None:
+            self._email_service = EmailService(template_manager=self.template_manager)
+        return self._email_service
+
+    def startup(self):
+        """Build all services up front so the first requests don't pay for it."""
+        self.email_service
+
+    def start_outbox_dispatcher(self, session_factory):
+        """Start delivering queued emails in the background on the running event loop."""
+        self.outbox_dispatcher = OutboxDispatcher(
+            session_factory,
+            lambda: self.email_service,
+            batch_size=self.settings.email_outbox_batch_size,
+            max_attempts=self.settings.email_outbox_max_attempts,
+            backoff_seconds=self.settings.email_outbox_backoff_seconds,
+            poll_interval=self.settings.email_outbox_poll_interval,
+        )
+        self.outbox_dispatcher.start()
+
+    def start_notification_dispatcher(self, session_factory):
+        """Start claiming and running bulk notification jobs in the background on the running event loop."""
+        self.notification_dispatcher = NotificationJobDispatcher(
+            session_factory,
+            lambda: self.email_service,
+            rate=self.settings.bulk_notification_rate,
+            progress_interval=self.settings.bulk_notification_progress_interval,
+            concurrency=self.settings.smtp_pool_size,
+            lease_seconds=self.settings.bulk_notification_lease_seconds,
+            poll_interval=self.settings.bulk_notification_poll_interval,
+        )
+        self.notification_dispatcher.start()
+
+    def start_loop_monitor(self):
+        """Start measuring lag of the running event loop."""
+        self.loop_monitor.start()
+
+    def reload(self):
+        """
+        Re-read configuration and rebuild the services.
+
+        The settings object is updated in place, so modules that imported it at
+        import time see the new values as well.
+        """
+        fresh = Settings()
+        for name in Settings.model_fields:
+            setattr(self.settings, name, getattr(fresh, name))
+        previous = self._email_service
+        self._template_manager = None
+        self._email_service = None
+        self.startup()
+        # The recorder stays installed on the engine; only its thresholds change
+        self.slow_query_recorder.threshold = self.settings.slow_query_threshold_ms / 1000
+        self.slow_query_recorder.capture_explain = self.settings.slow_query_explain
+        self.loop_monitor.interval = self.settings.loop_monitor_interval
+        self.loop_monitor.threshold = self.settings.loop_monitor_threshold_ms / 1000
+        self.readiness.cache_ttl = self.settings.readyz_cache_ttl
+        self.readiness.db_timeout = self.settings.readyz_db_timeout
+        self.readiness.max_email_backlog = self.settings.readyz_max_email_backlog
+        self.readiness.max_hash_queue = self.settings.readyz_max_hash_queue
+        self.readiness.invalidate()
+        for route_class, limit in self.admission_limits.items():
+            limit.configure(*self._admission_config(route_class))
+        if previous is not None:
+            # Let the old SMTP connections finish in the background
+            with contextlib.suppress(RuntimeError):
+                asyncio.get_running_loop().create_task(previous.smtp_client.close())
+        logger.info("Configuration reloaded")
+
+    async def shutdown(self):
+        await self.loop_monitor.stop()
+        if self.outbox_dispatcher is not None:
+            await self.outbox_dispatcher.stop()
+            self.outbox_dispatcher = None
+        if self.notification_dispatcher is not None:
+            # Cancelling saves the running job as INTERRUPTED; a dispatcher resumes it later
+            await self.notification_dispatcher.stop()
+            self.notification_dispatcher = None
+        if self._email_service is not None:
+            await self._email_service.smtp_client.close()
+        self._template_manager = None
+        self._email_service = None
+
+
+container = ServiceContainer()
@@ -1,37 +1,64 @@
 # email_service.py
 from builtins import ValueError, dict, str
+from sqlalchemy.ext.asyncio import AsyncSession
 from settings.config import settings
 from app.utils.smtp_connection import SMTPClient
+from app.utils.server_timing import timed
 from app.utils.template_manager import TemplateManager
+from app.models.email_outbox_model import EmailOutbox
 from app.models.user_model import User
 
 class EmailService:
+    subject_map = {
+        'email_verification': "Verify Your Account",
+        'password_reset': "Password Reset Instructions",
+        'account_locked': "Account Locked Notification",
+        'professional_upgrade': "Professional Status Upgrade Notification"
+    }
+
     def __init__(self, template_manager: TemplateManager):
         self.smtp_client = SMTPClient(
             server=settings.smtp_server,
             port=settings.smtp_port,
             username=settings.smtp_username,
-            password=settings.smtp_password
+            password=settings.smtp_password,
+            pool_size=settings.smtp_pool_size,
+            timeout=settings.smtp_timeout
         )
         self.template_manager = template_manager
 
     async def send_user_email(self, user_data: dict, email_type: str):
-        subject_map = {
-            'email_verification': "Verify Your Account",
-            'password_reset': "Password Reset Instructions",
-            'account_locked': "Account Locked Notification"
-        }
-
-        if email_type not in subject_map:
+        if email_type not in self.subject_map:
             raise ValueError("Invalid email type")
 
-        html_content = self.template_manager.render_template(email_type, **user_data)
-        self.smtp_client.send_email(subject_map[email_type], html_content, user_data['email'])
+        with timed("email"):
+            html_content = self.template_manager.render_template(email_type, **user_data)
+            await self.smtp_client.send_email(self.subject_map[email_type], html_content, user_data['email'])
 
-    async def send_verification_email(self, user: User):
+    def enqueue_user_email(self, session: AsyncSession, user_data: dict, email_type: str) -> EmailOutbox:
+        """
+        Queue an email in the outbox as part of the session's current transaction.
+
+        Nothing is sent here; the outbox dispatcher delivers the message once the
+        transaction commits, so a slow or failing mail server cannot affect the caller.
+        """
+        if email_type not in self.subject_map:
+            raise ValueError("Invalid email type")
+        with timed("email"):
+            message = EmailOutbox(email_type=email_type, recipient=user_data['email'], payload=user_data)
+            session.add(message)
+        return message
+
+    def _verification_data(self, user: User) -> dict:
         verification_url = f"{settings.server_base_url}verify-email/{user.id}/{user.verification_token}"
-        await self.send_user_email({
+        return {
             "name": user.first_name,
             "verification_url": verification_url,
             "email": user.email
-        }, 'email_verification')
\ No newline at end of file
+        }
+
+    async def send_verification_email(self, user: User):
+        await self.send_user_email(self._verification_data(user), 'email_verification')
+
+    def enqueue_verification_email(self, session: AsyncSession, user: User) -> EmailOutbox:
+        return self.enqueue_user_email(session, self._verification_data(user), 'email_verification')
@@ -0,0 +1,114 @@
+from builtins import Exception, any, bool, float, int, type
+import asyncio
+import logging
+import time
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import text
+
+from app.database import Database
+from app.services.outbox_service import outbox_backlog
+from app.utils.lifecycle import ServerState
+from app.utils.security import bcrypt_pool
+
+logger = logging.getLogger(__name__)
+
+
+def _check(ok: bool, detail: str, critical: bool = True) -> Dict:
+    return {"ok": ok, "critical": critical, "detail": detail}
+
+
+class ReadinessChecker:
+    """
+    Computes the /readyz answer of this worker.
+
+    The worker is ready once startup has warmed the database pool and until shutdown
+    begins. While ready, three checks run: a ``SELECT 1`` on a pooled connection (skipped,
+    and failed, when every connection is already checked out), the email outbox backlog
+    and the bcrypt queue. Their result is cached for `cache_ttl` seconds and probes that
+    arrive while the checks run wait for that run, so however often the worker is probed
+    it costs at most two short queries per `cache_ttl`.
+
+    The outbox backlog is shared by every worker, so a large one reports the worker as
+    degraded rather than failing it; taking all workers out of rotation would not help
+    the mail get delivered.
+    """
+
+    def __init__(self, state: ServerState, cache_ttl: float = 2.0, db_timeout: float = 1.0, max_overflow: int = 10,
+                 max_email_backlog: int = 1000, max_hash_queue: int = 32):
+        self.state = state
+        self.cache_ttl = cache_ttl
+        self.db_timeout = db_timeout
+        self.max_overflow = max_overflow
+        self.max_email_backlog = max_email_backlog
+        self.max_hash_queue = max_hash_queue
+        self._result: Optional[Tuple[bool, Dict]] = None
+        self._checked_at = 0.0
+        self._lock = asyncio.Lock()
+
+    async def check(self) -> Tuple[bool, Dict]:
+        """Returns (ready, body), where body has an overall status and the result of each check."""
+        if not self.state.ready:
+            reason = "draining" if self.state.draining else "warming up"
+            return False, {"status": "unavailable", "reason": reason, "checks": {}}
+        if self._fresh():
+            return self._result
+        async with self._lock:
+            if not self._fresh():
+                self._result = await self._run_checks()
+                self._checked_at = time.monotonic()
+        return self._result
+
+    def invalidate(self):
+        self._result = None
+
+    def _fresh(self) -> bool:
+        return self._result is not None and time.monotonic() - self._checked_at < self.cache_ttl
+
+    async def _run_checks(self) -> Tuple[bool, Dict]:
+        checks = {
+            "database": await self.check_database(),
+            "email_backlog": await self.check_email_backlog(),
+            "password_hashing": self.check_password_hashing(),
+        }
+        failed = [check for check in checks.values() if not check["ok"]]
+        ready = not any(check["critical"] for check in failed)
+        status = "unavailable" if not ready else "degraded" if failed else "ready"
+        if failed:
+            logger.warning("Readiness %s: %s", status, {name: check["detail"] for name, check in checks.items() if not check["ok"]})
+        return ready, {"status": status, "checks": checks}
+
+    async def check_database(self) -> Dict:
+        engine = Database.get_engine()
+        if engine is None:
+            return _check(False, "not initialized")
+        pool = engine.pool
+        capacity = pool.size() + self.max_overflow
+        if pool.checkedout() >= capacity:
+            # A probe must not queue for a connection behind real requests
+            return _check(False, f"all {capacity} connections in use")
+        try:
+            await asyncio.wait_for(self._ping(engine), self.db_timeout)
+        except asyncio.TimeoutError:
+            return _check(False, f"no answer within {self.db_timeout:g}s")
+        except Exception as e:
+            return _check(False, f"{type(e).__name__}: {e}")
+        return _check(True, f"{pool.checkedout()} of {capacity} connections in use")
+
+    @staticmethod
+    async def _ping(engine):
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+
+    async def check_email_backlog(self) -> Dict:
+        try:
+            async with Database.get_session_factory()() as session:
+                backlog = await asyncio.wait_for(outbox_backlog(session), self.db_timeout)
+        except Exception as e:
+            return _check(False, f"backlog unknown: {type(e).__name__}", critical=False)
+        return _check(backlog <= self.max_email_backlog, f"{backlog} emails pending", critical=False)
+
+    def check_password_hashing(self) -> Dict:
+        queued = bcrypt_pool.pending - bcrypt_pool.active
+        detail = f"{bcrypt_pool.active} of {bcrypt_pool.max_workers} threads busy, {queued} queued"
+        return _check(queued <= self.max_hash_queue, detail)
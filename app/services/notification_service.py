@@ -0,0 +1,335 @@
+from builtins import BaseException, Exception, bool, dict, float, int, len, max, str
+import asyncio
+import contextlib
+import logging
+from collections import deque
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Deque, Dict, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import and_, func, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.notification_job_model import NotificationJob, NotificationJobStatus
+from app.models.user_model import User
+from app.schemas.notification_schemas import BulkNotificationRequest
+from app.services.email_service import EmailService
+
+logger = logging.getLogger(__name__)
+
+# Recipients read per page; each page is one short query on its own session
+RECIPIENT_PAGE_SIZE = 500
+
+
+class _Pacer:
+    """Spaces calls to at most `rate` per second; a rate of 0 means no limit."""
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._next = 0.0
+
+    async def wait(self):
+        if not self.interval:
+            return
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+        if self._next > now:
+            await asyncio.sleep(self._next - now)
+        self._next = max(now, self._next) + self.interval
+
+
+class NotificationService:
+    @classmethod
+    def recipient_query(cls, filters: Dict):
+        """Select the name and address of every unlocked user matching the job's filter."""
+        query = select(User.email, User.first_name, User.nickname).where(User.is_locked.is_(False))
+        if filters.get("role") is not None:
+            query = query.where(User.role == filters["role"])
+        if filters.get("is_professional") is not None:
+            query = query.where(User.is_professional.is_(filters["is_professional"]))
+        if filters.get("email_verified") is not None:
+            query = query.where(User.email_verified.is_(filters["email_verified"]))
+        return query
+
+    @classmethod
+    async def create_job(cls, session: AsyncSession, notification: BulkNotificationRequest, requested_by: Optional[str]) -> NotificationJob:
+        filters = notification.filter.model_dump(mode="json", exclude_none=True)
+        context = {"message": notification.message} if notification.message else {}
+        total = (await session.execute(select(func.count()).select_from(cls.recipient_query(filters).subquery()))).scalar()
+        job = NotificationJob(email_type=notification.email_type, filters=filters, context=context,
+                              requested_by=requested_by, total=total)
+        session.add(job)
+        await session.commit()
+        await session.refresh(job)
+        return job
+
+    @classmethod
+    async def get_job(cls, session: AsyncSession, job_id: UUID) -> Optional[NotificationJob]:
+        return await session.get(NotificationJob, job_id)
+
+    @classmethod
+    async def run_job(cls, session_factory, email_service: EmailService, job_id: UUID, rate: float = 10.0,
+                      progress_interval: int = 50, concurrency: int = 2, lease_seconds: float = 300.0):
+        """
+        Send the job's email to every matching user the job has not reached yet.
+
+        Recipients are read in id order a page at a time (WHERE id > last ORDER BY id
+        LIMIT n), each page on a short session of its own, so a job that runs for hours
+        holds no connection or transaction between pages. Reading starts after the job's
+        cursor, so a job interrupted by a shutdown or a crash resumes where it stopped. Sends are paced to `rate` per second, with at most
+        `concurrency` in flight so they share the SMTP client's pooled connections.
+        Templates are compiled once by the TemplateManager, so each email only costs the
+        per-recipient substitution.
+
+        The counts and cursor are saved every `progress_interval` recipients, and at least
+        every third of `lease_seconds` by a heartbeat that also renews the job's lease, so a
+        send stalled on a slow SMTP server does not let another worker take the job over.
+        Every save only applies while the job still holds the lease it was claimed with or
+        last renewed. If a save finds the lease taken, or the heartbeat cannot renew it,
+        the job stops sending and leaves the row to whichever worker claims it next.
+
+        Results are counted in recipient order, so the saved counts always match the
+        cursor. After an interruption, the few sends that finished ahead of an earlier
+        one are sent again: delivery is at least once.
+
+        If the task is cancelled, the job is saved as INTERRUPTED for the next dispatcher
+        to resume.
+        """
+        async with session_factory() as session:
+            job = await session.get(NotificationJob, job_id)
+            if job is None:
+                logger.warning("Bulk notification job %s not found; nothing to send", job_id)
+                return
+
+        counts = {"sent": job.sent, "failed": job.failed}
+        progress = {"cursor": job.cursor, "last_error": job.last_error}
+        lease = {"until": job.leased_until, "lost": False}
+        lease_lock = asyncio.Lock()
+        pacer = _Pacer(rate)
+        slots = asyncio.Semaphore(concurrency)
+        # Sends in recipient order; settled from the left as they finish
+        issued: Deque[Tuple[UUID, asyncio.Task]] = deque()
+
+        async def deliver(user_data: Dict) -> Optional[str]:
+            try:
+                await email_service.send_user_email(user_data, job.email_type)
+                return None
+            except Exception as e:
+                logger.warning("Bulk %s email to %s failed: %s", job.email_type, user_data["email"], e)
+                return str(e)[:1000]
+            finally:
+                slots.release()
+
+        def settle(_=None):
+            while issued and issued[0][1].done() and not issued[0][1].cancelled():
+                user_id, task = issued.popleft()
+                error = task.result()
+                if error is None:
+                    counts["sent"] += 1
+                else:
+                    counts["failed"] += 1
+                    progress["last_error"] = error
+                progress["cursor"] = user_id
+
+        def save(status: Optional[NotificationJobStatus] = None, last_error: Optional[str] = None):
+            # Shielded: a save cut off by cancellation could commit a lease the job never learns about
+            return asyncio.shield(write(status, last_error))
+
+        async def write(status: Optional[NotificationJobStatus], last_error: Optional[str]) -> bool:
+            # Serialized, so each save compares against the lease the previous one wrote
+            async with lease_lock:
+                if lease["lost"]:
+                    return False
+                leased_until = None
+                if status is None:
+                    leased_until = datetime.now(timezone.utc) + timedelta(seconds=lease_seconds)
+                saved = await cls._save_progress(session_factory, job_id, counts, last_error or progress["last_error"],
+                                                 progress["cursor"], lease["until"], leased_until, status)
+                if saved:
+                    lease["until"] = leased_until
+                else:
+                    lease["lost"] = True
+                return saved
+
+        async def send_all():
+            try:
+                query = cls.recipient_query(job.filters).add_columns(User.id).order_by(User.id).limit(RECIPIENT_PAGE_SIZE)
+                after = job.cursor
+                processed = 0
+                while True:
+                    async with session_factory() as session:
+                        page = (await session.execute(query if after is None else query.where(User.id > after))).all()
+                    for email, first_name, nickname, user_id in page:
+                        await slots.acquire()
+                        await pacer.wait()
+                        user_data = {"name": first_name or nickname, "email": email, **job.context}
+                        task = asyncio.get_running_loop().create_task(deliver(user_data))
+                        issued.append((user_id, task))
+                        task.add_done_callback(settle)
+                        processed += 1
+                        if processed % progress_interval == 0 and not await save():
+                            return
+                    if len(page) < RECIPIENT_PAGE_SIZE:
+                        break
+                    after = page[-1].id
+                if issued:
+                    await asyncio.gather(*(task for _, task in issued))
+                    settle()
+            except BaseException:
+                for _, task in issued:
+                    task.cancel()
+                raise
+
+        async def heartbeat():
+            while True:
+                await asyncio.sleep(lease_seconds / 3)
+                try:
+                    if not await save():
+                        return
+                except Exception as e:
+                    # Without a renewed lease another worker may claim the job; stop rather than race it
+                    logger.error("Bulk notification job %s could not renew its lease: %s", job_id, e)
+                    lease["lost"] = True
+                    return
+
+        loop = asyncio.get_running_loop()
+        sending = loop.create_task(send_all())
+        renewing = loop.create_task(heartbeat())
+        try:
+            await asyncio.wait((sending, renewing), return_when=asyncio.FIRST_COMPLETED)
+        except asyncio.CancelledError:
+            sending.cancel()
+            with contextlib.suppress(asyncio.CancelledError, Exception):
+                await sending
+            await save(NotificationJobStatus.INTERRUPTED)
+            logger.info("Bulk notification job %s interrupted after %d sent, %d failed", job_id, counts["sent"], counts["failed"])
+            raise
+        finally:
+            renewing.cancel()
+        if lease["lost"]:
+            sending.cancel()
+            with contextlib.suppress(asyncio.CancelledError, Exception):
+                await sending
+            logger.warning("Bulk notification job %s lost its lease after %d sent; another worker will resume it",
+                           job_id, counts["sent"])
+            return
+        if sending.exception() is not None:
+            e = sending.exception()
+            logger.error("Bulk notification job %s failed: %s", job_id, e)
+            await save(NotificationJobStatus.FAILED, str(e)[:1000])
+            return
+        await save(NotificationJobStatus.COMPLETED)
+        logger.info("Bulk notification job %s finished: %d sent, %d failed", job_id, counts["sent"], counts["failed"])
+
+    @classmethod
+    async def _save_progress(cls, session_factory, job_id: UUID, counts: Dict[str, int], last_error: Optional[str],
+                             cursor: Optional[UUID], lease: Optional[datetime], leased_until: Optional[datetime],
+                             status: Optional[NotificationJobStatus] = None) -> bool:
+        """
+        Save the job's counts and cursor and replace its lease with `leased_until`, but only
+        while it still holds `lease`. Returns False when another worker has claimed the job.
+        """
+        values = dict(counts, last_error=last_error, cursor=cursor, leased_until=leased_until)
+        if status is not None:
+            values.update(status=status)
+            if status is not NotificationJobStatus.INTERRUPTED:
+                values.update(finished_at=datetime.now(timezone.utc))
+        query = (
+            update(NotificationJob)
+            .where(NotificationJob.id == job_id, NotificationJob.leased_until.is_not_distinct_from(lease))
+            .values(**values)
+        )
+        async with session_factory() as session:
+            result = await session.execute(query)
+            await session.commit()
+        return result.rowcount == 1
+
+
+class NotificationJobDispatcher:
+    """
+    Background task that runs bulk notification jobs, one at a time per worker.
+
+    Jobs are claimed like outbox messages, with SELECT ... FOR UPDATE SKIP LOCKED, so
+    several workers can dispatch side by side. A worker claims the oldest QUEUED or
+    INTERRUPTED job, or a RUNNING one whose lease has run out because the worker that
+    ran it died. Claiming marks the job RUNNING and leases it for `lease_seconds`; the
+    running job renews the lease from a heartbeat and stops if it ever loses it. Jobs
+    run outside any request, so a long send holds no request, admission slot or
+    in-flight count. `stop()` cancels the running job, which saves it as INTERRUPTED so
+    that a dispatcher resumes it later.
+    """
+
+    def __init__(self, session_factory, email_service_factory: Callable[[], EmailService], rate: float = 10.0,
+                 progress_interval: int = 50, concurrency: int = 2, lease_seconds: float = 300.0,
+                 poll_interval: float = 5.0):
+        self.session_factory = session_factory
+        self.email_service_factory = email_service_factory
+        self.rate = rate
+        self.progress_interval = progress_interval
+        self.concurrency = concurrency
+        self.lease_seconds = lease_seconds
+        self.poll_interval = poll_interval
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    async def _claim(self) -> Optional[UUID]:
+        now = datetime.now(timezone.utc)
+        claimable = or_(
+            NotificationJob.status.in_((NotificationJobStatus.QUEUED, NotificationJobStatus.INTERRUPTED)),
+            and_(NotificationJob.status == NotificationJobStatus.RUNNING, NotificationJob.leased_until < now),
+        )
+        query = (
+            select(NotificationJob)
+            .where(claimable)
+            .order_by(NotificationJob.created_at)
+            .limit(1)
+            .with_for_update(skip_locked=True)
+        )
+        async with self.session_factory() as session:
+            job = (await session.execute(query)).scalars().first()
+            if job is None:
+                return None
+            if job.status is not NotificationJobStatus.QUEUED:
+                logger.info("Resuming bulk notification job %s after %d sent", job.id, job.sent)
+            job.status = NotificationJobStatus.RUNNING
+            job.started_at = job.started_at or now
+            job.leased_until = now + timedelta(seconds=self.lease_seconds)
+            await session.commit()
+            return job.id
+
+    async def dispatch_once(self) -> bool:
+        """Claim one job and run it to the end. Returns False when no job was waiting."""
+        job_id = await self._claim()
+        if job_id is None:
+            return False
+        await NotificationService.run_job(self.session_factory, self.email_service_factory(), job_id, rate=self.rate,
+                                          progress_interval=self.progress_interval, concurrency=self.concurrency,
+                                          lease_seconds=self.lease_seconds)
+        return True
+
+    def wake(self):
+        """Look for jobs now instead of at the next poll, e.g. right after one was created."""
+        self._wakeup.set()
+
+    async def run(self):
+        while True:
+            self._wakeup.clear()
+            try:
+                ran = await self.dispatch_once()
+            except Exception as e:  # keep dispatching through transient database errors
+                logger.error("Bulk notification dispatch failed: %s", e)
+                ran = False
+            if not ran:
+                with contextlib.suppress(asyncio.TimeoutError):
+                    await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self.run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
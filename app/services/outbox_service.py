@@ -0,0 +1,116 @@
+from builtins import Exception, int, len, min, str
+import asyncio
+import contextlib
+import logging
+import random
+from datetime import datetime, timedelta, timezone
+from typing import Callable, List, Optional
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.email_outbox_model import EmailOutbox, OutboxStatus
+from app.services.email_service import EmailService
+
+logger = logging.getLogger(__name__)
+
+
+class OutboxDispatcher:
+    """
+    Background task that delivers queued emails from the email_outbox table.
+
+    Each round claims a batch of due PENDING messages with SELECT ... FOR UPDATE SKIP LOCKED,
+    so several workers can dispatch side by side without sending a message twice. Claiming
+    bumps the attempt count and leases the row for `lease_seconds`; if the worker dies while
+    sending, the message becomes due again once the lease runs out. Failed sends are retried
+    with exponential backoff until `max_attempts`, then marked FAILED.
+    """
+
+    def __init__(self, session_factory, email_service_factory: Callable[[], EmailService], batch_size: int = 20,
+                 max_attempts: int = 5, backoff_seconds: float = 30.0, max_backoff_seconds: float = 3600.0,
+                 lease_seconds: float = 300.0, poll_interval: float = 2.0):
+        self.session_factory = session_factory
+        self.email_service_factory = email_service_factory
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.backoff_seconds = backoff_seconds
+        self.max_backoff_seconds = max_backoff_seconds
+        self.lease_seconds = lease_seconds
+        self.poll_interval = poll_interval
+        self._task: Optional[asyncio.Task] = None
+
+    def backoff(self, attempts: int) -> timedelta:
+        """Delay before the next attempt, doubling per attempt with up to 10% jitter."""
+        delay = min(self.max_backoff_seconds, self.backoff_seconds * 2 ** (attempts - 1))
+        return timedelta(seconds=delay * random.uniform(1.0, 1.1))
+
+    async def _claim(self, session: AsyncSession) -> List[EmailOutbox]:
+        now = datetime.now(timezone.utc)
+        query = (
+            select(EmailOutbox)
+            .where(EmailOutbox.status == OutboxStatus.PENDING, EmailOutbox.next_attempt_at <= now)
+            .order_by(EmailOutbox.next_attempt_at)
+            .limit(self.batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        messages = (await session.execute(query)).scalars().all()
+        for message in messages:
+            message.attempts += 1
+            message.next_attempt_at = now + timedelta(seconds=self.lease_seconds)
+        await session.commit()
+        return messages
+
+    async def _deliver(self, email_service: EmailService, message: EmailOutbox):
+        try:
+            await email_service.send_user_email(message.payload, message.email_type)
+        except Exception as e:
+            message.last_error = str(e)[:1000]
+            if message.attempts >= self.max_attempts:
+                message.status = OutboxStatus.FAILED
+                logger.error("Giving up on %s email to %s after %d attempts: %s", message.email_type, message.recipient, message.attempts, e)
+            else:
+                message.next_attempt_at = datetime.now(timezone.utc) + self.backoff(message.attempts)
+                logger.warning("Failed to send %s email to %s, attempt %d: %s", message.email_type, message.recipient, message.attempts, e)
+        else:
+            message.status = OutboxStatus.SENT
+            message.sent_at = datetime.now(timezone.utc)
+            message.last_error = None
+
+    async def dispatch_once(self) -> int:
+        """Claim and send one batch of due messages. Returns the number of messages claimed."""
+        async with self.session_factory() as session:
+            messages = await self._claim(session)
+            if not messages:
+                return 0
+            email_service = self.email_service_factory()
+            # Sends run concurrently; the SMTP client's pool bounds the actual parallelism
+            await asyncio.gather(*(self._deliver(email_service, message) for message in messages))
+            await session.commit()
+            return len(messages)
+
+    async def run(self):
+        while True:
+            try:
+                claimed = await self.dispatch_once()
+            except Exception as e:  # keep dispatching through transient database errors
+                logger.error("Email outbox dispatch failed: %s", e)
+                claimed = 0
+            if claimed < self.batch_size:
+                await asyncio.sleep(self.poll_interval)
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self.run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+
+async def outbox_backlog(session: AsyncSession) -> int:
+    """Number of messages still waiting to be delivered."""
+    query = select(func.count()).select_from(EmailOutbox).where(EmailOutbox.status == OutboxStatus.PENDING)
+    return (await session.execute(query)).scalar()
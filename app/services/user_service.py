@@ -3,14 +3,15 @@ from datetime import datetime, timezone
 import secrets
 from typing import Optional, Dict, List
 from pydantic import ValidationError
-from sqlalchemy import func, null, update, select
+from sqlalchemy import any_, bindparam, func, null, or_, update, select
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.dependencies import get_email_service, get_settings
 from app.models.user_model import User
 from app.schemas.user_schemas import UserCreate, UserUpdate
 from app.utils.nickname_gen import generate_nickname
-from app.utils.security import generate_verification_token, hash_password, verify_password
+from app.utils.security import generate_verification_token, hash_password_async, verify_password_async
 from uuid import UUID
 from app.services.email_service import EmailService
 from app.models.user_model import UserRole
@@ -28,7 +29,7 @@ class UserService:
             await session.commit()
             return result
         except SQLAlchemyError as e:
-            logger.error(f"Database error: {e}")
+            logger.error("Database error: %s", e)
             await session.rollback()
             return None
 
@@ -58,13 +59,13 @@ class UserService:
             if existing_user:
                 logger.error("User with given email already exists.")
                 return None
-            validated_data['hashed_password'] = hash_password(validated_data.pop('password'))
+            validated_data['hashed_password'] = await hash_password_async(validated_data.pop('password'))
             new_user = User(**validated_data)
             new_nickname = generate_nickname()
             while await cls.get_by_nickname(session, new_nickname):
                 new_nickname = generate_nickname()
             new_user.nickname = new_nickname
-            logger.info(f"User Role: {new_user.role}")
+            logger.info("User Role: %s", new_user.role)
             user_count = await cls.count(session)
             new_user.role = UserRole.ADMIN if user_count == 0 else UserRole.ANONYMOUS            
             if new_user.role == UserRole.ADMIN:
@@ -72,13 +73,16 @@ class UserService:
 
             else:
                 new_user.verification_token = generate_verification_token()
-                await email_service.send_verification_email(new_user)
 
             session.add(new_user)
+            if new_user.verification_token:
+                await session.flush()  # assigns new_user.id, which the verification link needs
+                # Queued in the same transaction; the outbox dispatcher sends it after commit
+                email_service.enqueue_verification_email(session, new_user)
             await session.commit()
             return new_user
         except ValidationError as e:
-            logger.error(f"Validation error during user creation: {e}")
+            logger.error("Validation error during user creation: %s", e)
             return None
 
     @classmethod
@@ -88,26 +92,26 @@ class UserService:
             validated_data = UserUpdate(**update_data).model_dump(exclude_unset=True)
 
             if 'password' in validated_data:
-                validated_data['hashed_password'] = hash_password(validated_data.pop('password'))
+                validated_data['hashed_password'] = await hash_password_async(validated_data.pop('password'))
             query = update(User).where(User.id == user_id).values(**validated_data).execution_options(synchronize_session="fetch")
             await cls._execute_query(session, query)
             updated_user = await cls.get_by_id(session, user_id)
             if updated_user:
-                session.refresh(updated_user)  # Explicitly refresh the updated user object
-                logger.info(f"User {user_id} updated successfully.")
+                await session.refresh(updated_user)  # Explicitly refresh the updated user object
+                logger.info("User %s updated successfully.", user_id)
                 return updated_user
             else:
-                logger.error(f"User {user_id} not found after update attempt.")
+                logger.error("User %s not found after update attempt.", user_id)
             return None
         except Exception as e:  # Broad exception handling for debugging
-            logger.error(f"Error during user update: {e}")
+            logger.error("Error during user update: %s", e)
             return None
 
     @classmethod
     async def delete(cls, session: AsyncSession, user_id: UUID) -> bool:
         user = await cls.get_by_id(session, user_id)
         if not user:
-            logger.info(f"User with ID {user_id} not found.")
+            logger.info("User with ID %s not found.", user_id)
             return False
         await session.delete(user)
         await session.commit()
@@ -119,6 +123,34 @@ class UserService:
         result = await cls._execute_query(session, query)
         return result.scalars().all() if result else []
 
+    @classmethod
+    async def get_many(cls, session: AsyncSession, ids: List[UUID], emails: List[str]) -> List[User]:
+        """Fetch every user matching any of the ids or emails with a single `= ANY(...)` query."""
+        conditions = []
+        if ids:
+            conditions.append(User.id == any_(bindparam("ids", list(ids), type_=ARRAY(User.id.type))))
+        if emails:
+            conditions.append(User.email == any_(bindparam("emails", list(emails), type_=ARRAY(User.email.type))))
+        if not conditions:
+            return []
+        result = await cls._execute_query(session, select(User).where(or_(*conditions)))
+        return result.scalars().all() if result else []
+
+    @classmethod
+    async def get_fields_by_id(cls, session: AsyncSession, user_id: UUID, fields: List[str]) -> Optional[Dict]:
+        """Fetch only the given columns of one user, as a dict keyed by column name."""
+        query = select(*[getattr(User, field) for field in fields]).filter_by(id=user_id)
+        result = await cls._execute_query(session, query)
+        row = result.first() if result else None
+        return dict(row._mapping) if row else None
+
+    @classmethod
+    async def list_user_fields(cls, session: AsyncSession, fields: List[str], skip: int = 0, limit: int = 10) -> List[Dict]:
+        """List users selecting only the given columns, as dicts keyed by column name."""
+        query = select(*[getattr(User, field) for field in fields]).offset(skip).limit(limit)
+        result = await cls._execute_query(session, query)
+        return [dict(row._mapping) for row in result] if result else []
+
     @classmethod
     async def register_user(cls, session: AsyncSession, user_data: Dict[str, str], get_email_service) -> Optional[User]:
         return await cls.create(session, user_data, get_email_service)
@@ -132,7 +164,7 @@ class UserService:
                 return None
             if user.is_locked:
                 return None
-            if verify_password(password, user.hashed_password):
+            if await verify_password_async(password, user.hashed_password):
                 user.failed_login_attempts = 0
                 user.last_login_at = datetime.now(timezone.utc)
                 session.add(user)
@@ -154,7 +186,7 @@ class UserService:
 
     @classmethod
     async def reset_password(cls, session: AsyncSession, user_id: UUID, new_password: str) -> bool:
-        hashed_password = hash_password(new_password)
+        hashed_password = await hash_password_async(new_password)
         user = await cls.get_by_id(session, user_id)
         if user:
             user.hashed_password = hashed_password
@@ -189,6 +221,18 @@ class UserService:
         result = await session.execute(query)
         count = result.scalar()
         return count
+
+    @classmethod
+    async def warm_up(cls, session: AsyncSession):
+        """
+        Run the lookups most requests make (by email for logins, by id, the paginated list
+        and its count) once, so the connection has them prepared and SQLAlchemy has them
+        compiled before the first real request.
+        """
+        await cls.get_by_email(session, "warm-up@invalid")
+        await cls.get_by_id(session, UUID(int=0))
+        await cls.list_users(session, 0, 10)
+        await cls.count(session)
     
     @classmethod
     async def unlock_user_account(cls, session: AsyncSession, user_id: UUID) -> bool:
@@ -201,6 +245,18 @@ class UserService:
             return True
         return False
 
+    @classmethod
+    async def upgrade_to_professional(cls, session: AsyncSession, user_id: UUID, email_service: EmailService) -> Optional[User]:
+        """Mark a user as professional and queue the notification email in the same transaction."""
+        user = await cls.get_by_id(session, user_id)
+        if not user:
+            return None
+        user.update_professional_status(True)
+        email_service.enqueue_user_email(session, {"name": user.first_name or user.nickname, "email": user.email}, 'professional_upgrade')
+        await session.commit()
+        await session.refresh(user)
+        return user
+
     @classmethod
     async def update_github_profile(cls, session: AsyncSession, user_id: UUID, github_profile_url: str) -> Optional[User]:
         # Validate the GitHub profile URL format
@@ -215,13 +271,13 @@ class UserService:
             updated_user = await cls.get_by_id(session, user_id)
             if updated_user:
                 session.refresh(updated_user)  # Explicitly refresh the updated user object
-                logger.info(f"GitHub profile URL updated successfully for user {user_id}.")
+                logger.info("GitHub profile URL updated successfully for user %s.", user_id)
                 return updated_user
             else:
-                logger.error(f"User {user_id} not found after update attempt.")
+                logger.error("User %s not found after update attempt.", user_id)
             return None
         except Exception as e:  # Broad exception handling for debugging
-            logger.error(f"Error during GitHub profile URL update: {e}")
+            logger.error("Error during GitHub profile URL update: %s", e)
             return None
 
     @classmethod
@@ -238,11 +294,11 @@ class UserService:
             updated_user = await cls.get_by_id(session, user_id)
             if updated_user:
                 session.refresh(updated_user)  # Explicitly refresh the updated user object
-                logger.info(f"Profile picture URL updated successfully for user {user_id}.")
+                logger.info("Profile picture URL updated successfully for user %s.", user_id)
                 return updated_user
             else:
-                logger.error(f"User {user_id} not found after update attempt.")
+                logger.error("User %s not found after update attempt.", user_id)
             return None
         except Exception as e:  # Broad exception handling for debugging
-            logger.error(f"Error during profile picture URL update: {e}")
+            logger.error("Error during profile picture URL update: %s", e)
             return None
\ No newline at end of file
@@ -0,0 +1,143 @@
+from builtins import bool, float, int, len, str
+import asyncio
+import json
+from collections import deque
+from typing import Deque, Dict, Optional
+
+from app.utils import metrics
+
+# Password hashing makes these CPU-bound; they get their own, smaller limit
+AUTH_PATHS = frozenset(("/login/", "/register/"))
+# Probes and scrapes must get through however busy the worker is
+EXEMPT_PATHS = frozenset(("/healthz", "/readyz", "/metrics"))
+READ_METHODS = frozenset(("GET", "HEAD"))
+
+
+def route_class(method: str, path: str) -> Optional[str]:
+    """"auth", "read" or "write"; None for requests that are never limited."""
+    if path in EXEMPT_PATHS or method == "OPTIONS":
+        return None
+    # Creating a user hashes its password as well
+    if path in AUTH_PATHS or (method == "POST" and path == "/users/"):
+        return "auth"
+    return "read" if method in READ_METHODS else "write"
+
+
+class ConcurrencyLimit:
+    """
+    Lets at most `limit` requests run at once, with a bounded FIFO queue behind them.
+
+    `acquire()` returns False straight away when `queue_size` requests are already
+    waiting, and after `queue_timeout` seconds in the queue, so an overloaded worker
+    turns requests away quickly instead of letting every request slow down until it
+    times out. A released slot is handed directly to the oldest waiter.
+    """
+
+    def __init__(self, name: str, limit: int, queue_size: int, queue_timeout: float):
+        self.name = name
+        self.limit = limit
+        self.queue_size = queue_size
+        self.queue_timeout = queue_timeout
+        self.active = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._active_gauge = metrics.ADMISSION_ACTIVE.labels(route_class=name)
+        self._queued_gauge = metrics.ADMISSION_QUEUED.labels(route_class=name)
+
+    @property
+    def waiting(self) -> int:
+        return len(self._waiters)
+
+    async def acquire(self) -> bool:
+        if self.active < self.limit and not self._waiters:
+            self._set_active(self.active + 1)
+            return True
+        if len(self._waiters) >= self.queue_size:
+            metrics.ADMISSION_REJECTED.labels(route_class=self.name, reason="queue_full").inc()
+            return False
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self._queued_gauge.set(len(self._waiters))
+        try:
+            await asyncio.wait((waiter,), timeout=self.queue_timeout)
+        except asyncio.CancelledError:  # the client went away
+            if waiter.done():
+                self.release()  # a slot was handed to us just before
+            else:
+                self._remove(waiter)
+            raise
+        if waiter.done():
+            return True
+        self._remove(waiter)
+        metrics.ADMISSION_REJECTED.labels(route_class=self.name, reason="timeout").inc()
+        return False
+
+    def release(self):
+        if self._waiters and self.active <= self.limit:
+            # The slot passes to the oldest waiter, so `active` stays the same
+            self._waiters.popleft().set_result(None)
+            self._queued_gauge.set(len(self._waiters))
+        else:
+            self._set_active(self.active - 1)
+
+    def configure(self, limit: int, queue_size: int, queue_timeout: float):
+        """Change the limits in place; waiters are admitted at once if the limit went up."""
+        self.limit, self.queue_size, self.queue_timeout = limit, queue_size, queue_timeout
+        while self._waiters and self.active < self.limit:
+            self._set_active(self.active + 1)
+            self._waiters.popleft().set_result(None)
+        self._queued_gauge.set(len(self._waiters))
+
+    def _remove(self, waiter: asyncio.Future):
+        self._waiters.remove(waiter)
+        self._queued_gauge.set(len(self._waiters))
+
+    def _set_active(self, active: int):
+        self.active = active
+        self._active_gauge.set(active)
+
+
+class AdmissionControlMiddleware:
+    """
+    Limits how many requests of each route class run at once on this worker.
+
+    Without it, a burst beyond what the database pool and bcrypt threads can serve makes
+    every request wait inside `get_db` or the hashing pool until it times out. Here
+    requests wait in a bounded queue instead, and those that don't fit are answered at
+    once with 503 and a Retry-After header, so the requests that are admitted keep their
+    normal latency. Classes are defined by `route_class`: logins, registrations and user
+    creation ("auth") are limited separately from reads and other writes, so a wave of
+    logins can't starve reads and the other way round.
+    """
+
+    def __init__(self, app, limits: Dict[str, ConcurrencyLimit], retry_after: int = 1):
+        self.app = app
+        self.limits = limits
+        self.retry_after = retry_after
+
+    async def __call__(self, scope, receive, send):
+        limit = None
+        if scope["type"] == "http":
+            limit = self.limits.get(route_class(scope["method"], scope["path"]))
+        if limit is None:
+            await self.app(scope, receive, send)
+            return
+        if not await limit.acquire():
+            await self._reject(send)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            limit.release()
+
+    async def _reject(self, send):
+        body = json.dumps({"detail": "The server is busy, retry later"}).encode()
+        await send({
+            "type": "http.response.start",
+            "status": 503,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(self.retry_after).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
@@ -1,16 +1,69 @@
+import atexit
 import logging.config
+import logging.handlers
 import os
+import queue
+from typing import Optional
 from app.dependencies import get_settings
+from app.utils.structured_logging import NonBlockingQueueHandler, RequestIdFilter, SamplingFilter
 
 settings = get_settings()
-def setup_logging():
+_listener: Optional[logging.handlers.QueueListener] = None
+
+# Loggers that servers configure with their own handlers; they are routed through the queue too
+SERVER_LOGGERS = ("uvicorn", "uvicorn.error", "uvicorn.access", "gunicorn.error", "gunicorn.access")
+
+def setup_logging(config_path: Optional[str] = None) -> NonBlockingQueueHandler:
     """
     Sets up logging for the application using a configuration file.
     This ensures standardized logging across the entire application.
+
+    The handlers configured in logging.conf are moved behind a bounded queue and run by a
+    background listener thread, so writing a log line never blocks the event loop. Returns
+    the queue handler now attached to the root logger.
     """
-    # Construct the path to 'logging.conf', assuming it's in the project's root.
-    logging_config_path = os.path.join(os.path.dirname(__file__), '..', '..', 'logging.conf')
-    # Normalize the path to handle any '..' correctly.
-    normalized_path = os.path.normpath(logging_config_path)
+    global _listener
+    if config_path is None:
+        # Construct the path to 'logging.conf', assuming it's in the project's root.
+        logging_config_path = os.path.join(os.path.dirname(__file__), '..', '..', 'logging.conf')
+        # Normalize the path to handle any '..' correctly.
+        config_path = os.path.normpath(logging_config_path)
+    stop_logging()
     # Apply the logging configuration.
-    logging.config.fileConfig(normalized_path, disable_existing_loggers=False)
\ No newline at end of file
+    logging.config.fileConfig(config_path, disable_existing_loggers=False)
+
+    root = logging.getLogger()
+    sinks = list(root.handlers)
+    queue_handler = NonBlockingQueueHandler(queue.Queue(maxsize=settings.log_queue_size))
+    queue_handler.addFilter(SamplingFilter(settings.log_sample_rates))
+    queue_handler.addFilter(RequestIdFilter())
+    for handler in sinks:
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    for name in SERVER_LOGGERS:
+        server_logger = logging.getLogger(name)
+        server_logger.handlers.clear()
+        server_logger.propagate = True
+
+    _listener = logging.handlers.QueueListener(queue_handler.queue, *sinks, respect_handler_level=True)
+    _listener.start()
+    return queue_handler
+
+def stop_logging():
+    """
+    Write out the queued records and stop the listener thread. The configured handlers
+    go back on the root logger, so records logged during the rest of shutdown are still
+    written, synchronously.
+    """
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        root = logging.getLogger()
+        for handler in list(root.handlers):
+            if isinstance(handler, NonBlockingQueueHandler):
+                root.removeHandler(handler)
+        for handler in _listener.handlers:
+            root.addHandler(handler)
+        _listener = None
+
+atexit.register(stop_logging)
@@ -0,0 +1,176 @@
+from builtins import bool, float, int, str
+import gzip
+import zlib
+from typing import Iterable, Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+
+try:
+    import brotli
+except ImportError:  # brotli is optional, gzip is always available
+    brotli = None
+
+
+def brotli_available() -> bool:
+    """Return True when the optional brotli package is installed."""
+    return brotli is not None
+
+
+def gzip_compress(data: bytes, level: int = 9) -> bytes:
+    """Compress bytes with gzip. mtime is pinned so the output is reproducible."""
+    return gzip.compress(data, compresslevel=level, mtime=0)
+
+
+def brotli_compress(data: bytes, quality: int = 11) -> Optional[bytes]:
+    """Compress bytes with brotli, or return None when brotli is not installed."""
+    if brotli is None:
+        return None
+    return brotli.compress(data, quality=quality)
+
+
+def negotiate_encoding(accept_encoding: Optional[str], available: Iterable[str]) -> str:
+    """
+    Pick the best content coding for an Accept-Encoding header.
+
+    Args:
+        accept_encoding (str): Raw Accept-Encoding header value, may be None.
+        available (Iterable[str]): Codings the server can produce, in preference order.
+
+    Returns:
+        str: The chosen coding, or "identity" when nothing acceptable is available.
+    """
+    if not accept_encoding:
+        return "identity"
+    weights = {}
+    for part in accept_encoding.split(","):
+        coding, _, params = part.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        weights[coding] = quality
+    wildcard = weights.get("*")
+    best, best_quality = "identity", 0.0
+    for coding in available:
+        quality = weights.get(coding, wildcard if wildcard is not None else 0.0)
+        if quality > best_quality:
+            best, best_quality = coding, quality
+    return best
+
+
+_COMPRESSIBLE_TYPES = ("text/", "application/json", "application/javascript", "application/xml")
+
+
+def _is_compressible(content_type: str) -> bool:
+    return content_type.startswith(_COMPRESSIBLE_TYPES) or "+json" in content_type
+
+
+class CompressionMiddleware:
+    """
+    ASGI middleware that gzip or brotli encodes responses based on Accept-Encoding.
+
+    Responses below minimum_size, non-text media types and responses that are already
+    encoded are passed through untouched. Streaming responses are compressed chunk by
+    chunk with a sync flush, so large exports never have to be buffered in memory.
+    """
+
+    def __init__(self, app, minimum_size: int = 500, gzip_level: int = 6, brotli_quality: int = 4):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.available = ("br", "gzip") if brotli is not None else ("gzip",)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding"), self.available)
+        if encoding == "identity":
+            await self.app(scope, receive, send)
+            return
+        responder = _CompressionResponder(send, encoding, self)
+        await self.app(scope, receive, responder.send)
+
+
+class _CompressionResponder:
+    def __init__(self, send, encoding: str, config: CompressionMiddleware):
+        self._send = send
+        self.encoding = encoding
+        self.config = config
+        self.start_message = None
+        self.compressor = None
+        self.passthrough = False
+
+    def _new_compressor(self):
+        if self.encoding == "br":
+            return _BrotliStream(self.config.brotli_quality)
+        return _GzipStream(self.config.gzip_level)
+
+    async def send(self, message):
+        if message["type"] == "http.response.start":
+            self.start_message = message
+            return
+        if message["type"] != "http.response.body" or self.passthrough:
+            await self._send(message)
+            return
+        if self.compressor is not None:
+            more_body = message.get("more_body", False)
+            chunk = message.get("body", b"")
+            body = self.compressor.compress(chunk) if more_body else self.compressor.finish(chunk)
+            await self._send({"type": "http.response.body", "body": body, "more_body": more_body})
+            return
+
+        # First body message: decide whether this response gets compressed at all
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        headers = MutableHeaders(raw=self.start_message["headers"])
+        if (
+            "content-encoding" in headers
+            or not _is_compressible(headers.get("content-type", ""))
+            or (not more_body and len(body) < self.config.minimum_size)
+        ):
+            self.passthrough = True
+            await self._send(self.start_message)
+            await self._send(message)
+            return
+
+        self.compressor = self._new_compressor()
+        headers["Content-Encoding"] = self.encoding
+        headers.add_vary_header("Accept-Encoding")
+        if more_body:
+            del headers["Content-Length"]
+            body = self.compressor.compress(body)
+        else:
+            body = self.compressor.finish(body)
+            headers["Content-Length"] = str(len(body))
+        await self._send(self.start_message)
+        await self._send({"type": "http.response.body", "body": body, "more_body": more_body})
+
+
+class _GzipStream:
+    def __init__(self, level: int):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self, data: bytes = b"") -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush()
+
+
+class _BrotliStream:
+    def __init__(self, quality: int):
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data) + self._compressor.flush()
+
+    def finish(self, data: bytes = b"") -> bytes:
+        return self._compressor.process(data) + self._compressor.finish()
@@ -0,0 +1,50 @@
+from builtins import bool, float
+import asyncio
+
+
+class ServerState:
+    """
+    Readiness and in-flight requests of this worker process.
+
+    `ready` turns True once startup has opened and warmed the database connections, and
+    False again as soon as the worker is asked to stop (`begin_drain`), so a load balancer
+    stops sending requests before the worker drains and exits. Under `python -m app.serve`
+    that is when the stop signal arrives; otherwise when the lifespan shutdown starts.
+    `in_flight` is kept by InFlightMiddleware.
+    """
+
+    def __init__(self):
+        self.ready = False
+        self.draining = False
+        self.in_flight = 0
+
+    def begin_drain(self):
+        """Stop reporting ready, for good: the worker is on its way out."""
+        self.ready = False
+        self.draining = True
+
+    async def wait_idle(self, timeout: float) -> bool:
+        """Wait up to `timeout` seconds for in-flight requests to finish; True if none are left."""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while self.in_flight and loop.time() < deadline:
+            await asyncio.sleep(0.05)
+        return self.in_flight == 0
+
+
+class InFlightMiddleware:
+    """Counts the HTTP requests being handled in `state.in_flight`."""
+
+    def __init__(self, app, state: ServerState):
+        self.app = app
+        self.state = state
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        self.state.in_flight += 1
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.state.in_flight -= 1
@@ -1,12 +1,26 @@
 from builtins import dict, int, max, str
-from typing import List, Callable
+from typing import Dict, List, Callable, Tuple
 from urllib.parse import urlencode
 from uuid import UUID
+import weakref
 
 from fastapi import Request
+from pydantic_core import Url
 from app.schemas.link_schema import Link
 from app.schemas.pagination_schema import PaginationLink
 
+# Route names and link metadata for the links attached to every user
+USER_ACTIONS = [
+    ("self", "get_user", "GET", "view"),
+    ("update", "update_user", "PUT", "update"),
+    ("delete", "delete_user", "DELETE", "delete")
+]
+_USER_ID_PLACEHOLDER = "__user_id__"
+# Templates are cached per app and per base URL; the base URL comes from the Host header,
+# so the per-app cache is cleared once it grows past this many entries.
+_MAX_BASE_URLS = 32
+_link_templates: "weakref.WeakKeyDictionary[object, Dict[str, List[Tuple[str, str, str, str]]]]" = weakref.WeakKeyDictionary()
+
 # Utility function to create a link
 def create_link(rel: str, href: str, method: str = "GET", action: str = None) -> Link:
     return Link(rel=rel, href=href, method=method, action=action)
@@ -14,24 +28,43 @@ def create_link(rel: str, href: str, method: str = "GET", action: str = None) ->
 def create_pagination_link(rel: str, base_url: str, params: dict) -> PaginationLink:
     # Ensure parameters are added in a specific order
     query_string = f"skip={params['skip']}&limit={params['limit']}"
-    return PaginationLink(rel=rel, href=f"{base_url}?{query_string}")
+    # base_url was validated when the request was routed, so skip model validation
+    return PaginationLink.model_construct(rel=rel, href=Url(f"{base_url}?{query_string}"), method="GET")
+
+def user_link_templates(request: Request) -> List[Tuple[str, str, str, str]]:
+    """
+    Return (rel, url prefix, url suffix, action) for each user link, resolving the routes
+    with url_for only the first time an app is seen with a given base URL.
+    """
+    per_app = _link_templates.setdefault(request.app, {})
+    base_url = str(request.base_url)
+    templates = per_app.get(base_url)
+    if templates is None:
+        templates = []
+        for rel, route_name, method, action in USER_ACTIONS:
+            url = str(request.url_for(route_name, user_id=_USER_ID_PLACEHOLDER))
+            # Validate the template once with a real id in place of the placeholder
+            Link(rel=rel, href=url.replace(_USER_ID_PLACEHOLDER, str(UUID(int=0))), action=action)
+            prefix, _, suffix = url.partition(_USER_ID_PLACEHOLDER)
+            templates.append((rel, prefix, suffix, action))
+        if len(per_app) >= _MAX_BASE_URLS:
+            per_app.clear()
+        per_app[base_url] = templates
+    return templates
 
 def create_user_links(user_id: UUID, request: Request) -> List[Link]:
     """
     Generate navigation links for user actions.
     """
-    actions = [
-        ("self", "get_user", "GET", "view"),
-        ("update", "update_user", "PUT", "update"),
-        ("delete", "delete_user", "DELETE", "delete")
-    ]
+    user_id = str(user_id)
     return [
-        create_link(rel, str(request.url_for(action, user_id=str(user_id))), method, action_desc)
-        for rel, action, method, action_desc in actions
+        Link.model_construct(rel=rel, href=Url(f"{prefix}{user_id}{suffix}"), action=action, type="application/json")
+        for rel, prefix, suffix, action in user_link_templates(request)
     ]
 
 def generate_pagination_links(request: Request, skip: int, limit: int, total_items: int) -> List[PaginationLink]:
-    base_url = str(request.url)
+    # Drop the current query string, the pagination parameters are appended below
+    base_url = str(request.url).split("?", 1)[0]
     total_pages = (total_items + limit - 1) // limit
     links = [
         create_pagination_link("self", base_url, {'skip': skip, 'limit': limit}),
@@ -0,0 +1,145 @@
+from builtins import AssertionError, RuntimeError, bool, float, int, list, max, str
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from datetime import datetime, timezone
+from typing import Deque, List, Optional
+
+from app.utils import metrics
+
+logger = logging.getLogger(__name__)
+
+# Innermost frames kept from the stack of a blocked event loop
+_STACK_LIMIT = 30
+
+
+class BlockingCallError(AssertionError):
+    """Raised by a strict LoopMonitor when the event loop was blocked while it watched."""
+
+
+class BlockedLoop:
+    """One stretch of time during which the event loop ran no callbacks."""
+
+    def __init__(self, duration: float, task: str, stack: str):
+        self.duration = duration
+        self.task = task
+        self.stack = stack
+        self.occurred_at = datetime.now(timezone.utc)
+
+
+class LoopMonitor:
+    """
+    Measures event loop lag and catches code that blocks the loop.
+
+    A watchdog thread posts a callback to the loop every `interval` seconds; the time the
+    callback waits to run is the loop's lag and is recorded in the event_loop_lag_seconds
+    histogram. When it has not run after `threshold` seconds, the loop is stuck in
+    synchronous code: the watchdog captures the loop thread's stack and the running task
+    while the call is still in progress, then logs it once the loop is free again. The
+    last `buffer_size` of these are kept.
+
+    With `strict` set, `stop()` raises BlockingCallError if the loop was blocked, so a
+    test can fail on blocking calls:
+
+        async with LoopMonitor(threshold=0.05, strict=True):
+            await client.post("/login/", data=form)
+    """
+
+    def __init__(self, interval: float = 0.5, threshold: float = 0.1, strict: bool = False, buffer_size: int = 50):
+        self.interval = interval
+        self.threshold = threshold
+        self.strict = strict
+        self.entries: Deque[BlockedLoop] = deque(maxlen=buffer_size)
+        self.blocked_count = 0
+        self.last_lag = 0.0
+        self.max_lag = 0.0
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread_id: Optional[int] = None
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        """Start watching the running event loop; call from a coroutine."""
+        self.loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._watch, name="loop-monitor", daemon=True)
+        self._thread.start()
+
+    async def stop(self):
+        """Stop the watchdog; in strict mode, raise if the loop was blocked meanwhile."""
+        if self._thread is not None:
+            self._stopping.set()
+            # Joined off the loop, so a pending probe can still run and a block that just ended is recorded
+            await asyncio.to_thread(self._thread.join)
+            self._thread = None
+        if self.strict and self.entries:
+            raise BlockingCallError("Event loop was blocked:\n" + "\n".join(
+                f"{entry.duration * 1000:.0f} ms in {entry.task}\n{entry.stack}" for entry in self.entries
+            ))
+
+    async def __aenter__(self) -> "LoopMonitor":
+        self.start()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.stop()
+
+    def _watch(self):
+        while True:
+            ran = threading.Event()
+            posted = time.perf_counter()
+            try:
+                self.loop.call_soon_threadsafe(ran.set)
+            except RuntimeError:  # the loop was closed
+                return
+            if not ran.wait(self.threshold):
+                task, stack = self._capture()
+                if not self._wait_for_loop(ran):
+                    return
+                self._record_block(time.perf_counter() - posted, task, stack)
+            self._record_lag(time.perf_counter() - posted)
+            if self._stopping.wait(self.interval):
+                return
+
+    def _wait_for_loop(self, ran: threading.Event) -> bool:
+        deadline = None
+        while not ran.wait(0.05):
+            if self.loop.is_closed():
+                return False
+            if self._stopping.is_set():
+                # The loop may have been stopped for good; don't outlive it by much
+                deadline = deadline or time.perf_counter() + 1.0
+                if time.perf_counter() > deadline:
+                    return False
+        return True
+
+    def _capture(self):
+        # Reading another thread's frames and the loop's current task is safe under the GIL
+        current = asyncio.tasks._current_tasks.get(self.loop)
+        task = f"task {current.get_name()} ({current.get_coro().__qualname__})" if current is not None else "loop callbacks"
+        frame = sys._current_frames().get(self._loop_thread_id)
+        stack = "".join(traceback.format_stack(frame, _STACK_LIMIT)) if frame is not None else ""
+        return task, stack
+
+    def _record_lag(self, lag: float):
+        self.last_lag = lag
+        self.max_lag = max(self.max_lag, lag)
+        metrics.EVENT_LOOP_LAG.observe(lag)
+
+    def _record_block(self, duration: float, task: str, stack: str):
+        self.entries.append(BlockedLoop(duration, task, stack))
+        self.blocked_count += 1
+        metrics.EVENT_LOOP_BLOCKED.inc()
+        logger.warning("Event loop blocked for %.0f ms in %s:\n%s", duration * 1000, task, stack)
+
+    def recent(self) -> List[BlockedLoop]:
+        """Recorded blocks, newest first."""
+        return list(self.entries)[::-1]
+
+    def clear(self):
+        self.entries.clear()
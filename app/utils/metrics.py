@@ -0,0 +1,199 @@
+from builtins import dict, enumerate, getattr, hasattr, int, len, sorted, str
+import os
+import time
+from typing import Dict, List, Optional, Pattern, Set, Tuple
+
+from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, Histogram, generate_latest
+from prometheus_client import GCCollector, PlatformCollector, ProcessCollector
+from prometheus_client.multiprocess import MultiProcessCollector
+
+# Set by `python -m app.serve` before the app is imported. Every worker then writes its
+# samples to files in this directory and a scrape of any worker reports the sum over all of
+# them; the gauges say how they combine ("livesum" adds up the workers still running).
+# The process, platform and GC collectors below only describe the worker that is scraped,
+# so they are left out of multiprocess scrapes.
+MULTIPROCESS_DIR = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+
+# A registry of our own, so importing the app twice (tests, reloads) never registers a metric twice
+REGISTRY = CollectorRegistry()
+ProcessCollector(registry=REGISTRY)
+PlatformCollector(registry=REGISTRY)
+GCCollector(registry=REGISTRY)
+
+# Label values are limited to these methods, the app's route templates and UNMATCHED_ROUTE,
+# so a scan of random URLs cannot create new time series
+KNOWN_METHODS = frozenset(("GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"))
+UNMATCHED_ROUTE = "<unmatched>"
+
+REQUESTS = Counter(
+    "http_requests_total", "HTTP requests by method, route template and status code",
+    ["method", "route", "status"], registry=REGISTRY,
+)
+REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds", "HTTP request latency by method and route template",
+    ["method", "route"], registry=REGISTRY,
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+REQUESTS_IN_PROGRESS = Gauge(
+    "http_requests_in_progress", "HTTP requests currently being served",
+    ["method", "route"], registry=REGISTRY, multiprocess_mode="livesum",
+)
+
+# Resource gauges, refreshed when /metrics is scraped (and periodically by every worker in
+# multiprocess mode). Per-worker pools add up across workers; the outbox backlog is one
+# database count, so the latest reading wins.
+DB_POOL_SIZE = Gauge("db_pool_size", "Configured size of the database connection pool", registry=REGISTRY, multiprocess_mode="livesum")
+DB_POOL_CHECKED_OUT = Gauge("db_pool_checked_out", "Database connections currently in use", registry=REGISTRY, multiprocess_mode="livesum")
+DB_POOL_OVERFLOW = Gauge("db_pool_overflow", "Database connections open beyond the pool size", registry=REGISTRY, multiprocess_mode="livesum")
+BCRYPT_POOL_WORKERS = Gauge("bcrypt_pool_workers", "Threads available for password hashing", registry=REGISTRY, multiprocess_mode="livesum")
+BCRYPT_POOL_ACTIVE = Gauge("bcrypt_pool_active", "Password hashes currently running", registry=REGISTRY, multiprocess_mode="livesum")
+BCRYPT_POOL_QUEUED = Gauge("bcrypt_pool_queued", "Password hashes waiting for a thread", registry=REGISTRY, multiprocess_mode="livesum")
+SMTP_CONNECTIONS_IN_USE = Gauge("smtp_connections_in_use", "SMTP connections currently sending", registry=REGISTRY, multiprocess_mode="livesum")
+SMTP_CONNECTIONS_IDLE = Gauge("smtp_connections_idle", "Open SMTP connections waiting for the next email", registry=REGISTRY, multiprocess_mode="livesum")
+EMAIL_OUTBOX_PENDING = Gauge("email_outbox_pending", "Queued emails not yet delivered", registry=REGISTRY, multiprocess_mode="livemostrecent")
+
+# Recorded by the loop monitor as it measures
+EVENT_LOOP_LAG = Histogram(
+    "event_loop_lag_seconds", "Delay before the event loop runs a newly scheduled callback",
+    registry=REGISTRY, buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5),
+)
+EVENT_LOOP_BLOCKED = Counter(
+    "event_loop_blocked_total", "Times the event loop ran no callbacks for longer than the loop monitor threshold",
+    registry=REGISTRY,
+)
+
+# Recorded by AdmissionControlMiddleware as requests are admitted, queued and rejected
+ADMISSION_ACTIVE = Gauge(
+    "admission_active_requests", "Requests running per admission class", ["route_class"], registry=REGISTRY,
+    multiprocess_mode="livesum",
+)
+ADMISSION_QUEUED = Gauge(
+    "admission_queued_requests", "Requests waiting for an admission slot per class", ["route_class"], registry=REGISTRY,
+    multiprocess_mode="livesum",
+)
+ADMISSION_REJECTED = Counter(
+    "admission_rejected_total", "Requests answered with 503 because their admission queue was full or they waited too long",
+    ["route_class", "reason"], registry=REGISTRY,
+)
+
+
+def render_metrics() -> Tuple[bytes, str]:
+    """
+    Return the metrics in the Prometheus text exposition format, with their content type:
+    this worker's registry, or in multiprocess mode the samples of every worker combined.
+    """
+    if MULTIPROCESS_DIR:
+        registry = CollectorRegistry()
+        MultiProcessCollector(registry, path=MULTIPROCESS_DIR)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
+
+
+class _RouteTable:
+    """
+    Maps a request path to the template of the first route whose path pattern matches it.
+
+    Like routing, a route that also accepts the request method wins over an earlier one
+    that only matches the path. Patterns are indexed by their first path segment, so a
+    lookup only tries the routes under that prefix (plus any whose first segment is a
+    parameter) instead of all of them.
+    """
+
+    def __init__(self):
+        self._routes = None
+        self._size = 0
+        self._by_segment: Dict[str, List[Tuple[Pattern, Optional[Set[str]], str]]] = {}
+        self._wildcard: List[Tuple[Pattern, Optional[Set[str]], str]] = []
+
+    def _build(self, routes):
+        indexed = []
+        for position, route in enumerate(routes):
+            if hasattr(route, "path_regex"):
+                segment = route.path.split("/", 2)[1] if route.path.startswith("/") else ""
+                methods = getattr(route, "methods", None)
+                indexed.append((position, None if "{" in segment else segment, (route.path_regex, methods, route.path)))
+        wildcard = [entry for entry in indexed if entry[1] is None]
+        by_segment = {}
+        for entry in indexed:
+            if entry[1] is not None:
+                by_segment.setdefault(entry[1], []).append(entry)
+        # Keep the router's order within each candidate list, so the first match wins as in routing
+        self._by_segment = {
+            segment: [candidate for _, _, candidate in sorted(entries + wildcard, key=lambda entry: entry[0])]
+            for segment, entries in by_segment.items()
+        }
+        self._wildcard = [candidate for _, _, candidate in wildcard]
+        self._routes = routes
+        self._size = len(routes)
+
+    def resolve(self, scope, method: str) -> str:
+        router = getattr(scope.get("app"), "router", None)
+        if router is None:
+            return UNMATCHED_ROUTE
+        if router.routes is not self._routes or len(router.routes) != self._size:
+            self._build(router.routes)
+        path = scope["path"]
+        segment = path.split("/", 2)[1] if path.startswith("/") else ""
+        path_match = UNMATCHED_ROUTE
+        for pattern, methods, template in self._by_segment.get(segment, self._wildcard):
+            if pattern.match(path):
+                if methods is None or method in methods:
+                    return template
+                if path_match is UNMATCHED_ROUTE:
+                    path_match = template  # answered with 405 unless a later route takes the method
+        return path_match
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording request count, latency and in-flight requests per route.
+
+    Requests are labelled with the route template ("/users/{user_id}"), never the raw
+    path. The route is resolved before the request runs, so in-flight requests can be
+    counted per route too. Labelled children are cached, so each request costs one regex
+    scan over the route table plus a few counter updates.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.routes = _RouteTable()
+        self._children: Dict[Tuple[str, str], Tuple] = {}
+        self._counters: Dict[Tuple[str, str, int], Counter] = {}
+
+    def _observers(self, method: str, route: str):
+        key = (method, route)
+        children = self._children.get(key)
+        if children is None:
+            children = self._children[key] = (REQUEST_DURATION.labels(method, route), REQUESTS_IN_PROGRESS.labels(method, route))
+        return children
+
+    def _counter(self, method: str, route: str, status_code: int):
+        key = (method, route, status_code)
+        counter = self._counters.get(key)
+        if counter is None:
+            counter = self._counters[key] = REQUESTS.labels(method, route, str(status_code))
+        return counter
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        method = scope["method"] if scope["method"] in KNOWN_METHODS else "OTHER"
+        route = self.routes.resolve(scope, scope["method"])
+        duration, in_progress = self._observers(method, route)
+        status_code = 500  # reported when the app raises before starting a response
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        in_progress.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            duration.observe(time.perf_counter() - start)
+            in_progress.dec()
+            self._counter(method, route, status_code).inc()
@@ -0,0 +1,131 @@
+from builtins import bool, dict, float, int, len, max, min, reversed, sorted, str
+import asyncio
+import os
+import sys
+import sysconfig
+import threading
+import time
+from collections import Counter
+from typing import Dict, List, Optional
+
+# Leaf functions of threads that are only waiting; their samples are dropped unless idle is kept
+_IDLE_LEAVES = frozenset((
+    ("threading.py", "wait"), ("threading.py", "_wait_for_tstate_lock"), ("queue.py", "get"),
+    ("selectors.py", "select"), ("thread.py", "_worker"),
+))
+_PATH_PREFIXES = sorted(
+    {os.path.join(path, "") for path in (sysconfig.get_paths()["purelib"], sysconfig.get_paths()["stdlib"], os.getcwd())},
+    key=len, reverse=True,
+)
+
+
+def _short_path(filename: str) -> str:
+    for prefix in _PATH_PREFIXES:
+        if filename.startswith(prefix):
+            return filename[len(prefix):]
+    return filename
+
+
+class StackSampler:
+    """
+    Samples the Python stacks of every thread in this process from a background thread.
+
+    Every `interval` seconds the sampler reads `sys._current_frames()` and counts each
+    stack in collapsed form ("root;caller;callee"), the input format of flamegraph.pl and
+    speedscope. Stacks of the event loop thread are rooted at the coroutine of the asyncio
+    task that is running. Threads waiting on a lock, a queue or the selector are skipped
+    unless `include_idle` is set.
+
+    Sampling holds the GIL, so its cost is taken from the workers. When the average cost
+    of a sample exceeds `max_overhead` of the interval, the interval is doubled. The cost
+    is the sampler thread's CPU time, which leaves out the time spent waiting for a busy
+    worker to release the GIL.
+    """
+
+    def __init__(self, interval: float = 0.01, max_overhead: float = 0.02, include_idle: bool = False,
+                 loop: Optional[asyncio.AbstractEventLoop] = None, loop_thread_id: Optional[int] = None):
+        self.interval = interval
+        self.max_overhead = max_overhead
+        self.include_idle = include_idle
+        self.loop = loop
+        self.loop_thread_id = loop_thread_id
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self.overhead = 0.0
+        self.elapsed = 0.0
+        self._labels: Dict = {}
+
+    def _frame_label(self, code) -> str:
+        label = self._labels.get(code)
+        if label is None:
+            # co_qualname is new in Python 3.11
+            name = getattr(code, "co_qualname", code.co_name)
+            label = self._labels[code] = f"{name} ({_short_path(code.co_filename)})"
+        return label
+
+    def _thread_root(self, thread_id: int, names: Dict[int, str]) -> str:
+        root = f"thread:{names.get(thread_id, thread_id)}"
+        if thread_id == self.loop_thread_id and self.loop is not None:
+            # Reading another thread's current task is a plain dict lookup, safe under the GIL
+            task = asyncio.tasks._current_tasks.get(self.loop)
+            if task is None:
+                # Protocol callbacks and timers; a loop waiting for I/O is dropped as idle by its leaf frame
+                return f"{root};(loop callbacks)"
+            return f"{root};task:{task.get_coro().__qualname__}"
+        return root
+
+    def sample_once(self, own_thread_id: int):
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == own_thread_id:
+                continue
+            code = frame.f_code
+            if not self.include_idle and (os.path.basename(code.co_filename), code.co_name) in _IDLE_LEAVES:
+                continue
+            root = self._thread_root(thread_id, names)
+            frames: List[str] = []
+            while frame is not None:
+                frames.append(self._frame_label(frame.f_code))
+                frame = frame.f_back
+            frames.append(root)
+            self.stacks[";".join(reversed(frames))] += 1
+        self.samples += 1
+
+    def run(self, duration: float):
+        """Sample for `duration` seconds; blocks, so call it from a thread."""
+        own_thread_id = threading.get_ident()
+        start = time.perf_counter()
+        deadline = start + duration
+        while True:
+            if time.perf_counter() >= deadline:
+                break
+            sample_start = time.thread_time()
+            self.sample_once(own_thread_id)
+            self.overhead += time.thread_time() - sample_start
+            if self.overhead / self.samples > self.max_overhead * self.interval and self.interval < 1.0:
+                self.interval = min(self.interval * 2, 1.0)
+            time.sleep(min(self.interval, max(0.0, deadline - time.perf_counter())))
+        self.elapsed = time.perf_counter() - start
+
+    def collapsed(self) -> str:
+        """Counted stacks, one "frame;frame;frame count" line each, most frequent first."""
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+_profile_lock = threading.Lock()
+
+
+async def profile_worker(duration: float, interval: float, max_overhead: float, include_idle: bool = False) -> Optional[StackSampler]:
+    """
+    Sample this worker for `duration` seconds without blocking its event loop.
+
+    Returns None when another profile is already running in this process.
+    """
+    if not _profile_lock.acquire(blocking=False):
+        return None
+    try:
+        sampler = StackSampler(interval, max_overhead, include_idle, asyncio.get_running_loop(), threading.get_ident())
+        await asyncio.to_thread(sampler.run, duration)
+        return sampler
+    finally:
+        _profile_lock.release()
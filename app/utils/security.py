@@ -1,8 +1,13 @@
 # app/security.py
-from builtins import Exception, ValueError, bool, int, str
+from builtins import BaseException, Exception, ValueError, bool, int, str
+import asyncio
 import secrets
+import threading
+from concurrent.futures import ThreadPoolExecutor
 import bcrypt
 from logging import getLogger
+from settings.config import settings
+from app.utils.server_timing import timed
 
 # Set up logging
 logger = getLogger(__name__)
@@ -49,5 +54,60 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
         logger.error("Error verifying password: %s", e)
         raise ValueError("Authentication process encountered an unexpected error") from e
 
+class BcryptPool:
+    """
+    Thread pool that runs bcrypt off the event loop.
+
+    A bcrypt round costs a few hundred milliseconds of CPU and would stall every other
+    request on the worker if run inline. The pool is bounded so a burst of logins queues
+    instead of starving the loop's default executor; `pending` and `active` expose the
+    queue depth for metrics.
+    """
+
+    def __init__(self, max_workers: int):
+        self.max_workers = max_workers
+        self.pending = 0  # submitted and not finished, including active
+        self.active = 0  # currently hashing in a worker thread
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="bcrypt")
+
+    def _call(self, func, *args):
+        with self._lock:
+            self.active += 1
+        try:
+            return func(*args)
+        finally:
+            with self._lock:
+                self.active -= 1
+
+    def _finished(self, future):
+        with self._lock:
+            self.pending -= 1
+
+    async def run(self, func, *args):
+        with self._lock:
+            self.pending += 1
+        try:
+            future = self._executor.submit(self._call, func, *args)
+        except BaseException:
+            self._finished(None)
+            raise
+        # Called once the job has run, or once it is dropped from the queue because the
+        # awaiting task was cancelled, which _call would never see
+        future.add_done_callback(self._finished)
+        return await asyncio.wrap_future(future)
+
+bcrypt_pool = BcryptPool(settings.bcrypt_pool_size)
+
+async def hash_password_async(password: str, rounds: int = 12) -> str:
+    """hash_password run on the bcrypt thread pool."""
+    with timed("hash"):
+        return await bcrypt_pool.run(hash_password, password, rounds)
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """verify_password run on the bcrypt thread pool."""
+    with timed("hash"):
+        return await bcrypt_pool.run(verify_password, plain_password, hashed_password)
+
 def generate_verification_token():
     return secrets.token_urlsafe(16)  # Generates a secure 16-byte URL-safe token
\ No newline at end of file
@@ -0,0 +1,38 @@
+from builtins import str
+from typing import Iterable, List
+
+from fastapi.responses import Response
+from pydantic import BaseModel
+
+from app.models.user_model import User
+from app.schemas.user_schemas import UserResponse
+from app.utils.server_timing import timed
+
+USER_RESPONSE_FIELDS = tuple(UserResponse.model_fields)
+
+
+def user_response(user: User) -> UserResponse:
+    """
+    Build a UserResponse from a users row without re-running the schema validators.
+
+    Rows were validated on the way in, so the email, nickname and URL checks are skipped.
+    """
+    return UserResponse.model_construct(**{name: getattr(user, name) for name in USER_RESPONSE_FIELDS})
+
+
+def user_responses(users: Iterable[User]) -> List[UserResponse]:
+    return [user_response(user) for user in users]
+
+
+class ModelJSONResponse(Response):
+    """
+    JSON response for an already built pydantic model.
+
+    The model is serialized to bytes in one pass by pydantic-core. Returning a Response
+    also makes FastAPI skip validating the result against the route's response_model.
+    """
+    media_type = "application/json"
+
+    def render(self, content: BaseModel) -> bytes:
+        with timed("serialize"):
+            return content.__pydantic_serializer__.to_json(content)
@@ -0,0 +1,155 @@
+from builtins import bool, dict, float, getattr, int, str
+import contextlib
+import contextvars
+import logging
+import re
+import time
+from collections import Counter
+from typing import Dict, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+# Phases reported in the Server-Timing header, in this order, when they took any time
+PHASES = ("db", "hash", "serialize", "email")
+
+# Bind parameters ($1, $2::UUID, ...) and the lists an expanding IN renders them into
+_PARAMETER_RE = re.compile(r"\$\d+(?:::[\w\[\]]+)?")
+_PARAMETER_LIST_RE = re.compile(r"\?(?:, \?)+")
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def statement_shape(statement: str) -> str:
+    """Reduce a SQL statement to its shape: whitespace collapsed and parameters replaced by ?."""
+    shape = _PARAMETER_RE.sub("?", _WHITESPACE_RE.sub(" ", statement.strip()))
+    return _PARAMETER_LIST_RE.sub("?", shape)
+
+
+class RequestProfile:
+    """Time spent per phase and the SQL issued while serving one request."""
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.durations: Dict[str, float] = dict.fromkeys(PHASES, 0.0)
+        self.query_count = 0
+        self.commit_count = 0
+        self.statements: Counter = Counter()
+        self.finished = False
+
+    def add(self, phase: str, seconds: float):
+        self.durations[phase] = self.durations.get(phase, 0.0) + seconds
+
+    def server_timing(self) -> str:
+        """Format the profile as a Server-Timing header value (durations in milliseconds)."""
+        parts = [f'db;dur={self.durations["db"] * 1000:.1f};desc="{self.query_count} queries, {self.commit_count} commits"']
+        parts += [f"{phase};dur={self.durations[phase] * 1000:.1f}" for phase in PHASES[1:] if self.durations[phase]]
+        parts.append(f"total;dur={(time.perf_counter() - self.start) * 1000:.1f}")
+        return ", ".join(parts)
+
+
+_current_profile: contextvars.ContextVar[Optional[RequestProfile]] = contextvars.ContextVar("request_profile", default=None)
+
+
+def current_profile() -> Optional[RequestProfile]:
+    """The profile of the request being served, or None outside a request."""
+    profile = _current_profile.get()
+    return profile if profile is not None and not profile.finished else None
+
+
+@contextlib.contextmanager
+def timed(phase: str):
+    """Add the time spent in the block to the current request's `phase`; a no-op outside a request."""
+    profile = current_profile()
+    if profile is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        profile.add(phase, time.perf_counter() - start)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if current_profile() is not None:
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    profile = current_profile()
+    starts = conn.info.get("query_start")
+    if profile is None or not starts:
+        return
+    profile.add("db", time.perf_counter() - starts.pop())
+    profile.query_count += 1
+    profile.statements[statement_shape(statement)] += 1
+
+
+def _commit(conn):
+    profile = current_profile()
+    if profile is not None:
+        profile.commit_count += 1
+
+
+def install_sql_instrumentation():
+    """Count and time statements on every engine, attributing them to the current request."""
+    for name, listener in (("before_cursor_execute", _before_cursor_execute),
+                           ("after_cursor_execute", _after_cursor_execute),
+                           ("commit", _commit)):
+        if not event.contains(Engine, name, listener):
+            event.listen(Engine, name, listener)
+
+
+class ServerTimingMiddleware:
+    """
+    ASGI middleware that profiles each request and reports it in a Server-Timing header.
+
+    SQL is counted and timed through engine events, and code paths wrapped in `timed()`
+    (password hashing, serialization, email) add their own phases. When the response ends,
+    a warning is logged if the route issued more than `query_warning_threshold` statements
+    or ran one statement shape `repeated_statement_threshold` times or more, which is the
+    usual signature of an N+1 query.
+    """
+
+    def __init__(self, app, query_warning_threshold: int = 10, repeated_statement_threshold: int = 5):
+        self.app = app
+        self.query_warning_threshold = query_warning_threshold
+        self.repeated_statement_threshold = repeated_statement_threshold
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        profile = RequestProfile()
+        token = _current_profile.set(profile)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", [])) + [(b"server-timing", profile.server_timing().encode("latin-1"))]
+            elif message["type"] == "http.response.body" and not message.get("more_body", False) and not profile.finished:
+                # Background tasks run after the body; their queries belong to no response
+                profile.finished = True
+                self.check(scope, profile)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current_profile.reset(token)
+
+    def check(self, scope, profile: RequestProfile) -> bool:
+        """Log the warnings for a finished request; returns True if any was logged."""
+        route = scope.get("route")
+        name = f'{scope["method"]} {getattr(route, "path", scope["path"])}'
+        warned = False
+        if profile.query_count > self.query_warning_threshold:
+            logger.warning("%s issued %d SQL statements (threshold %d)", name, profile.query_count, self.query_warning_threshold)
+            warned = True
+        for shape, count in profile.statements.most_common():
+            if count < self.repeated_statement_threshold:
+                break
+            logger.warning("%s ran the same statement %d times, possible N+1 query: %s", name, count, shape[:300])
+            warned = True
+        return warned
@@ -0,0 +1,142 @@
+from builtins import Exception, bool, dict, float, int, isinstance, len, list, str, tuple, type
+import asyncio
+import contextvars
+import logging
+import time
+from collections import OrderedDict, deque
+from datetime import datetime, timezone
+from typing import Deque, Dict, List, Optional, Set
+
+from sqlalchemy import event
+
+from app.utils.server_timing import statement_shape
+
+logger = logging.getLogger(__name__)
+
+# Only these statements are explained; EXPLAIN without ANALYZE plans them without running them
+_EXPLAINABLE = ("SELECT", "INSERT", "UPDATE", "DELETE", "WITH")
+
+
+def parameter_shape(parameters, executemany: bool = False) -> List[str]:
+    """Describe bound parameters by type only, so no user data ends up in the log."""
+    if executemany:
+        rows = list(parameters or ())
+        return [f"{len(rows)} rows of ({', '.join(parameter_shape(rows[0]))})"] if rows else []
+    if isinstance(parameters, dict):
+        return [f"{name}: {type(value).__name__}" for name, value in parameters.items()]
+    shapes = []
+    for value in parameters or ():
+        if isinstance(value, (list, tuple)):
+            shapes.append(f"{type(value).__name__}[{len(value)}]")
+        else:
+            shapes.append(type(value).__name__)
+    return shapes
+
+
+class SlowQuery:
+    """One statement that ran longer than the threshold."""
+
+    def __init__(self, statement: str, parameters: List[str], duration: float):
+        self.statement = statement
+        self.parameters = parameters
+        self.duration = duration
+        self.occurred_at = datetime.now(timezone.utc)
+        self.explain: Optional[str] = None
+
+
+class SlowQueryRecorder:
+    """
+    Logs statements slower than `threshold` seconds and keeps the last `buffer_size` of them.
+
+    Statements are stored normalized, with parameters reduced to their types. With
+    `capture_explain` on, the plan (`EXPLAIN (ANALYZE off)`) of each slow statement shape is
+    fetched on a separate connection in the background and cached by shape, so a route
+    that is slow on every call is explained once, not on every request.
+    """
+
+    def __init__(self, threshold: float = 0.2, capture_explain: bool = True, buffer_size: int = 100):
+        self.threshold = threshold
+        self.capture_explain = capture_explain
+        self.buffer_size = buffer_size
+        self.entries: Deque[SlowQuery] = deque(maxlen=buffer_size)
+        self._plans: "OrderedDict[str, str]" = OrderedDict()
+        self._explaining: Dict[str, List[SlowQuery]] = {}
+        self._tasks: Set[asyncio.Task] = set()
+        self._engine = None
+
+    def install(self, engine):
+        """Start timing statements on an AsyncEngine."""
+        self._engine = engine
+        event.listen(engine.sync_engine, "before_cursor_execute", self._before_cursor_execute)
+        event.listen(engine.sync_engine, "after_cursor_execute", self._after_cursor_execute)
+
+    def uninstall(self, engine):
+        event.remove(engine.sync_engine, "before_cursor_execute", self._before_cursor_execute)
+        event.remove(engine.sync_engine, "after_cursor_execute", self._after_cursor_execute)
+        self._engine = None
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("slow_query_start", []).append(time.perf_counter())
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        starts = conn.info.get("slow_query_start")
+        if not starts:
+            return
+        duration = time.perf_counter() - starts.pop()
+        if duration < self.threshold or statement.lstrip().upper().startswith("EXPLAIN"):
+            return
+        entry = SlowQuery(statement_shape(statement), parameter_shape(parameters, executemany), duration)
+        self.entries.append(entry)
+        logger.warning("Slow query (%.1f ms): %s parameters=%s", duration * 1000, entry.statement, entry.parameters)
+        if self.capture_explain and not executemany:
+            self._request_plan(entry, statement, parameters)
+
+    def _request_plan(self, entry: SlowQuery, statement: str, parameters):
+        plan = self._plans.get(entry.statement)
+        if plan is not None:
+            self._plans.move_to_end(entry.statement)
+            entry.explain = plan
+            return
+        if not statement.lstrip().upper().startswith(_EXPLAINABLE):
+            return
+        waiting = self._explaining.get(entry.statement)
+        if waiting is not None:
+            waiting.append(entry)
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        self._explaining[entry.statement] = [entry]
+        # Created inside a fresh context, so the EXPLAIN stays out of the current request's SQL counts
+        task = contextvars.Context().run(loop.create_task, self._explain(entry.statement, statement, parameters))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _explain(self, shape: str, statement: str, parameters):
+        plan = None
+        try:
+            async with self._engine.connect() as conn:
+                result = await conn.exec_driver_sql(f"EXPLAIN (ANALYZE off) {statement}", parameters)
+                plan = "\n".join(row[0] for row in result)
+        except Exception as e:
+            logger.info("Could not explain slow query %s: %s", shape[:200], e)
+        finally:
+            for entry in self._explaining.pop(shape, []):
+                entry.explain = plan
+        if plan is not None:
+            self._plans[shape] = plan
+            if len(self._plans) > self.buffer_size:
+                self._plans.popitem(last=False)
+
+    async def wait_for_plans(self):
+        """Wait until the pending EXPLAINs have finished."""
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def recent(self) -> List[SlowQuery]:
+        """Recorded slow queries, newest first."""
+        return list(self.entries)[::-1]
+
+    def clear(self):
+        self.entries.clear()
@@ -1,31 +1,145 @@
 # smtp_client.py
-from builtins import Exception, int, str
-import smtplib
+from builtins import Exception, int, len, str
+import asyncio
+import contextlib
+from collections import deque
+from typing import Deque, Optional
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
-from settings.config import settings
+import aiosmtplib
 import logging
 
+logger = logging.getLogger(__name__)
+
+
 class SMTPClient:
-    def __init__(self, server: str, port: int, username: str, password: str):
+    """
+    Asynchronous SMTP client backed by a small pool of authenticated connections.
+
+    Connections are opened (connect, STARTTLS, LOGIN) on demand, kept alive between
+    messages and reused. A connection that sat idle longer than `health_check_after`
+    seconds is checked with NOOP before use, and a send that fails because the server
+    dropped the connection is retried once on a fresh one.
+    """
+
+    def __init__(self, server: str, port: int, username: str, password: str, pool_size: int = 2,
+                 timeout: float = 30.0, health_check_after: float = 10.0, start_tls: Optional[bool] = True,
+                 sender: Optional[str] = None):
         self.server = server
         self.port = port
         self.username = username
         self.password = password
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.health_check_after = health_check_after
+        self.start_tls = start_tls
+        self.sender = sender or username
+        self.connections_opened = 0
+        self.in_use = 0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._idle: Deque[aiosmtplib.SMTP] = deque()
+        self._slots: Optional[asyncio.Semaphore] = None
+
+    def _build_message(self, subject: str, html_content: str, recipient: str) -> MIMEMultipart:
+        message = MIMEMultipart('alternative')
+        message['Subject'] = subject
+        message['From'] = self.sender
+        message['To'] = recipient
+        message.attach(MIMEText(html_content, 'html'))
+        return message
+
+    async def send_email(self, subject: str, html_content: str, recipient: str):
+        message = self._build_message(subject, html_content, recipient)
+        for attempt in (1, 2):
+            connection = await self._acquire()
+            try:
+                await connection.send_message(message)
+            except (aiosmtplib.SMTPServerDisconnected, ConnectionError) as e:
+                self._discard(connection)
+                if attempt == 2:
+                    logger.error("Failed to send email: %s", e)
+                    raise
+                logger.warning("SMTP connection dropped, retrying on a new connection: %s", e)
+            except Exception as e:
+                self._discard(connection)
+                logger.error("Failed to send email: %s", e)
+                raise
+            else:
+                self._release(connection)
+                logger.info("Email sent to %s", recipient)
+                return
+
+    async def close(self):
+        """Quit every idle connection; call on shutdown."""
+        while self._idle:
+            connection = self._idle.pop()
+            with contextlib.suppress(Exception):
+                await connection.quit()
+
+    def _bind_loop(self):
+        # Connections belong to the loop that opened them; start over if the loop changed
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            self._idle.clear()
+            self._slots = asyncio.Semaphore(self.pool_size)
+            self._loop = loop
 
-    def send_email(self, subject: str, html_content: str, recipient: str):
+    async def _acquire(self) -> aiosmtplib.SMTP:
+        self._bind_loop()
+        await self._slots.acquire()
         try:
-            message = MIMEMultipart('alternative')
-            message['Subject'] = subject
-            message['From'] = self.username
-            message['To'] = recipient
-            message.attach(MIMEText(html_content, 'html'))
-
-            with smtplib.SMTP(self.server, self.port) as server:
-                server.starttls()  # Use TLS
-                server.login(self.username, self.password)
-                server.sendmail(self.username, recipient, message.as_string())
-            logging.info(f"Email sent to {recipient}")
-        except Exception as e:
-            logging.error(f"Failed to send email: {str(e)}")
+            connection = None
+            while self._idle and connection is None:
+                candidate = self._idle.pop()
+                if await self._is_healthy(candidate):
+                    connection = candidate
+                else:
+                    self._close_quietly(candidate)
+            if connection is None:
+                connection = await self._connect()
+        except BaseException:
+            self._slots.release()
             raise
+        self.in_use += 1
+        return connection
+
+    @property
+    def idle(self) -> int:
+        """Number of open connections waiting in the pool."""
+        return len(self._idle)
+
+    def _release(self, connection: aiosmtplib.SMTP):
+        connection.last_used = self._loop.time()
+        self._idle.append(connection)
+        self.in_use -= 1
+        self._slots.release()
+
+    def _discard(self, connection: aiosmtplib.SMTP):
+        self._close_quietly(connection)
+        self.in_use -= 1
+        self._slots.release()
+
+    async def _connect(self) -> aiosmtplib.SMTP:
+        connection = aiosmtplib.SMTP(
+            hostname=self.server, port=self.port, timeout=self.timeout, start_tls=self.start_tls,
+            username=self.username or None, password=self.password or None,
+        )
+        await connection.connect()
+        self.connections_opened += 1
+        return connection
+
+    async def _is_healthy(self, connection: aiosmtplib.SMTP) -> bool:
+        if not connection.is_connected:
+            return False
+        if self._loop.time() - connection.last_used < self.health_check_after:
+            return True
+        try:
+            await connection.noop()
+            return True
+        except Exception:
+            return False
+
+    @staticmethod
+    def _close_quietly(connection: aiosmtplib.SMTP):
+        with contextlib.suppress(Exception):
+            connection.close()
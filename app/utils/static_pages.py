@@ -0,0 +1,91 @@
+from builtins import bool, dict, int, str
+import hashlib
+import logging
+from pathlib import Path
+from typing import Dict, Optional
+
+from fastapi import Request
+from fastapi.responses import Response
+
+from app.utils.compression import brotli_compress, gzip_compress, negotiate_encoding
+
+logger = logging.getLogger(__name__)
+
+
+class StaticPage:
+    """An HTML page held in memory together with its precompressed variants."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.load()
+
+    def load(self):
+        raw = self.path.read_bytes()
+        self.mtime = self.path.stat().st_mtime_ns
+        digest = hashlib.sha256(raw).hexdigest()[:32]
+        # Each coding is a different representation, so each gets its own strong ETag
+        self.variants: Dict[str, bytes] = {"identity": raw, "gzip": gzip_compress(raw)}
+        self.etags: Dict[str, str] = {"identity": f'"{digest}"', "gzip": f'"{digest}-gz"'}
+        compressed = brotli_compress(raw)
+        if compressed is not None:
+            self.variants["br"] = compressed
+            self.etags["br"] = f'"{digest}-br"'
+
+    def is_stale(self) -> bool:
+        try:
+            return self.path.stat().st_mtime_ns != self.mtime
+        except OSError:
+            return False
+
+
+class StaticPageCache:
+    """
+    Serves the HTML pages under app/templates from memory.
+
+    Pages are read and compressed once, then answered with a strong ETag, Cache-Control
+    and the best encoding the client accepts. With watch enabled (debug mode) the file
+    mtime is checked on each hit and the page is reloaded when it changes on disk.
+    """
+
+    def __init__(self, templates_dir: Path, cache_control: str = "public, max-age=300", watch: bool = False):
+        self.templates_dir = templates_dir
+        self.cache_control = cache_control
+        self.watch = watch
+        self._pages: Dict[str, StaticPage] = {}
+
+    def load_all(self):
+        """Load every HTML file in the templates directory."""
+        for path in sorted(self.templates_dir.glob("*.html")):
+            self._pages[path.name] = StaticPage(path)
+        logger.info("Loaded %d static pages into memory", len(self._pages))
+
+    def get(self, name: str) -> StaticPage:
+        page = self._pages.get(name)
+        if page is None:
+            page = self._pages[name] = StaticPage(self.templates_dir / name)
+        elif self.watch and page.is_stale():
+            logger.info("Reloading changed static page %s", name)
+            page.load()
+        return page
+
+    def response(self, request: Request, name: str) -> Response:
+        """Build the response for a page, honouring Accept-Encoding and If-None-Match."""
+        page = self.get(name)
+        available = [coding for coding in ("br", "gzip", "identity") if coding in page.variants]
+        encoding = negotiate_encoding(request.headers.get("accept-encoding"), available)
+        etag = page.etags[encoding]
+        headers = {"ETag": etag, "Cache-Control": self.cache_control, "Vary": "Accept-Encoding"}
+        if _etag_matches(request.headers.get("if-none-match"), etag):
+            return Response(status_code=304, headers=headers)
+        if encoding != "identity":
+            headers["Content-Encoding"] = encoding
+        return Response(content=page.variants[encoding], media_type="text/html; charset=utf-8", headers=headers)
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (tag.strip().removeprefix("W/") for tag in if_none_match.split(","))
+    return etag in candidates
@@ -0,0 +1,164 @@
+"""
+Logging pipeline that keeps log I/O off the event loop.
+
+Records are put on a bounded queue by `NonBlockingQueueHandler` and written by a
+`QueueListener` thread through the handlers configured in logging.conf. When the queue is
+full, records are dropped and counted instead of blocking the request.
+
+Conventions for application code:
+- Pass values as arguments, `logger.info("User %s updated", user_id)`, never as f-strings,
+  so records filtered out by level or sampling are never formatted.
+- Noisy info logs can be sampled per logger with the `log_sample_rates` setting; warnings
+  and errors are always kept.
+"""
+from builtins import bool, dict, float, getattr, len, list, str, vars
+import contextvars
+import copy
+import json
+import logging
+import logging.handlers
+import queue
+import random
+import uuid
+from datetime import datetime, timezone
+from typing import Dict, Optional
+
+from starlette.datastructures import Headers
+
+_request_id: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("request_id", default=None)
+
+# Attributes every LogRecord has; anything else was passed with `extra=` and is logged as a field
+_RECORD_ATTRIBUTES = frozenset(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime", "request_id"}
+_exception_formatter = logging.Formatter()
+
+
+def current_request_id() -> Optional[str]:
+    return _request_id.get()
+
+
+class RequestIdFilter(logging.Filter):
+    """Stamps each record with the id of the request being served, in the thread that logs it."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = _request_id.get()
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keeps only a fraction of INFO and lower records for the configured loggers.
+
+    `rates` maps logger names to the fraction kept; a rate applies to the logger and its
+    children, with the longest matching name winning. WARNING and above always pass.
+    """
+
+    def __init__(self, rates: Dict[str, float]):
+        super().__init__()
+        self.rates = dict(rates)
+        self._resolved: Dict[str, float] = {}
+
+    def rate_for(self, name: str) -> float:
+        rate = self._resolved.get(name)
+        if rate is None:
+            rate = 1.0
+            candidate = name
+            while candidate:
+                if candidate in self.rates:
+                    rate = self.rates[candidate]
+                    break
+                candidate = candidate.rpartition(".")[0]
+            self._resolved[name] = rate
+        return rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING or not self.rates:
+            return True
+        rate = self.rate_for(record.name)
+        return rate >= 1.0 or random.random() < rate
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler that never waits: when the bounded queue is full the record is dropped
+    and counted in `dropped`.
+
+    The message is merged with its arguments here, in the logging thread, because the
+    arguments may change before the writer thread gets to them. Tracebacks are rendered
+    to text for the same reason.
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = _exception_formatter.formatException(record.exc_info)
+            record.exc_info = None
+        record.stack_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class JsonFormatter(logging.Formatter):
+    """Formats a record as one JSON object per line, including the request id and `extra=` fields."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "timestamp": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        request_id = getattr(record, "request_id", None)
+        if request_id:
+            entry["request_id"] = request_id
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRIBUTES:
+                entry[key] = value
+        return json.dumps(entry, default=str)
+
+
+class RequestIdMiddleware:
+    """
+    ASGI middleware that gives every request an id for its log records.
+
+    An incoming X-Request-ID header is reused when it looks sane, so ids can be followed
+    across services; otherwise a new one is generated. The id is echoed in the response.
+    """
+
+    header = "x-request-id"
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        request_id = Headers(scope=scope).get(self.header)
+        if not request_id or len(request_id) > 128 or not request_id.isprintable():
+            request_id = uuid.uuid4().hex
+        token = _request_id.set(request_id)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", [])) + [(b"x-request-id", request_id.encode("latin-1"))]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _request_id.reset(token)
@@ -1,11 +1,49 @@
-import markdown2
+from builtins import dict, int, len, str
+import html
+import re
 from pathlib import Path
+from string import Formatter
+from typing import Dict, List, Optional, Tuple
+
+# Stands in for each placeholder while the template goes through markdown; plain
+# alphanumerics pass through markdown2 untouched, even inside link targets
+_PLACEHOLDER = "TMPLFIELD{}X"
+_PLACEHOLDER_RE = re.compile(r"TMPLFIELD(\d+)X")
+_formatter = Formatter()
+
+
+class CompiledTemplate:
+    """
+    An email template rendered to styled HTML once, with placeholders left as slots.
+
+    `parts` alternates literal HTML and (field name, conversion, format spec) slots, so
+    rendering is a join over the parts. Substituted values are HTML-escaped rather than
+    run through markdown.
+    """
+
+    def __init__(self, parts: List, mtimes: Tuple[int, ...]):
+        self.parts = parts
+        self.mtimes = mtimes
+
+    def render(self, context: Dict) -> str:
+        chunks = []
+        for part in self.parts:
+            if isinstance(part, str):
+                chunks.append(part)
+                continue
+            field_name, conversion, format_spec = part
+            value, _ = _formatter.get_field(field_name, (), context)
+            value = _formatter.format_field(_formatter.convert_field(value, conversion), format_spec)
+            chunks.append(html.escape(value))
+        return "".join(chunks)
+
 
 class TemplateManager:
-    def __init__(self):
+    def __init__(self, templates_dir: Optional[Path] = None):
         # Dynamically determine the root path of the project
         self.root_dir = Path(__file__).resolve().parent.parent.parent  # Adjust this depending on the structure
-        self.templates_dir = self.root_dir / 'email_templates'
+        self.templates_dir = Path(templates_dir) if templates_dir else self.root_dir / 'email_templates'
+        self._compiled: Dict[str, CompiledTemplate] = {}
 
     def _read_template(self, filename: str) -> str:
         """Private method to read template content."""
@@ -32,15 +70,43 @@ class TemplateManager:
                 styled_html = styled_html.replace(f'<{tag}>', f'<{tag} style="{style}">')
         return styled_html
 
-    def render_template(self, template_name: str, **context) -> str:
-        """Render a markdown template with given context, applying advanced email styles."""
-        header = self._read_template('header.md')
-        footer = self._read_template('footer.md')
+    def _template_files(self, template_name: str) -> Tuple[Path, ...]:
+        return (self.templates_dir / 'header.md', self.templates_dir / f'{template_name}.md', self.templates_dir / 'footer.md')
+
+    def _mtimes(self, template_name: str) -> Tuple[int, ...]:
+        return tuple(path.stat().st_mtime_ns for path in self._template_files(template_name))
 
-        # Read main template and format it with provided context
-        main_template = self._read_template(f'{template_name}.md')
-        main_content = main_template.format(**context)
+    def compile_template(self, template_name: str) -> CompiledTemplate:
+        """Render header, body and footer to styled HTML once, leaving the body's placeholders as slots."""
+        mtimes = self._mtimes(template_name)
+        header, main_template, footer = (path.read_text(encoding='utf-8') for path in self._template_files(template_name))
+
+        # Swap each {field} for a sentinel so markdown and styling run over the static text only
+        fields = []
+        markdown_parts = []
+        for literal, field_name, format_spec, conversion in _formatter.parse(main_template):
+            markdown_parts.append(literal)
+            if field_name is not None:
+                markdown_parts.append(_PLACEHOLDER.format(len(fields)))
+                fields.append((field_name, conversion, format_spec))
+        main_content = "".join(markdown_parts)
 
         full_markdown = f"{header}\n{main_content}\n{footer}"
-        html_content = markdown2.markdown(full_markdown)
-        return self._apply_email_styles(html_content)
+        import markdown2  # imported on first compile to keep it out of app start-up
+
+        styled_html = self._apply_email_styles(markdown2.markdown(full_markdown))
+        pieces = _PLACEHOLDER_RE.split(styled_html)
+        # split() alternates literal HTML and captured field indexes
+        parts = [piece if i % 2 == 0 else fields[int(piece)] for i, piece in enumerate(pieces)]
+        return CompiledTemplate([part for part in parts if part != ""], mtimes)
+
+    def get_template(self, template_name: str) -> CompiledTemplate:
+        """Return the compiled template, recompiling it when any of its files changed on disk."""
+        compiled = self._compiled.get(template_name)
+        if compiled is None or compiled.mtimes != self._mtimes(template_name):
+            compiled = self._compiled[template_name] = self.compile_template(template_name)
+        return compiled
+
+    def render_template(self, template_name: str, **context) -> str:
+        """Render a markdown template with given context, applying advanced email styles."""
+        return self.get_template(template_name).render(context)
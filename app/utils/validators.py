@@ -1,5 +1,4 @@
 from builtins import bool, str
-from email_validator import validate_email, EmailNotValidError
 
 def validate_email_address(email: str) -> bool:
     """
@@ -11,6 +10,8 @@ def validate_email_address(email: str) -> bool:
     Returns:
         bool: True if the email is valid, otherwise False.
     """
+    from email_validator import validate_email, EmailNotValidError  # imported on first use
+
     try:
         # Validate and get info
         validate_email(email)
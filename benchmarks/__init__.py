@@ -0,0 +1,7 @@
+"""
+Performance benchmarks for the user management API.
+
+Each module is runnable on its own, e.g. ``python -m benchmarks.bench_compression``,
+and can write its results as JSON with ``--output results.json``. Stored runs to compare
+against live in ``benchmarks/baselines``.
+"""
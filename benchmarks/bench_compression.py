@@ -0,0 +1,41 @@
+"""
+Compression cost and ratio for representative GET /users/ pages.
+
+Run with ``python -m benchmarks.bench_compression``. For every page size the raw JSON
+is compressed at several gzip levels and brotli qualities, reporting the compressed
+size, the ratio and the time per response. Use it to pick the compression settings.
+"""
+from builtins import dict, len
+import json
+
+from app.utils.compression import brotli_available, brotli_compress, gzip_compress
+from benchmarks.common import argument_parser, sample_user_page, time_per_call, write_results
+
+PAGE_SIZES = (1, 10, 50, 100, 500)
+GZIP_LEVELS = (1, 6, 9)
+BROTLI_QUALITIES = (1, 4, 6, 11)
+
+
+def run():
+    results = []
+    for size in PAGE_SIZES:
+        body = json.dumps(sample_user_page(size)).encode()
+        codecs = [(f"gzip-{level}", lambda level=level: gzip_compress(body, level)) for level in GZIP_LEVELS]
+        if brotli_available():
+            codecs += [(f"br-{quality}", lambda quality=quality: brotli_compress(body, quality)) for quality in BROTLI_QUALITIES]
+        for codec, compress in codecs:
+            compressed = compress()
+            results.append({
+                "page_size": size,
+                "codec": codec,
+                "raw_bytes": len(body),
+                "compressed_bytes": len(compressed),
+                "ratio": len(body) / len(compressed),
+                "usec_per_response": time_per_call(compress) * 1e6,
+            })
+    return results
+
+
+if __name__ == "__main__":
+    args = argument_parser(__doc__).parse_args()
+    write_results("compression", run(), args.output)
@@ -0,0 +1,30 @@
+"""
+Per-request cost of the settings and email service dependencies.
+
+Run with ``python -m benchmarks.bench_dependencies``. Compares building ``Settings()``
+and a fresh ``TemplateManager``/``EmailService`` per request, which is what
+``get_settings`` and ``get_email_service`` used to do, with the shared service container.
+"""
+from app.dependencies import get_email_service, get_settings
+from app.services.email_service import EmailService
+from app.utils.template_manager import TemplateManager
+from settings.config import Settings
+from benchmarks.common import argument_parser, time_per_call, write_results
+
+
+def run():
+    cases = (
+        ("get_settings", lambda: Settings(), get_settings),
+        ("get_email_service", lambda: EmailService(template_manager=TemplateManager()), get_email_service),
+    )
+    results = []
+    for name, per_request, shared in cases:
+        old = time_per_call(per_request)
+        new = time_per_call(shared)
+        results.append({"dependency": name, "per_request_usec": old * 1e6, "container_usec": new * 1e6})
+    return results
+
+
+if __name__ == "__main__":
+    args = argument_parser(__doc__).parse_args()
+    write_results("dependencies", run(), args.output)
@@ -0,0 +1,121 @@
+"""
+Micro-benchmarks of the functions most requests go through.
+
+Run with ``python -m benchmarks.bench_hot_paths``; ``--only jwt`` runs the cases whose
+name contains "jwt". Each case is timed in several rounds with garbage collection off and
+reported as the best and median microseconds per call, plus the spread between the
+slowest and fastest round, which shows how far a single number can be trusted.
+
+With ``--baseline benchmarks/baselines/hot_paths.json`` the best times are compared with
+a stored run and the command exits with status 1 when a case got slower by more than
+``--max-regression``. The best round is compared rather than the median because noise
+on a shared machine only ever adds time.
+"""
+from builtins import dict, max, min, print, sorted, str
+import statistics
+import sys
+import uuid
+from datetime import datetime, timezone
+
+from fastapi import Request
+
+from app.main import app
+from app.models.user_model import User, UserRole
+from app.schemas.user_schemas import UserCreate, UserResponse, UserUpdate
+from app.services.jwt_service import create_access_token, decode_token
+from app.utils.link_generation import create_user_links, generate_pagination_links
+from app.utils.nickname_gen import generate_nickname
+from app.utils.security import hash_password, verify_password
+from app.utils.template_manager import TemplateManager
+from benchmarks.common import argument_parser, find_regressions, load_baseline, per_call_rounds, write_results
+
+PASSWORD = "MySuperPassword$1234"
+USER_ID = uuid.UUID(int=1)
+USER_DATA = {
+    "email": "john.doe@example.com",
+    "nickname": "clever_panda_123",
+    "first_name": "John",
+    "last_name": "Doe",
+    "bio": "Experienced software developer specializing in web applications.",
+    "profile_picture_url": "https://example.com/profiles/john.jpg",
+    "linkedin_profile_url": "https://linkedin.com/in/johndoe",
+    "github_profile_url": "https://github.com/johndoe",
+    "role": "AUTHENTICATED",
+}
+EMAIL_CONTEXT = {
+    "name": "John",
+    "verification_url": f"http://localhost/verify-email/{USER_ID}/AbCdEf123456",
+    "email": "john.doe@example.com",
+}
+
+
+def make_request() -> Request:
+    scope = {
+        "type": "http", "app": app, "router": app.router, "method": "GET", "scheme": "http",
+        "server": ("testserver", 80), "root_path": "", "path": "/users/", "query_string": b"skip=20&limit=10",
+        "headers": [(b"host", b"testserver")],
+    }
+    return Request(scope)
+
+
+def make_user() -> User:
+    now = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    return User(id=USER_ID, hashed_password="x", email_verified=True, is_locked=False, is_professional=False,
+                created_at=now, updated_at=now, **dict(USER_DATA, role=UserRole.AUTHENTICATED))
+
+
+def cases():
+    """(name, function) pairs; the fixtures each function needs are built here, outside the timing."""
+    hashed = hash_password(PASSWORD)
+    token = create_access_token(data={"sub": str(USER_ID), "role": "ADMIN"})
+    request = make_request()
+    templates = TemplateManager()
+    templates.render_template("email_verification", **EMAIL_CONTEXT)  # compile once, as a running worker has
+    user = make_user()
+    return [
+        ("hash_password", lambda: hash_password(PASSWORD)),
+        ("verify_password", lambda: verify_password(PASSWORD, hashed)),
+        ("create_access_token", lambda: create_access_token(data={"sub": str(USER_ID), "role": "ADMIN"})),
+        ("decode_token", lambda: decode_token(token)),
+        ("create_user_links", lambda: create_user_links(USER_ID, request)),
+        ("generate_pagination_links", lambda: generate_pagination_links(request, 20, 10, 1000)),
+        ("render_template", lambda: templates.render_template("email_verification", **EMAIL_CONTEXT)),
+        ("generate_nickname", generate_nickname),
+        ("UserCreate", lambda: UserCreate(**USER_DATA, password=PASSWORD)),
+        ("UserUpdate", lambda: UserUpdate(bio="Updated bio", first_name="Jane")),
+        ("UserResponse from ORM", lambda: UserResponse.model_validate(user)),
+    ]
+
+
+def run(only: str = None, rounds: int = 7, min_time: float = 0.2):
+    results = []
+    for name, func in cases():
+        if only and only.lower() not in name.lower():
+            continue
+        timings = per_call_rounds(func, min_time, rounds)
+        best, median = min(timings), statistics.median(timings)
+        results.append({
+            "case": name,
+            "usec_best": best * 1e6,
+            "usec_median": median * 1e6,
+            "spread_pct": (max(timings) - best) / best * 100,
+            "calls_per_sec": 1 / median,
+        })
+    return results
+
+
+if __name__ == "__main__":
+    parser = argument_parser(__doc__)
+    parser.add_argument("--only", help="Run only the cases whose name contains this text")
+    parser.add_argument("--rounds", type=int, default=7, help="Timing rounds per case")
+    parser.add_argument("--min-time", type=float, default=0.2, help="Minimum seconds per round")
+    parser.add_argument("--baseline", help="Results file to compare with")
+    parser.add_argument("--max-regression", type=float, default=0.25, help="Allowed growth of the best time per call, as a fraction")
+    args = parser.parse_args()
+    results = run(args.only, args.rounds, args.min_time)
+    write_results("hot_paths", results, args.output)
+    if args.baseline:
+        regressions = find_regressions(results, load_baseline(args.baseline), "case", max_increase={"usec_best": args.max_regression})
+        for regression in sorted(regressions):
+            print(f"REGRESSION {regression}")
+        sys.exit(1 if regressions else 0)
@@ -0,0 +1,53 @@
+"""
+Per-user cost of HATEOAS link generation on a 100-item page.
+
+Run with ``python -m benchmarks.bench_links``. Compares the previous implementation,
+which called ``request.url_for`` and validated a ``Link`` model for every link, with
+``create_user_links``, which formats precompiled route templates into constructed models.
+"""
+from builtins import len, range, str
+import uuid
+
+from fastapi import Request
+
+from app.main import app
+from app.schemas.link_schema import Link
+from app.utils.link_generation import USER_ACTIONS, create_user_links, generate_pagination_links
+from benchmarks.common import argument_parser, time_per_call, write_results
+
+PAGE_SIZE = 100
+
+
+def make_request() -> Request:
+    scope = {
+        "type": "http", "app": app, "router": app.router, "method": "GET", "scheme": "http",
+        "server": ("testserver", 80), "root_path": "", "path": "/users/", "query_string": b"skip=0&limit=100",
+        "headers": [(b"host", b"testserver")],
+    }
+    return Request(scope)
+
+
+def legacy_create_user_links(user_id, request: Request):
+    return [
+        Link(rel=rel, href=str(request.url_for(route_name, user_id=str(user_id))), action=action)
+        for rel, route_name, method, action in USER_ACTIONS
+    ]
+
+
+def run():
+    user_ids = [uuid.uuid4() for _ in range(PAGE_SIZE)]
+    results = []
+    for name, func in (("url_for + validate", legacy_create_user_links), ("precompiled", create_user_links)):
+        request = make_request()
+        page = lambda: [func(user_id, request) for user_id in user_ids]
+        seconds = time_per_call(page)
+        results.append({"implementation": name, "usec_per_page": seconds * 1e6, "usec_per_user": seconds * 1e6 / PAGE_SIZE})
+    request = make_request()
+    seconds = time_per_call(lambda: generate_pagination_links(request, 0, PAGE_SIZE, 1000))
+    results.append({"implementation": "pagination links", "usec_per_page": seconds * 1e6, "usec_per_user": seconds * 1e6 / PAGE_SIZE})
+    return results
+
+
+if __name__ == "__main__":
+    args = argument_parser(__doc__).parse_args()
+    write_results("links", run(), args.output)
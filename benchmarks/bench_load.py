@@ -0,0 +1,198 @@
+"""
+Concurrent load test of the user API.
+
+Run with ``python -m benchmarks.bench_load``. Seeds ``--users`` verified users in the
+database at DATABASE_URL, then ``--concurrency`` clients send a weighted mix of
+``POST /login/``, ``GET /users/``, ``GET /users/{id}``, ``PUT /users/{id}`` and
+``POST /register/`` for ``--duration`` seconds, after a warmup. Requests go to the ASGI
+app in process, or to a running server with ``--url`` (which must use the same database).
+Reports requests per second and p50/p95/p99 latency per endpoint; requests turned away
+by admission control (503) are counted as rejected and left out of the latencies. The
+seeded and registered users are deleted afterwards.
+
+With ``--baseline benchmarks/baselines/load.json`` the results are compared with a
+stored run and the command exits with status 1 when an endpoint's p95 latency grew or
+its throughput dropped by more than ``--max-regression``. Record a new baseline with
+``--output benchmarks/baselines/load.json``.
+"""
+from builtins import dict, float, getattr, int, len, list, print, range, str, sum
+import asyncio
+import random
+import statistics
+import sys
+import time
+import uuid
+from typing import Dict, List
+
+from httpx import AsyncClient
+from sqlalchemy import delete, insert, select
+
+from app.database import Base, Database
+from app.main import app
+from app.models.email_outbox_model import EmailOutbox
+from app.models.user_model import User, UserRole
+from app.services.container import container
+from app.services.jwt_service import create_access_token
+from app.utils.security import hash_password
+from benchmarks.common import argument_parser, find_regressions, load_baseline, write_results
+from settings.config import settings
+
+PASSWORD = "MySuperPassword$1234"
+# Share of requests per scenario; reads dominate, as they do in production
+SCENARIOS = {
+    "login": 0.15,
+    "list_users": 0.20,
+    "get_user": 0.35,
+    "update_user": 0.20,
+    "register": 0.10,
+}
+
+
+class LoadTest:
+    def __init__(self, client: AsyncClient, user_ids: List[str], emails: List[str], admin_token: str, run_id: str, seed: int):
+        self.client = client
+        self.user_ids = user_ids
+        self.emails = emails
+        self.admin_headers = {"Authorization": f"Bearer {admin_token}"}
+        self.run_id = run_id
+        self.random = random.Random(seed)
+        self.registered = 0
+        self.latencies: Dict[str, List[float]] = {name: [] for name in SCENARIOS}
+        self.errors: Dict[str, int] = dict.fromkeys(SCENARIOS, 0)
+        self.rejected: Dict[str, int] = dict.fromkeys(SCENARIOS, 0)
+
+    async def login(self):
+        form = {"username": self.random.choice(self.emails), "password": PASSWORD}
+        return await self.client.post("/login/", data=form)
+
+    async def list_users(self):
+        return await self.client.get("/users/", params={"skip": self.random.randrange(len(self.user_ids)), "limit": 10}, headers=self.admin_headers)
+
+    async def get_user(self):
+        return await self.client.get(f"/users/{self.random.choice(self.user_ids)}", headers=self.admin_headers)
+
+    async def update_user(self):
+        body = {"bio": f"Updated at {time.time():.6f}"}
+        return await self.client.put(f"/users/{self.random.choice(self.user_ids)}", json=body, headers=self.admin_headers)
+
+    async def register(self):
+        self.registered += 1
+        body = {"email": f"load-{self.run_id}-new{self.registered}@example.com", "password": PASSWORD,
+                "nickname": f"load_{self.run_id}_new{self.registered}", "role": "AUTHENTICATED"}
+        return await self.client.post("/register/", json=body)
+
+    async def worker(self, deadline: float, record: bool):
+        names, weights = list(SCENARIOS), list(SCENARIOS.values())
+        while time.perf_counter() < deadline:
+            name = self.random.choices(names, weights)[0]
+            start = time.perf_counter()
+            response = await getattr(self, name)()
+            elapsed = time.perf_counter() - start
+            if not record:
+                continue
+            if response.status_code == 503:
+                self.rejected[name] += 1
+                continue
+            self.latencies[name].append(elapsed)
+            if response.status_code >= 400:
+                self.errors[name] += 1
+
+    async def run(self, concurrency: int, duration: float, record: bool = True) -> float:
+        deadline = time.perf_counter() + duration
+        start = time.perf_counter()
+        await asyncio.gather(*(self.worker(deadline, record) for _ in range(concurrency)))
+        return time.perf_counter() - start
+
+
+def summarize(name: str, latencies: List[float], errors: int, rejected: int, elapsed: float) -> Dict:
+    if len(latencies) < 2:
+        return {"scenario": name, "requests": len(latencies), "errors": errors, "rejected": rejected,
+                "rps": len(latencies) / elapsed, "p50_ms": 0.0, "p95_ms": 0.0, "p99_ms": 0.0}
+    cuts = statistics.quantiles(latencies, n=100, method="inclusive")
+    return {
+        "scenario": name,
+        "requests": len(latencies),
+        "errors": errors,
+        "rejected": rejected,
+        "rps": len(latencies) / elapsed,
+        "p50_ms": cuts[49] * 1000,
+        "p95_ms": cuts[94] * 1000,
+        "p99_ms": cuts[98] * 1000,
+    }
+
+
+async def seed_users(session_factory, run_id: str, count: int):
+    # One hash for every user: seeding should not take longer than the test itself
+    hashed = hash_password(PASSWORD)
+    rows = [{
+        "id": uuid.uuid4(),
+        "email": f"load-{run_id}-{index}@example.com",
+        "nickname": f"load_{run_id}_{index}",
+        "first_name": "Load",
+        "last_name": f"User{index}",
+        "role": UserRole.ADMIN if index == 0 else UserRole.AUTHENTICATED,
+        "email_verified": True,
+        "is_locked": False,
+        "failed_login_attempts": 0,
+        "hashed_password": hashed,
+    } for index in range(count)]
+    async with session_factory() as session:
+        await session.execute(insert(User), rows)
+        await session.commit()
+    return [str(row["id"]) for row in rows], [row["email"] for row in rows]
+
+
+async def remove_users(session_factory, run_id: str):
+    pattern = f"load-{run_id}-%"
+    async with session_factory() as session:
+        await session.execute(delete(EmailOutbox).where(EmailOutbox.recipient.like(pattern)))
+        await session.execute(delete(User).where(User.email.like(pattern)))
+        await session.commit()
+
+
+async def run(users: int, concurrency: int, duration: float, warmup: float, url: str = None, seed: int = 0) -> List[Dict]:
+    Database.initialize(settings.database_url)
+    session_factory = Database.get_session_factory()
+    async with Database.get_engine().begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    container.startup()
+    run_id = uuid.uuid4().hex[:8]
+    user_ids, emails = await seed_users(session_factory, run_id, users)
+    async with session_factory() as session:
+        admin_id = (await session.execute(select(User.id).where(User.email == emails[0]))).scalar_one()
+    admin_token = create_access_token(data={"sub": str(admin_id), "role": UserRole.ADMIN.name})
+    client = AsyncClient(base_url=url) if url else AsyncClient(app=app, base_url="http://loadtest")
+    try:
+        async with client:
+            test = LoadTest(client, user_ids, emails, admin_token, run_id, seed)
+            await test.run(concurrency, warmup, record=False)
+            elapsed = await test.run(concurrency, duration)
+    finally:
+        await remove_users(session_factory, run_id)
+        await container.shutdown()
+    results = [summarize(name, test.latencies[name], test.errors[name], test.rejected[name], elapsed) for name in SCENARIOS]
+    every = [latency for latencies in test.latencies.values() for latency in latencies]
+    results.append(summarize("total", every, sum(test.errors.values()), sum(test.rejected.values()), elapsed))
+    return results
+
+
+if __name__ == "__main__":
+    parser = argument_parser(__doc__)
+    parser.add_argument("--users", type=int, default=500, help="Users seeded before the run")
+    parser.add_argument("--concurrency", type=int, default=20, help="Clients sending requests at the same time")
+    parser.add_argument("--duration", type=float, default=20.0, help="Seconds of measured load")
+    parser.add_argument("--warmup", type=float, default=3.0, help="Seconds of load before measuring")
+    parser.add_argument("--url", help="Base URL of a running server instead of the in-process app")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the request mix")
+    parser.add_argument("--baseline", help="Results file to compare with")
+    parser.add_argument("--max-regression", type=float, default=0.2, help="Allowed p95 latency growth and throughput drop, as a fraction")
+    args = parser.parse_args()
+    results = asyncio.run(run(args.users, args.concurrency, args.duration, args.warmup, args.url, args.seed))
+    write_results("load", results, args.output)
+    if args.baseline:
+        regressions = find_regressions(results, load_baseline(args.baseline), "scenario",
+                                       max_increase={"p95_ms": args.max_regression},
+                                       max_decrease={"rps": args.max_regression})
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        sys.exit(1 if regressions else 0)
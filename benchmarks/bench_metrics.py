@@ -0,0 +1,57 @@
+"""
+Per-request overhead of MetricsMiddleware.
+
+Run with ``python -m benchmarks.bench_metrics``. Drives a bare ASGI endpoint directly,
+without a server or the rest of the middleware stack, with and without the metrics
+middleware in front of it, for a route early in the table, a route late in the table and
+an unmatched path.
+"""
+from builtins import range
+import asyncio
+
+from app.main import app
+from app.utils.metrics import MetricsMiddleware
+from benchmarks.common import argument_parser, time_per_call, write_results
+
+REQUESTS_PER_ROUND = 1000
+PATHS = [
+    ("/users/{user_id}", "/users/00000000-0000-0000-0000-000000000001"),
+    ("/notifications/bulk/{job_id}", "/notifications/bulk/00000000-0000-0000-0000-000000000001"),
+    ("unmatched", "/does/not/exist"),
+]
+
+
+async def endpoint(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"{}"})
+
+
+async def receive():
+    return {"type": "http.request", "body": b"", "more_body": False}
+
+
+async def send(message):
+    pass
+
+
+def run():
+    loop = asyncio.new_event_loop()
+    middleware = MetricsMiddleware(endpoint)
+    results = []
+    for label, path in PATHS:
+        scope = {"type": "http", "method": "GET", "path": path, "app": app, "headers": []}
+
+        async def requests(asgi_app):
+            for _ in range(REQUESTS_PER_ROUND):
+                await asgi_app(scope, receive, send)
+
+        bare = time_per_call(lambda: loop.run_until_complete(requests(endpoint))) / REQUESTS_PER_ROUND
+        measured = time_per_call(lambda: loop.run_until_complete(requests(middleware))) / REQUESTS_PER_ROUND
+        results.append({"route": label, "usec_bare": bare * 1e6, "usec_metrics": measured * 1e6, "usec_overhead": (measured - bare) * 1e6})
+    loop.close()
+    return results
+
+
+if __name__ == "__main__":
+    args = argument_parser(__doc__).parse_args()
+    write_results("metrics", run(), args.output)
@@ -0,0 +1,67 @@
+"""
+GET /users/ serialization cost: validated path versus the trusted fast path.
+
+Run with ``python -m benchmarks.bench_serialization``. The old path mirrors what
+list_users used to do: ``UserResponse.model_validate`` per row, FastAPI validating the
+result against ``response_model`` again, ``jsonable_encoder`` and stdlib ``json``.
+The new path constructs the models without validation and serializes with pydantic-core.
+"""
+from builtins import len, range
+import json
+import uuid
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+from app.models.user_model import User, UserRole
+from app.schemas.user_schemas import UserListResponse, UserResponse
+from app.utils.serialization import ModelJSONResponse, user_responses
+from benchmarks.common import argument_parser, time_per_call, write_results
+
+PAGE_SIZES = (10, 100, 1000)
+response_adapter = TypeAdapter(UserListResponse)
+
+
+def make_users(count: int):
+    return [
+        User(
+            id=uuid.uuid4(), email=f"user{index}@example.com", nickname=f"clever_panda_{index}",
+            first_name="John", last_name="Doe", bio="Experienced software developer specializing in web applications.",
+            profile_picture_url=f"https://example.com/profiles/{index}.jpg",
+            linkedin_profile_url=f"https://linkedin.com/in/user{index}",
+            github_profile_url=f"https://github.com/user{index}",
+            role=UserRole.AUTHENTICATED, is_professional=False,
+        )
+        for index in range(count)
+    ]
+
+
+def validated_path(users) -> bytes:
+    items = [UserResponse.model_validate(user) for user in users]
+    page = UserListResponse(items=items, total=len(items), page=1, size=len(items))
+    # What FastAPI does with a response_model: validate, dump to JSON-able data, json.dumps
+    validated = response_adapter.validate_python(page, from_attributes=True)
+    content = jsonable_encoder(response_adapter.dump_python(validated, mode="json"))
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
+def trusted_path(users) -> bytes:
+    items = user_responses(users)
+    page = UserListResponse.model_construct(items=items, total=len(items), page=1, size=len(items))
+    return ModelJSONResponse(page).body
+
+
+def run():
+    results = []
+    for size in PAGE_SIZES:
+        users = make_users(size)
+        assert json.loads(validated_path(users)) == json.loads(trusted_path(users))
+        old = time_per_call(lambda: validated_path(users))
+        new = time_per_call(lambda: trusted_path(users))
+        results.append({"page_size": size, "validated_usec": old * 1e6, "trusted_usec": new * 1e6, "speedup": old / new})
+    return results
+
+
+if __name__ == "__main__":
+    args = argument_parser(__doc__).parse_args()
+    write_results("serialization", run(), args.output)
@@ -0,0 +1,66 @@
+"""
+Cold-start import budget for app.main.
+
+Run with ``python -m benchmarks.bench_startup [--runs 5] [--top 25] [--budget-ms 1500]``.
+Imports ``app.main`` in fresh interpreters with ``-X importtime`` and reports the median
+self and cumulative import time per module, slowest first. With ``--budget-ms`` the
+command exits non-zero when the median total exceeds the budget, so CI can enforce it.
+"""
+from builtins import dict, int, len, sorted
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from benchmarks.common import argument_parser, write_results
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+TARGET = "app.main"
+
+
+def import_times(module: str = TARGET) -> Dict[str, Tuple[int, int]]:
+    """Import module in a fresh interpreter and return {module: (self_us, cumulative_us)}."""
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT_DIR, capture_output=True, text=True, check=True,
+    )
+    times = {}
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        times[name.strip()] = (int(self_us), int(cumulative_us))
+    return times
+
+
+def profile(runs: int) -> List[Dict]:
+    samples = defaultdict(list)
+    for _ in range(runs):
+        for name, timing in import_times().items():
+            samples[name].append(timing)
+    rows = []
+    for name, timings in samples.items():
+        rows.append({
+            "module": name,
+            "self_ms": statistics.median(self_us for self_us, _ in timings) / 1000,
+            "cumulative_ms": statistics.median(cumulative_us for _, cumulative_us in timings) / 1000,
+        })
+    return sorted(rows, key=lambda row: row["cumulative_ms"], reverse=True)
+
+
+if __name__ == "__main__":
+    parser = argument_parser(__doc__)
+    parser.add_argument("--runs", type=int, default=5, help="Number of fresh interpreters to sample")
+    parser.add_argument("--top", type=int, default=25, help="Number of modules to show")
+    parser.add_argument("--budget-ms", type=float, help="Fail when importing app.main takes longer than this")
+    args = parser.parse_args()
+
+    rows = profile(args.runs)
+    total_ms = next(row["cumulative_ms"] for row in rows if row["module"] == TARGET)
+    write_results("startup", rows[:args.top], args.output)
+    print(f"\nimport {TARGET}: {total_ms:.1f} ms (median of {args.runs})")
+    if args.budget_ms is not None and total_ms > args.budget_ms:
+        print(f"over budget by {total_ms - args.budget_ms:.1f} ms")
+        sys.exit(1)
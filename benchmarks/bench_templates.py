@@ -0,0 +1,46 @@
+"""
+Email template render throughput for ``email_verification``.
+
+Run with ``python -m benchmarks.bench_templates``. Compares the previous renderer, which
+read header, body and footer from disk and ran markdown2 and the style pass on every
+call, with ``TemplateManager.render_template``, which substitutes values into a template
+compiled once (including the per-render mtime check).
+"""
+from builtins import str
+
+from app.utils.template_manager import TemplateManager
+from benchmarks.common import argument_parser, time_per_call, write_results
+
+CONTEXT = {
+    "name": "John",
+    "verification_url": "http://localhost/verify-email/00000000-0000-0000-0000-000000000001/AbCdEf123456",
+    "email": "john.doe@example.com",
+}
+
+
+def legacy_render(manager: TemplateManager, template_name: str, **context) -> str:
+    import markdown2
+
+    header = manager._read_template('header.md')
+    footer = manager._read_template('footer.md')
+    main_content = manager._read_template(f'{template_name}.md').format(**context)
+    full_markdown = f"{header}\n{main_content}\n{footer}"
+    return manager._apply_email_styles(markdown2.markdown(full_markdown))
+
+
+def run():
+    manager = TemplateManager()
+    assert legacy_render(manager, "email_verification", **CONTEXT) == manager.render_template("email_verification", **CONTEXT)
+    results = []
+    for name, func in (
+        ("read + markdown", lambda: legacy_render(manager, "email_verification", **CONTEXT)),
+        ("compiled", lambda: manager.render_template("email_verification", **CONTEXT)),
+    ):
+        seconds = time_per_call(func)
+        results.append({"implementation": name, "usec_per_render": seconds * 1e6, "renders_per_sec": 1 / seconds})
+    return results
+
+
+if __name__ == "__main__":
+    args = argument_parser(__doc__).parse_args()
+    write_results("templates", run(), args.output)
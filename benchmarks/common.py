@@ -0,0 +1,143 @@
+from builtins import dict, int, str
+import argparse
+import gc
+import json
+import os
+import platform
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Callable, Dict, List
+
+
+def sample_user(index: int) -> Dict:
+    """A UserResponse shaped dict with realistic field lengths, including HATEOAS links."""
+    user_id = uuid.UUID(int=index)
+    base = "http://localhost/users"
+    return {
+        "id": str(user_id),
+        "email": f"user{index}@example.com",
+        "nickname": f"clever_panda_{index}",
+        "first_name": "John",
+        "last_name": "Doe",
+        "bio": "Experienced software developer specializing in web applications.",
+        "profile_picture_url": f"https://example.com/profiles/{index}.jpg",
+        "linkedin_profile_url": f"https://linkedin.com/in/user{index}",
+        "github_profile_url": f"https://github.com/user{index}",
+        "role": "AUTHENTICATED",
+        "is_professional": False,
+        "last_login_at": None,
+        "created_at": datetime(2024, 1, 1, tzinfo=timezone.utc).isoformat(),
+        "updated_at": datetime(2024, 1, 1, tzinfo=timezone.utc).isoformat(),
+        "links": [
+            {"rel": "self", "href": f"{base}/{user_id}", "action": "GET", "type": "application/json"},
+            {"rel": "update", "href": f"{base}/{user_id}", "action": "PUT", "type": "application/json"},
+            {"rel": "delete", "href": f"{base}/{user_id}", "action": "DELETE", "type": "application/json"},
+        ],
+    }
+
+
+def sample_user_page(size: int) -> Dict:
+    """A UserListResponse shaped dict holding ``size`` users."""
+    return {"items": [sample_user(i) for i in range(size)], "total": size * 10, "page": 1, "size": size}
+
+
+def per_call_rounds(func: Callable, min_time: float = 0.2, rounds: int = 5) -> List[float]:
+    """
+    Return the mean seconds per call of each of `rounds` timing rounds.
+
+    The number of calls per round is doubled until a round takes at least min_time; that
+    calibration round is discarded. Garbage collection is off while timing, as in timeit,
+    so a collection triggered by earlier allocations doesn't land in one round.
+    """
+    number = 1
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        while True:
+            start = time.perf_counter()
+            for _ in range(number):
+                func()
+            if time.perf_counter() - start >= min_time:
+                break
+            number *= 2
+        results = []
+        for _ in range(rounds):
+            start = time.perf_counter()
+            for _ in range(number):
+                func()
+            results.append((time.perf_counter() - start) / number)
+        return results
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+
+def time_per_call(func: Callable, min_time: float = 0.2) -> float:
+    """Return the best-of-five mean seconds per call, running each round for at least min_time."""
+    return min(per_call_rounds(func, min_time))
+
+
+def argument_parser(description: str) -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    return parser
+
+
+def write_results(name: str, results: List[Dict], output: str = None):
+    """Print results as a table and optionally write them, with machine metadata, to a JSON file."""
+    if results:
+        columns = list(results[0])
+        print("  ".join(f"{column:>14}" for column in columns))
+        for row in results:
+            print("  ".join(f"{_format(row[column]):>14}" for column in columns))
+    if output:
+        payload = {
+            "benchmark": name,
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "cpus": os.cpu_count(),
+            "results": results,
+        }
+        with open(output, "w", encoding="utf-8") as file:
+            json.dump(payload, file, indent=2)
+
+
+def load_baseline(path: str) -> Dict:
+    """Read a results file written by `write_results`."""
+    with open(path, encoding="utf-8") as file:
+        return json.load(file)
+
+
+def find_regressions(results: List[Dict], baseline: Dict, key: str,
+                     max_increase: Dict[str, float] = None, max_decrease: Dict[str, float] = None) -> List[str]:
+    """
+    Compare results with a baseline, row by row matched on `key`.
+
+    `max_increase` maps metrics where lower is better (latency) to the fraction by which
+    they may grow; `max_decrease` maps metrics where higher is better (throughput) to the
+    fraction by which they may shrink. Returns one message per regression.
+    """
+    baseline_rows = {row[key]: row for row in baseline["results"]}
+    regressions = []
+    for row in results:
+        previous = baseline_rows.get(row[key])
+        if previous is None:
+            continue
+        for metric, limit in (max_increase or {}).items():
+            if previous.get(metric) and row[metric] > previous[metric] * (1 + limit):
+                regressions.append(f"{row[key]}: {metric} {_format(row[metric])} vs baseline {_format(previous[metric])} (+{row[metric] / previous[metric] - 1:.0%}, limit +{limit:.0%})")
+        for metric, limit in (max_decrease or {}).items():
+            if previous.get(metric) and row[metric] < previous[metric] * (1 - limit):
+                regressions.append(f"{row[key]}: {metric} {_format(row[metric])} vs baseline {_format(previous[metric])} ({row[metric] / previous[metric] - 1:.0%}, limit -{limit:.0%})")
+    recorded_on = (baseline.get("python"), baseline.get("machine"), baseline.get("cpus"))
+    if recorded_on != (platform.python_version(), platform.machine(), os.cpu_count()):
+        print(f"Note: baseline was recorded on Python {recorded_on[0]} / {recorded_on[1]} / {recorded_on[2]} CPUs; numbers may not be comparable")
+    return regressions
+
+
+def _format(value) -> str:
+    if isinstance(value, float):
+        return f"{value:.3f}"
+    return str(value)
@@ -1,5 +1,6 @@
-from builtins import bool, int, str
+from builtins import bool, dict, float, int, str
 from pathlib import Path
+from typing import Dict
 from pydantic import  Field, AnyUrl, DirectoryPath
 from pydantic_settings import BaseSettings
 
@@ -29,6 +30,27 @@ class Settings(BaseSettings):
     postgres_server: str = Field(default='localhost', description="PostgreSQL server address")
     postgres_port: str = Field(default='5432', description="PostgreSQL port")
     postgres_db: str = Field(default='myappdb', description="PostgreSQL database name")
+    # Database connection pool
+    db_pool_size: int = Field(default=5, description="Database connections kept open per worker")
+    db_max_overflow: int = Field(default=10, description="Extra connections a worker may open under load beyond db_pool_size")
+    db_warmup_connections: int = Field(default=3, description="Connections opened and warmed at startup before the worker reports ready; at most db_pool_size")
+    db_warmup_retry_interval: float = Field(default=5.0, description="Seconds between warm-up attempts while the database is unreachable at startup")
+    shutdown_drain_timeout: float = Field(default=25.0, description="Seconds shutdown waits for in-flight requests before closing database connections; python -m app.serve caps it to fit the graceful timeout")
+    # Health checks (/healthz, /readyz)
+    readyz_cache_ttl: float = Field(default=2.0, description="Seconds a /readyz result is reused, so frequent probes don't add database load")
+    readyz_db_timeout: float = Field(default=1.0, description="Seconds the /readyz database checks may take before the database counts as unavailable")
+    readyz_max_email_backlog: int = Field(default=1000, description="Pending outbox emails above which /readyz reports the worker as degraded")
+    readyz_max_hash_queue: int = Field(default=32, description="Password hashes waiting for a bcrypt thread above which /readyz reports the worker as unavailable")
+    # Admission control; keep the three concurrency limits together at or below db_pool_size + db_max_overflow
+    admission_control_enabled: bool = Field(default=True, description="Limit concurrent requests per route class and reject the excess with 503")
+    admission_auth_concurrency: int = Field(default=3, description="Logins, registrations and user creations run at once per worker")
+    admission_auth_queue: int = Field(default=8, description="Auth requests allowed to wait for a slot before new ones are rejected")
+    admission_read_concurrency: int = Field(default=8, description="GET and HEAD requests run at once per worker")
+    admission_read_queue: int = Field(default=64, description="Read requests allowed to wait for a slot before new ones are rejected")
+    admission_write_concurrency: int = Field(default=4, description="Other POST, PUT, PATCH and DELETE requests run at once per worker")
+    admission_write_queue: int = Field(default=32, description="Write requests allowed to wait for a slot before new ones are rejected")
+    admission_queue_timeout: float = Field(default=5.0, description="Seconds a request may wait for a slot before it is rejected")
+    admission_retry_after: int = Field(default=2, description="Retry-After seconds sent with rejected requests")
     # Discord configuration
     discord_bot_token: str = Field(default='NONE', description="Discord bot token")
     discord_channel_id: int = Field(default=1234567890, description="Default Discord channel ID for the bot to interact", example=1234567890)
@@ -40,6 +62,59 @@ class Settings(BaseSettings):
     smtp_port: int = Field(default=2525, description="SMTP port for sending emails")
     smtp_username: str = Field(default='your-mailtrap-username', description="Username for SMTP server")
     smtp_password: str = Field(default='your-mailtrap-password', description="Password for SMTP server")
+    smtp_pool_size: int = Field(default=2, description="Number of kept-alive SMTP connections per worker")
+    smtp_timeout: float = Field(default=30.0, description="Timeout in seconds for SMTP operations")
+    # Email outbox dispatcher
+    email_outbox_enabled: bool = Field(default=True, description="Run the background dispatcher that sends queued emails")
+    email_outbox_batch_size: int = Field(default=20, description="Number of queued emails claimed per dispatch round")
+    email_outbox_max_attempts: int = Field(default=5, description="Delivery attempts before an email is marked FAILED")
+    email_outbox_backoff_seconds: float = Field(default=30.0, description="Delay before the first retry; doubles on each further attempt")
+    email_outbox_poll_interval: float = Field(default=2.0, description="Seconds between polls when the outbox is empty")
+    batch_get_max_items: int = Field(default=100, description="Maximum number of ids plus emails accepted by POST /users/batch-get")
+    # Password hashing
+    bcrypt_pool_size: int = Field(default=4, description="Threads per worker that run bcrypt password hashing off the event loop")
+    # Bulk notifications
+    bulk_notification_rate: float = Field(default=10.0, description="Maximum emails per second sent by a bulk notification job; 0 disables the limit")
+    bulk_notification_progress_interval: int = Field(default=50, description="A bulk notification job saves its progress after this many recipients")
+    bulk_notification_enabled: bool = Field(default=True, description="Run the background dispatcher that claims and runs bulk notification jobs")
+    bulk_notification_lease_seconds: float = Field(default=300.0, description="Lease on a running job, renewed every third of it; a job whose lease runs out is considered abandoned and may be claimed by another worker")
+    bulk_notification_poll_interval: float = Field(default=5.0, description="Seconds between looks for queued bulk notification jobs")
+    # Logging
+    log_queue_size: int = Field(default=10000, description="Log records buffered for the writer thread; records beyond this are dropped rather than blocking")
+    log_sample_rates: Dict[str, float] = Field(default={}, description="Fraction of INFO and DEBUG records kept per logger name, e.g. {\"uvicorn.access\": 0.1}")
+    # Metrics
+    metrics_enabled: bool = Field(default=True, description="Record request metrics and serve them on /metrics")
+    metrics_gauge_interval: float = Field(default=5.0, description="Seconds between refreshes of each worker's resource gauges when several workers share the metrics (python -m app.serve)")
+    server_timing_enabled: bool = Field(default=True, description="Count SQL per request and report db, hash, serialize and email time in a Server-Timing header")
+    sql_query_warning_threshold: int = Field(default=10, description="Log a warning when one request issues more SQL statements than this")
+    sql_repeated_statement_threshold: int = Field(default=5, description="Log a possible N+1 warning when one request runs the same statement this many times")
+    # Slow query log
+    slow_query_log_enabled: bool = Field(default=True, description="Log statements slower than slow_query_threshold_ms and keep them for /admin/slow-queries")
+    slow_query_threshold_ms: float = Field(default=200.0, description="Statements taking longer than this many milliseconds are recorded")
+    slow_query_explain: bool = Field(default=True, description="Capture EXPLAIN (ANALYZE off) plans for slow statements")
+    slow_query_buffer_size: int = Field(default=100, description="Number of slow queries kept in memory per worker")
+    # Event loop monitor
+    loop_monitor_enabled: bool = Field(default=True, description="Measure event loop lag and log the stack of code that blocks the loop")
+    loop_monitor_interval: float = Field(default=0.5, description="Seconds between event loop lag measurements")
+    loop_monitor_threshold_ms: float = Field(default=100.0, description="The loop counts as blocked when a callback waits longer than this many milliseconds to run")
+    loop_monitor_buffer_size: int = Field(default=50, description="Number of loop blocks kept in memory per worker for /admin/loop-blocks")
+    # Sampling profiler
+    profiler_max_seconds: float = Field(default=30.0, description="Longest run accepted by /admin/profile")
+    profiler_max_overhead: float = Field(default=0.02, description="Fraction of wall time the profiler may spend sampling before it lowers its rate")
+    # Server (python -m app.serve)
+    server_bind: str = Field(default='0.0.0.0:8000', description="Address the server listens on, host:port or unix:path")
+    server_workers: int = Field(default=0, description="Worker processes; 0 starts one per available CPU")
+    server_preload: bool = Field(default=True, description="Import the app once in the master process before forking the workers")
+    server_graceful_timeout: int = Field(default=30, description="Seconds in-flight requests get to finish when a worker is stopped")
+    server_keepalive: int = Field(default=5, description="Seconds an idle keep-alive connection is kept open")
+    server_max_requests: int = Field(default=10000, description="Requests after which a worker process is replaced; 0 disables recycling")
+    server_max_requests_jitter: int = Field(default=1000, description="Random extra requests added per worker, so workers are not all replaced at once")
+    # Response compression
+    compression_minimum_size: int = Field(default=500, description="Responses smaller than this many bytes are sent uncompressed")
+    compression_gzip_level: int = Field(default=6, description="gzip compression level (1-9)")
+    compression_brotli_quality: int = Field(default=4, description="brotli compression quality (0-11)")
+    # Static page serving
+    static_pages_cache_control: str = Field(default='public, max-age=300', description="Cache-Control header sent with the login, register and profile pages")
 
 
     class Config:
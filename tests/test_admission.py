@@ -0,0 +1,91 @@
+import asyncio
+
+import pytest
+
+from app.services.container import container
+from app.utils.admission import AdmissionControlMiddleware, ConcurrencyLimit, route_class
+
+
+def test_route_classes():
+    assert route_class("POST", "/login/") == "auth"
+    assert route_class("POST", "/register/") == "auth"
+    assert route_class("POST", "/users/") == "auth"
+    assert route_class("GET", "/users/") == "read"
+    assert route_class("PUT", "/users/123") == "write"
+    assert route_class("POST", "/users/batch-get") == "write"
+    assert route_class("GET", "/readyz") is None
+    assert route_class("OPTIONS", "/users/") is None
+
+async def test_limit_queues_then_rejects_when_queue_is_full():
+    limit = ConcurrencyLimit("test", limit=1, queue_size=1, queue_timeout=5)
+    assert await limit.acquire()
+    queued = asyncio.create_task(limit.acquire())
+    await asyncio.sleep(0)
+    assert limit.waiting == 1
+    assert await limit.acquire() is False
+    limit.release()
+    assert await queued is True
+    assert (limit.active, limit.waiting) == (1, 0)
+    limit.release()
+    assert limit.active == 0
+
+async def test_limit_rejects_after_queue_timeout():
+    limit = ConcurrencyLimit("test", limit=1, queue_size=5, queue_timeout=0.05)
+    assert await limit.acquire()
+    assert await limit.acquire() is False
+    assert limit.waiting == 0
+
+async def test_cancelled_waiter_leaves_the_queue():
+    limit = ConcurrencyLimit("test", limit=1, queue_size=5, queue_timeout=5)
+    await limit.acquire()
+    waiter = asyncio.create_task(limit.acquire())
+    await asyncio.sleep(0)
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+    assert limit.waiting == 0
+    limit.release()
+    assert limit.active == 0
+
+async def test_raising_the_limit_admits_waiters():
+    limit = ConcurrencyLimit("test", limit=1, queue_size=5, queue_timeout=5)
+    await limit.acquire()
+    waiter = asyncio.create_task(limit.acquire())
+    await asyncio.sleep(0)
+    limit.configure(2, 5, 5)
+    assert await waiter is True
+    assert limit.active == 2
+
+async def test_middleware_answers_503_with_retry_after_when_overloaded():
+    release = asyncio.Event()
+
+    async def slow_app(scope, receive, send):
+        await release.wait()
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+
+    limits = {"read": ConcurrencyLimit("read", limit=1, queue_size=0, queue_timeout=1)}
+    middleware = AdmissionControlMiddleware(slow_app, limits, retry_after=3)
+    sent = []
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {"type": "http", "method": "GET", "path": "/users/"}
+    first = asyncio.create_task(middleware(scope, None, send))
+    await asyncio.sleep(0)
+    await middleware(scope, None, send)
+    assert sent[0]["status"] == 503
+    assert (b"retry-after", b"3") in sent[0]["headers"]
+    release.set()
+    await first
+    assert sent[2]["status"] == 200
+    assert limits["read"].active == 0
+
+async def test_probes_are_never_limited(async_client, monkeypatch):
+    monkeypatch.setattr(container.admission_limits["read"], "limit", 0)
+    monkeypatch.setattr(container.admission_limits["read"], "queue_size", 0)
+    assert (await async_client.get("/healthz")).status_code == 200
+    response = await async_client.get("/users/")
+    assert response.status_code == 503
+    assert "retry-after" in response.headers
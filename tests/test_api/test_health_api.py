@@ -0,0 +1,91 @@
+import asyncio
+
+import pytest
+
+from app.database import Database
+from app.services.container import container
+from app.services.health_service import ReadinessChecker
+from app.utils.lifecycle import ServerState
+from app.utils.security import bcrypt_pool
+from settings.config import settings
+
+
+@pytest.fixture
+async def database(monkeypatch):
+    """An engine created on this test's event loop; the session-wide one is put back afterwards."""
+    monkeypatch.setattr(Database, "_engine", None)
+    monkeypatch.setattr(Database, "_session_factory", None)
+    Database.initialize(settings.database_url, pool_size=2, max_overflow=0)
+    yield Database.get_engine()
+    await Database.dispose()
+
+
+@pytest.fixture
+def ready(monkeypatch):
+    monkeypatch.setattr(container.server_state, "ready", True)
+    container.readiness.invalidate()
+    yield
+    container.readiness.invalidate()
+
+
+async def test_healthz(async_client):
+    response = await async_client.get("/healthz")
+    assert response.status_code == 200
+    assert response.json() == {"status": "ok"}
+
+async def test_readyz_unavailable_until_warm(async_client):
+    assert container.server_state.ready is False
+    response = await async_client.get("/readyz")
+    assert response.status_code == 503
+    assert response.json()["reason"] == "warming up"
+
+async def test_readyz_reports_checks(async_client, database, ready):
+    response = await async_client.get("/readyz")
+    assert response.status_code == 200
+    body = response.json()
+    assert body["status"] == "ready"
+    assert set(body["checks"]) == {"database", "email_backlog", "password_hashing"}
+    assert all(check["ok"] for check in body["checks"].values())
+
+async def test_readyz_fails_when_hashing_pool_is_saturated(async_client, database, ready, monkeypatch):
+    monkeypatch.setattr(bcrypt_pool, "pending", settings.readyz_max_hash_queue + 1)
+    response = await async_client.get("/readyz")
+    assert response.status_code == 503
+    assert response.json()["checks"]["password_hashing"]["ok"] is False
+
+async def test_email_backlog_only_degrades(async_client, database, ready, monkeypatch):
+    monkeypatch.setattr(container.readiness, "max_email_backlog", -1)
+    response = await async_client.get("/readyz")
+    assert response.status_code == 200
+    assert response.json()["status"] == "degraded"
+
+async def test_exhausted_pool_fails_without_waiting_for_a_connection(database):
+    checker = ReadinessChecker(ServerState(), max_overflow=0)
+    held = [await database.connect() for _ in range(2)]
+    try:
+        check = await asyncio.wait_for(checker.check_database(), 0.5)
+    finally:
+        for conn in held:
+            await conn.close()
+    assert check["ok"] is False
+    assert "in use" in check["detail"]
+
+async def test_results_are_cached_and_shared(database, monkeypatch):
+    state = ServerState()
+    state.ready = True
+    checker = ReadinessChecker(state, cache_ttl=60)
+    runs = []
+    original = checker.check_database
+
+    async def counted():
+        runs.append(1)
+        await asyncio.sleep(0.05)
+        return await original()
+
+    monkeypatch.setattr(checker, "check_database", counted)
+    results = await asyncio.gather(*(checker.check() for _ in range(5)))
+    await checker.check()
+    assert len(runs) == 1
+    assert all(result is results[0] for result in results)
+    state.draining, state.ready = True, False
+    assert (await checker.check())[1]["reason"] == "draining"
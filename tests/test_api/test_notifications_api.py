@@ -0,0 +1,218 @@
+from builtins import Exception, len, range
+import asyncio
+import uuid
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock
+import pytest
+from app.models.notification_job_model import NotificationJob, NotificationJobStatus
+from app.services.container import container
+from app.services import notification_service
+from app.services.email_service import EmailService
+from app.services.notification_service import NotificationJobDispatcher, NotificationService, _Pacer
+from tests.conftest import AsyncTestingSessionLocal
+
+pytestmark = pytest.mark.asyncio
+
+
+def make_dispatcher(email_service, **kwargs):
+    kwargs = {"rate": 0, "poll_interval": 0.05, **kwargs}
+    return NotificationJobDispatcher(AsyncTestingSessionLocal, lambda: email_service, **kwargs)
+
+async def wait_for_status(async_client, headers, job_id, status):
+    for _ in range(200):
+        job = (await async_client.get(f"/notifications/bulk/{job_id}", headers=headers)).json()
+        if job["status"] == status:
+            return job
+        await asyncio.sleep(0.02)
+    raise AssertionError(f"job {job_id} never reached {status}, last seen {job}")
+
+@pytest.fixture
+def bulk_email_service():
+    return AsyncMock(spec=EmailService)
+
+@pytest.fixture
+def dispatcher(bulk_email_service):
+    return make_dispatcher(bulk_email_service)
+
+async def test_bulk_notification_sends_to_role(async_client, admin_token, bulk_email_service, dispatcher, users_with_same_role_50_users, admin_user):
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    payload = {"email_type": "announcement", "filter": {"role": "AUTHENTICATED"}, "message": "Maintenance on Saturday."}
+    response = await async_client.post("/notifications/bulk", json=payload, headers=headers)
+    assert response.status_code == 202
+    job = response.json()
+    assert job["total"] == 50
+    assert job["status"] == "QUEUED"
+    assert await dispatcher.dispatch_once() is True
+    assert await dispatcher.dispatch_once() is False
+    assert response.headers["location"].endswith(f"/notifications/bulk/{job['id']}")
+
+    response = await async_client.get(f"/notifications/bulk/{job['id']}", headers=headers)
+    assert response.status_code == 200
+    job = response.json()
+    assert job["status"] == "COMPLETED"
+    assert (job["sent"], job["failed"]) == (50, 0)
+    assert bulk_email_service.send_user_email.await_count == 50
+    recipients = {call.args[0]["email"] for call in bulk_email_service.send_user_email.await_args_list}
+    assert admin_user.email not in recipients
+    user_data, email_type = bulk_email_service.send_user_email.await_args_list[0].args
+    assert email_type == "announcement"
+    assert user_data["message"] == "Maintenance on Saturday."
+
+async def test_bulk_notification_reads_recipients_in_pages(async_client, admin_token, bulk_email_service, dispatcher, monkeypatch, users_with_same_role_50_users):
+    monkeypatch.setattr(notification_service, "RECIPIENT_PAGE_SIZE", 7)
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    payload = {"email_type": "announcement", "filter": {"role": "AUTHENTICATED"}, "message": "Hi"}
+    job_id = (await async_client.post("/notifications/bulk", json=payload, headers=headers)).json()["id"]
+    await dispatcher.dispatch_once()
+    job = (await async_client.get(f"/notifications/bulk/{job_id}", headers=headers)).json()
+    assert (job["status"], job["sent"]) == ("COMPLETED", 50)
+    emails = [call.args[0]["email"] for call in bulk_email_service.send_user_email.await_args_list]
+    assert len(set(emails)) == len(emails) == 50
+
+async def test_bulk_notification_counts_failures(async_client, admin_token, bulk_email_service, dispatcher, verified_user, unverified_user):
+    bulk_email_service.send_user_email.side_effect = Exception("mailbox unavailable")
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    payload = {"email_type": "professional_upgrade", "filter": {"email_verified": True}}
+    response = await async_client.post("/notifications/bulk", json=payload, headers=headers)
+    assert response.status_code == 202
+    await dispatcher.dispatch_once()
+    response = await async_client.get(f"/notifications/bulk/{response.json()['id']}", headers=headers)
+    job = response.json()
+    assert job["status"] == "COMPLETED"
+    assert (job["total"], job["sent"], job["failed"]) == (1, 0, 1)
+    assert job["last_error"] == "mailbox unavailable"
+
+async def test_bulk_announcement_requires_message(async_client, admin_token):
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    response = await async_client.post("/notifications/bulk", json={"email_type": "announcement"}, headers=headers)
+    assert response.status_code == 422
+
+async def test_bulk_notification_requires_admin(async_client, manager_token):
+    headers = {"Authorization": f"Bearer {manager_token}"}
+    payload = {"email_type": "announcement", "message": "Hello"}
+    response = await async_client.post("/notifications/bulk", json=payload, headers=headers)
+    assert response.status_code == 403
+
+async def test_get_unknown_notification_job(async_client, admin_token):
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    response = await async_client.get("/notifications/bulk/00000000-0000-0000-0000-000000000000", headers=headers)
+    assert response.status_code == 404
+
+async def test_request_is_released_before_the_job_finishes(async_client, admin_token, bulk_email_service, dispatcher, monkeypatch, verified_user):
+    gate = asyncio.Event()
+
+    async def send_when_released(user_data, email_type):
+        await gate.wait()
+
+    bulk_email_service.send_user_email.side_effect = send_when_released
+    monkeypatch.setattr(container, "notification_dispatcher", dispatcher)
+    dispatcher.start()
+    try:
+        headers = {"Authorization": f"Bearer {admin_token}"}
+        response = await async_client.post("/notifications/bulk", json={"email_type": "announcement", "message": "Hi"}, headers=headers)
+        assert response.status_code == 202
+        job_id = response.json()["id"]
+        await wait_for_status(async_client, headers, job_id, "RUNNING")
+        # The sending job holds no request: nothing in flight, no admission slot taken
+        assert container.server_state.in_flight == 0
+        assert container.admission_limits["write"].active == 0
+        gate.set()
+        job = await wait_for_status(async_client, headers, job_id, "COMPLETED")
+        assert job["sent"] == job["total"] > 0
+    finally:
+        await dispatcher.stop()
+
+async def test_interrupted_job_resumes_after_its_cursor(async_client, admin_token, users_with_same_role_50_users):
+    sent_first = []
+
+    async def send_ten_then_hang(user_data, email_type):
+        if len(sent_first) >= 10:
+            await asyncio.Event().wait()
+        sent_first.append(user_data["email"])
+
+    first = AsyncMock(spec=EmailService)
+    first.send_user_email.side_effect = send_ten_then_hang
+    dispatcher = make_dispatcher(first, progress_interval=5)
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    payload = {"email_type": "announcement", "filter": {"role": "AUTHENTICATED"}, "message": "Hi"}
+    job_id = (await async_client.post("/notifications/bulk", json=payload, headers=headers)).json()["id"]
+    dispatcher.start()
+    while first.send_user_email.await_count < 12:
+        await asyncio.sleep(0.01)
+    await dispatcher.stop()  # as on shutdown
+    job = await wait_for_status(async_client, headers, job_id, "INTERRUPTED")
+    assert (job["sent"], job["failed"]) == (10, 0)
+
+    second = AsyncMock(spec=EmailService)
+    assert await make_dispatcher(second).dispatch_once() is True
+    job = await wait_for_status(async_client, headers, job_id, "COMPLETED")
+    assert (job["sent"], job["failed"]) == (50, 0)
+    sent_second = [call.args[0]["email"] for call in second.send_user_email.await_args_list]
+    assert len(sent_second) == 40
+    assert not set(sent_first) & set(sent_second)
+
+async def test_only_abandoned_running_jobs_are_reclaimed(db_session):
+    now = datetime.now(timezone.utc)
+    abandoned = NotificationJob(email_type="announcement", status=NotificationJobStatus.RUNNING, leased_until=now - timedelta(seconds=1))
+    active = NotificationJob(email_type="announcement", status=NotificationJobStatus.RUNNING, leased_until=now + timedelta(minutes=5))
+    db_session.add_all([active, abandoned])
+    await db_session.commit()
+    dispatcher = make_dispatcher(AsyncMock(spec=EmailService))
+    assert await dispatcher._claim() == abandoned.id
+    assert await dispatcher._claim() is None
+
+async def hang(user_data, email_type):
+    # An SMTP server that accepted the connection and never answers
+    await asyncio.Event().wait()
+
+async def test_stalled_job_keeps_its_lease(async_client, admin_token, db_session, verified_user):
+    bulk_email_service = AsyncMock(spec=EmailService)
+    bulk_email_service.send_user_email.side_effect = hang
+    dispatcher = make_dispatcher(bulk_email_service, lease_seconds=0.3)
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    job_id = (await async_client.post("/notifications/bulk", json={"email_type": "announcement", "message": "Hi"}, headers=headers)).json()["id"]
+    dispatcher.start()
+    try:
+        await wait_for_status(async_client, headers, job_id, "RUNNING")
+        # Well past the first lease: the heartbeat has renewed it although no send finished
+        await asyncio.sleep(0.6)
+        assert await make_dispatcher(AsyncMock(spec=EmailService))._claim() is None
+    finally:
+        await dispatcher.stop()
+    job = await wait_for_status(async_client, headers, job_id, "INTERRUPTED")
+    assert job["sent"] == 0
+
+async def test_job_stops_sending_when_its_lease_is_taken(async_client, admin_token, db_session, users_with_same_role_50_users):
+    bulk_email_service = AsyncMock(spec=EmailService)
+    bulk_email_service.send_user_email.side_effect = hang
+    dispatcher = make_dispatcher(bulk_email_service, lease_seconds=0.3, concurrency=2)
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    payload = {"email_type": "announcement", "filter": {"role": "AUTHENTICATED"}, "message": "Hi"}
+    job_id = (await async_client.post("/notifications/bulk", json=payload, headers=headers)).json()["id"]
+    running = asyncio.ensure_future(dispatcher.dispatch_once())
+    await wait_for_status(async_client, headers, job_id, "RUNNING")
+    # Another worker claims the job, as if this one had stalled past its lease
+    taken_until = datetime.now(timezone.utc) + timedelta(minutes=5)
+    async with AsyncTestingSessionLocal() as session:
+        job = await session.get(NotificationJob, uuid.UUID(job_id))
+        job.leased_until = taken_until
+        await session.commit()
+    assert await asyncio.wait_for(running, 2) is True
+    assert bulk_email_service.send_user_email.await_count == 2
+    async with AsyncTestingSessionLocal() as session:
+        job = await session.get(NotificationJob, uuid.UUID(job_id))
+        assert job.status == NotificationJobStatus.RUNNING
+        assert job.leased_until == taken_until
+
+async def test_run_job_without_job_row_returns(db_session):
+    email_service = AsyncMock(spec=EmailService)
+    await NotificationService.run_job(AsyncTestingSessionLocal, email_service, uuid.uuid4())
+    email_service.send_user_email.assert_not_awaited()
+
+async def test_pacer_spaces_calls():
+    pacer = _Pacer(rate=50)
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    for _ in range(6):
+        await pacer.wait()
+    assert loop.time() - start >= 0.09
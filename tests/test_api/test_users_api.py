@@ -1,7 +1,9 @@
 from builtins import str
 import pytest
 from httpx import AsyncClient
+from sqlalchemy import select
 from app.main import app
+from app.models.email_outbox_model import EmailOutbox, OutboxStatus
 from app.models.user_model import User, UserRole
 from app.utils.nickname_gen import generate_nickname
 from app.utils.security import hash_password
@@ -225,4 +227,65 @@ async def test_upgrade_to_professional_user_not_found(async_client, admin_token)
     url = f"/users/{invalid_user_id}/professional/"
     headers = {"Authorization": f"Bearer {admin_token}"}
     response = await async_client.put(url, headers=headers)
-    assert response.status_code == 404
\ No newline at end of file
+    assert response.status_code == 404
+
+@pytest.mark.asyncio
+async def test_upgrade_to_professional_queues_notification(async_client, admin_token, verified_user, db_session):
+    url = f"/users/{verified_user.id}/professional/"
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    response = await async_client.put(url, headers=headers)
+    assert response.status_code == 200
+    assert response.json()["is_professional"] is True
+    result = await db_session.execute(select(EmailOutbox).where(EmailOutbox.recipient == verified_user.email))
+    message = result.scalars().one()
+    assert message.email_type == "professional_upgrade"
+    assert message.status == OutboxStatus.PENDING
+@pytest.mark.asyncio
+async def test_get_login_page_cached_and_compressed(async_client):
+    response = await async_client.get("/loginpage/", headers={"Accept-Encoding": "gzip"})
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "gzip"
+    assert "cache-control" in response.headers
+    assert "<html" in response.text.lower()
+    etag = response.headers["etag"]
+    cached = await async_client.get("/loginpage/", headers={"Accept-Encoding": "gzip", "If-None-Match": etag})
+    assert cached.status_code == 304
+
+@pytest.mark.asyncio
+async def test_get_user_sparse_fields(async_client, admin_user, admin_token):
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    response = await async_client.get(f"/users/{admin_user.id}?fields=nickname,bio,role", headers=headers)
+    assert response.status_code == 200
+    assert response.json() == {"id": str(admin_user.id), "nickname": admin_user.nickname, "bio": None, "role": "ADMIN"}
+
+@pytest.mark.asyncio
+async def test_get_user_unknown_field(async_client, admin_user, admin_token):
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    response = await async_client.get(f"/users/{admin_user.id}?fields=nickname,hashed_password", headers=headers)
+    assert response.status_code == 400
+    assert "hashed_password" in response.json()["detail"]
+
+@pytest.mark.asyncio
+async def test_list_users_sparse_fields(async_client, admin_token, users_with_same_role_50_users):
+    response = await async_client.get("/users/?fields=email&limit=5", headers={"Authorization": f"Bearer {admin_token}"})
+    assert response.status_code == 200
+    data = response.json()
+    assert data["size"] == 5
+    assert all(set(item) == {"id", "email"} for item in data["items"])
+
+@pytest.mark.asyncio
+async def test_batch_get_users(async_client, admin_user, admin_token, verified_user):
+    missing_id = "00000000-0000-0000-0000-000000000000"
+    payload = {"ids": [str(verified_user.id), missing_id, str(admin_user.id)], "emails": ["nobody@example.com", admin_user.email]}
+    response = await async_client.post("/users/batch-get", json=payload, headers={"Authorization": f"Bearer {admin_token}"})
+    assert response.status_code == 200
+    items = response.json()["items"]
+    assert [item["key"] for item in items] == payload["ids"] + payload["emails"]
+    assert [item["found"] for item in items] == [True, False, True, False, True]
+    assert items[0]["user"]["id"] == str(verified_user.id)
+    assert items[4]["user"]["email"] == admin_user.email
+
+@pytest.mark.asyncio
+async def test_batch_get_users_admin_only(async_client, manager_token):
+    response = await async_client.post("/users/batch-get", json={"ids": []}, headers={"Authorization": f"Bearer {manager_token}"})
+    assert response.status_code == 403
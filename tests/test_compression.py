@@ -0,0 +1,60 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse, Response, StreamingResponse
+from httpx import AsyncClient
+
+from app.utils.compression import CompressionMiddleware
+
+pytestmark = pytest.mark.asyncio
+
+LARGE_BODY = "x" * 2000
+
+
+@pytest.fixture
+def compressed_client():
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, minimum_size=500)
+
+    @app.get("/small")
+    async def small():
+        return PlainTextResponse("tiny")
+
+    @app.get("/large")
+    async def large():
+        return PlainTextResponse(LARGE_BODY)
+
+    @app.get("/stream")
+    async def stream():
+        async def chunks():
+            for _ in range(10):
+                yield LARGE_BODY
+        return StreamingResponse(chunks(), media_type="text/plain")
+
+    @app.get("/image")
+    async def image():
+        return Response(b"\x89PNG" * 500, media_type="image/png")
+
+    return AsyncClient(app=app, base_url="http://testserver")
+
+async def test_small_response_is_not_compressed(compressed_client):
+    response = await compressed_client.get("/small", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in response.headers
+    assert response.text == "tiny"
+
+async def test_large_response_is_gzipped(compressed_client):
+    response = await compressed_client.get("/large", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert int(response.headers["content-length"]) < len(LARGE_BODY)
+    assert response.text == LARGE_BODY
+
+async def test_streaming_response_is_compressed_incrementally(compressed_client):
+    response = await compressed_client.get("/stream", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert "content-length" not in response.headers
+    assert response.text == LARGE_BODY * 10
+
+async def test_binary_and_unaccepted_responses_pass_through(compressed_client):
+    response = await compressed_client.get("/image", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in response.headers
+    response = await compressed_client.get("/large", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in response.headers
@@ -49,3 +49,16 @@ def test_generate_pagination_links(mock_request):
     assert len(links) >= 4
     expected_self_url = "http://testserver/users?limit=5&skip=10"
     assert normalize_url(str(links[0].href)) == normalize_url(expected_self_url), "Self link should match expected URL"
+
+def test_create_user_links_resolves_routes_once(mock_request):
+    first = create_user_links(uuid4(), mock_request)
+    user_id = uuid4()
+    second = create_user_links(user_id, mock_request)
+    assert mock_request.url_for.call_count == 3
+    assert normalize_url(str(second[0].href)) == f"http://testserver/get_user/{user_id}"
+    assert [link.rel for link in first] == [link.rel for link in second]
+
+def test_generate_pagination_links_ignores_current_query(mock_request):
+    mock_request.url = "http://testserver/users?skip=10&limit=5"
+    links = generate_pagination_links(mock_request, 10, 5, 50)
+    assert str(links[0].href) == "http://testserver/users?skip=10&limit=5"
@@ -0,0 +1,69 @@
+from builtins import len
+import asyncio
+import time
+from urllib.parse import urlencode
+
+import pytest
+
+from app.services.container import container
+from app.utils.loop_monitor import BlockingCallError, LoopMonitor
+
+
+def block_the_loop():
+    time.sleep(0.3)
+
+@pytest.mark.asyncio
+async def test_blocking_call_captured_with_stack():
+    monitor = LoopMonitor(interval=0.01, threshold=0.05)
+    async with monitor:
+        await asyncio.sleep(0.05)
+        block_the_loop()
+    assert monitor.blocked_count == 1
+    entry = monitor.recent()[0]
+    assert entry.duration >= 0.25
+    assert "block_the_loop" in entry.stack
+    assert "test_blocking_call_captured_with_stack" in entry.task
+    assert monitor.max_lag >= 0.25
+
+@pytest.mark.asyncio
+async def test_awaiting_is_not_blocking():
+    monitor = LoopMonitor(interval=0.01, threshold=0.1, strict=True)
+    async with monitor:
+        await asyncio.sleep(0.2)
+    assert monitor.blocked_count == 0
+    assert monitor.last_lag < 0.1
+
+@pytest.mark.asyncio
+async def test_strict_mode_fails_on_blocking_call():
+    with pytest.raises(BlockingCallError, match="block_the_loop"):
+        async with LoopMonitor(interval=0.01, threshold=0.05, strict=True):
+            block_the_loop()
+
+@pytest.mark.asyncio
+async def test_login_does_not_block_the_loop(async_client, verified_user):
+    # Password hashing runs on the bcrypt pool, so the loop stays responsive while it verifies
+    form_data = {"username": verified_user.email, "password": "MySuperPassword$1234"}
+    async with LoopMonitor(interval=0.01, threshold=0.25, strict=True):
+        response = await async_client.post("/login/", data=urlencode(form_data), headers={"Content-Type": "application/x-www-form-urlencoded"})
+    assert response.status_code == 200
+
+@pytest.mark.asyncio
+async def test_loop_blocks_endpoint(async_client, admin_token, user_token):
+    monitor = container.loop_monitor
+    monitor.start()
+    try:
+        block_the_loop()
+        await asyncio.sleep(0.05)
+    finally:
+        await monitor.stop()
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    response = await async_client.get("/admin/loop-blocks", headers=headers)
+    assert response.status_code == 200
+    body = response.json()
+    assert body["blocked_total"] >= 1
+    assert "block_the_loop" in body["items"][0]["stack"]
+    response = await async_client.delete("/admin/loop-blocks", headers=headers)
+    assert response.status_code == 204
+    assert len(monitor.entries) == 0
+    response = await async_client.get("/admin/loop-blocks", headers={"Authorization": f"Bearer {user_token}"})
+    assert response.status_code == 403
@@ -0,0 +1,68 @@
+import subprocess
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+from app.main import app
+from app.serve import child_exit
+from app.utils.metrics import REGISTRY, UNMATCHED_ROUTE, _RouteTable
+
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+@pytest.mark.asyncio
+async def test_requests_labelled_by_route_template(async_client, admin_token, verified_user):
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    labels = {"method": "GET", "route": "/users/{user_id}"}
+    before = sample("http_requests_total", status="200", **labels)
+    for _ in range(2):
+        response = await async_client.get(f"/users/{verified_user.id}", headers=headers)
+        assert response.status_code == 200
+    assert sample("http_requests_total", status="200", **labels) == before + 2
+    assert sample("http_request_duration_seconds_count", **labels) >= 2
+    assert sample("http_requests_in_progress", **labels) == 0
+
+@pytest.mark.asyncio
+async def test_unknown_paths_share_one_label(async_client):
+    before = sample("http_requests_total", method="GET", route=UNMATCHED_ROUTE, status="404")
+    for path in ("/nope", "/nope/1", "/wp-admin.php"):
+        await async_client.get(path)
+    assert sample("http_requests_total", method="GET", route=UNMATCHED_ROUTE, status="404") == before + 3
+
+@pytest.mark.asyncio
+async def test_metrics_endpoint_exposition(async_client, verified_user):
+    await async_client.get("/users/")
+    response = await async_client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    body = response.text
+    assert 'http_request_duration_seconds_bucket{le="0.005",method="GET",route="/users/"}' in body
+    for gauge in ("bcrypt_pool_workers", "smtp_connections_idle", "email_outbox_pending"):
+        assert f"\n{gauge} " in body
+    assert str(verified_user.id) not in body
+
+def test_route_resolution_prefers_route_accepting_method():
+    routes = _RouteTable()
+    assert routes.resolve({"app": app, "path": "/users/batch-get"}, "POST") == "/users/batch-get"
+    assert routes.resolve({"app": app, "path": "/users/batch-get"}, "GET") == "/users/{user_id}"
+    assert routes.resolve({"app": app, "path": "/users/abc/professional/"}, "PUT") == "/users/{user_id}/professional/"
+    assert routes.resolve({"app": app, "path": "/nope"}, "GET") == UNMATCHED_ROUTE
+
+def test_multiprocess_scrape_combines_workers(tmp_path, monkeypatch):
+    monkeypatch.setenv("PROMETHEUS_MULTIPROC_DIR", str(tmp_path))
+    worker = ("import os; from app.utils import metrics; print(os.getpid()); "
+              "metrics.REQUESTS.labels('GET', '/users/', '200').inc(); metrics.DB_POOL_SIZE.set(5)")
+    pids = [int(subprocess.run([sys.executable, "-c", worker], check=True, capture_output=True, text=True).stdout)
+            for _ in range(2)]
+    scrape = "import sys; from app.utils import metrics; sys.stdout.write(metrics.render_metrics()[0].decode())"
+
+    body = subprocess.run([sys.executable, "-c", scrape], check=True, capture_output=True, text=True).stdout
+    assert 'http_requests_total{method="GET",route="/users/",status="200"} 2.0' in body
+    assert "\ndb_pool_size 10.0" in body
+    # Once the master reports a worker gone, its gauges drop out; its requests still count
+    child_exit(None, SimpleNamespace(pid=pids[0]))
+    body = subprocess.run([sys.executable, "-c", scrape], check=True, capture_output=True, text=True).stdout
+    assert 'http_requests_total{method="GET",route="/users/",status="200"} 2.0' in body
+    assert "\ndb_pool_size 5.0" in body
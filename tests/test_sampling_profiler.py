@@ -0,0 +1,80 @@
+from builtins import int, range, sum
+import asyncio
+import threading
+import time
+import pytest
+
+from app.utils import sampling_profiler
+from app.utils.sampling_profiler import StackSampler, profile_worker
+
+
+def spin(seconds):
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        sum(range(1000))
+
+async def busy_request():
+    for _ in range(30):
+        spin(0.01)
+        await asyncio.sleep(0)
+
+def test_sampler_collapses_thread_stacks():
+    worker = threading.Thread(target=spin, args=(0.3,), name="busy-worker")
+    worker.start()
+    sampler = StackSampler(interval=0.005, max_overhead=1.0)
+    sampler.run(0.2)
+    worker.join()
+    assert sampler.samples > 10
+    lines = sampler.collapsed().splitlines()
+    assert any(line.startswith("thread:busy-worker;") and "spin (" in line for line in lines)
+    stack, count = lines[0].rsplit(" ", 1)
+    assert int(count) > 0
+
+def test_sampler_backs_off_when_over_budget():
+    sampler = StackSampler(interval=0.001, max_overhead=0.0)
+    sampler.run(0.05)
+    assert sampler.interval > 0.001
+
+@pytest.mark.asyncio
+async def test_profile_worker_attributes_loop_stacks_to_tasks(monkeypatch):
+    # The task holds the event loop until the sampler has seen it, so the result doesn't depend on timing
+    entered, release = threading.Event(), threading.Event()
+
+    class ReleasingSampler(StackSampler):
+        def sample_once(self, own_thread_id):
+            blocked = entered.is_set()
+            super().sample_once(own_thread_id)
+            if blocked:
+                release.set()
+
+    def blocked_request():
+        entered.set()
+        release.wait(5)
+
+    async def request():
+        blocked_request()
+
+    monkeypatch.setattr(sampling_profiler, "StackSampler", ReleasingSampler)
+    task = asyncio.create_task(request())
+    # Idle frames kept: the task is parked in Event.wait, which is otherwise dropped as idle
+    sampler = await profile_worker(0.5, interval=0.005, max_overhead=1.0, include_idle=True)
+    await task
+    assert release.is_set()
+    assert any(line.startswith("thread:MainThread;task:") and ".request;" in line and "blocked_request (" in line
+               for line in sampler.collapsed().splitlines())
+
+@pytest.mark.asyncio
+async def test_one_profile_at_a_time():
+    first = asyncio.create_task(profile_worker(0.2, interval=0.01, max_overhead=0.02))
+    await asyncio.sleep(0.05)
+    assert await profile_worker(0.1, interval=0.01, max_overhead=0.02) is None
+    assert await first is not None
+
+@pytest.mark.asyncio
+async def test_profile_endpoint(async_client, admin_token, user_token):
+    response = await async_client.get("/admin/profile?seconds=0.1", headers={"Authorization": f"Bearer {admin_token}"})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert int(response.headers["x-profile-samples"]) > 0
+    response = await async_client.get("/admin/profile?seconds=0.1", headers={"Authorization": f"Bearer {user_token}"})
+    assert response.status_code == 403
@@ -1,7 +1,9 @@
 # test_security.py
 from builtins import RuntimeError, ValueError, isinstance, str
+import asyncio
+import threading
 import pytest
-from app.utils.security import hash_password, verify_password
+from app.utils.security import BcryptPool, hash_password, verify_password
 
 def test_hash_password():
     """Test that hashing password returns a bcrypt hashed string."""
@@ -65,3 +67,19 @@ def test_hash_password_internal_error(monkeypatch):
     with pytest.raises(ValueError):
         hash_password("test")
 
+
+async def test_bcrypt_pool_counts_cancelled_queued_jobs():
+    """A job cancelled while still queued must not stay counted as pending."""
+    pool = BcryptPool(1)
+    release = threading.Event()
+    first = asyncio.ensure_future(pool.run(release.wait))
+    second = asyncio.ensure_future(pool.run(release.wait))
+    await asyncio.sleep(0.05)
+    assert (pool.pending, pool.active) == (2, 1)
+    second.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await second
+    release.set()
+    assert await first is True
+    await asyncio.sleep(0)
+    assert (pool.pending, pool.active) == (0, 0)
@@ -0,0 +1,39 @@
+from builtins import len, set
+import asyncio
+import re
+
+import pytest
+from sqlalchemy import func, select
+
+from app.models.user_model import User
+from app.seed import COLUMNS, build_pools, generate_batch, seed_users
+from app.utils.security import verify_password
+from settings.config import settings
+
+
+@pytest.fixture(scope="module")
+def pools():
+    return build_pools(7)
+
+def test_batches_are_deterministic(pools):
+    assert generate_batch(pools, "hash", 7, 100, 50) == generate_batch(pools, "hash", 7, 100, 50)
+    assert generate_batch(pools, "hash", 7, 100, 50) != generate_batch(pools, "hash", 8, 100, 50)
+    assert build_pools(7) == pools
+
+def test_generated_users_are_unique_and_valid(pools):
+    rows = generate_batch(pools, "hash", 7, 0, 2000)
+    nicknames = [row[COLUMNS.index("nickname")] for row in rows]
+    emails = [row[COLUMNS.index("email")] for row in rows]
+    assert len(set(nicknames)) == len(set(emails)) == len(set(row[0] for row in rows)) == 2000
+    assert all(re.match(r"^[\w-]+$", nickname) and len(nickname) <= 50 for nickname in nicknames)
+    assert all(len(row) == len(COLUMNS) for row in rows)
+
+@pytest.mark.asyncio
+async def test_seed_users_copies_rows(db_session):
+    # seed_users runs its own event loops, so it is called from a thread here
+    assert await asyncio.to_thread(seed_users, settings.database_url, 1200, seed=3, workers=1, batch_size=500) == 1200
+    # A second run continues after the first instead of colliding with it
+    assert await asyncio.to_thread(seed_users, settings.database_url, 300, seed=3, start=1200, workers=2, batch_size=100) == 300
+    assert await db_session.scalar(select(func.count()).select_from(User)) == 1500
+    user = await db_session.scalar(select(User).where(User.email.like("%1499@%")))
+    assert verify_password("Seeded*Pass123", user.hashed_password)
@@ -0,0 +1,19 @@
+import json
+import pytest
+
+from app.schemas.user_schemas import UserListResponse, UserResponse
+from app.utils.serialization import ModelJSONResponse, user_response
+
+pytestmark = pytest.mark.asyncio
+
+async def test_user_response_matches_validated_model(verified_user):
+    trusted = user_response(verified_user)
+    assert trusted.model_dump() == UserResponse.model_validate(verified_user).model_dump()
+
+async def test_model_json_response_renders_constructed_models(verified_user):
+    page = UserListResponse.model_construct(items=[user_response(verified_user)], total=1, page=1, size=1)
+    response = ModelJSONResponse(page)
+    assert response.media_type == "application/json"
+    data = json.loads(response.body)
+    assert data["items"][0]["id"] == str(verified_user.id)
+    assert data["items"][0]["role"] == verified_user.role.value
@@ -0,0 +1,49 @@
+import signal
+
+import pytest
+from uvicorn import Config
+
+from app.serve import AppWorker, _TimedServer, available_cpus, gunicorn_options, parse_args, prepare_metrics_dir, shutdown_budget
+from app.utils.lifecycle import ServerState
+
+
+def test_workers_default_to_available_cpus():
+    options = gunicorn_options(parse_args(["--workers", "0"]))
+    assert options["workers"] == available_cpus() >= 1
+    assert gunicorn_options(parse_args(["--workers", "3"]))["workers"] == 3
+
+def test_gunicorn_options_from_arguments():
+    args = parse_args(["--bind", "127.0.0.1:9000", "--no-preload", "--graceful-timeout", "10",
+                       "--max-requests", "500", "--max-requests-jitter", "50", "--loop", "asyncio", "--http", "h11"])
+    options = gunicorn_options(args)
+    assert options["bind"] == "127.0.0.1:9000"
+    assert options["preload_app"] is False
+    assert options["graceful_timeout"] == 10
+    assert options["timeout"] >= options["graceful_timeout"]
+    assert (options["max_requests"], options["max_requests_jitter"]) == (500, 50)
+    assert options["worker_class"] == f"{AppWorker.__module__}.{AppWorker.__name__}"
+
+def test_shutdown_fits_in_graceful_timeout():
+    assert shutdown_budget(30) == (25, 2.5)
+    for graceful in (1, 4, 30, 120):
+        uvicorn_timeout, drain_timeout = shutdown_budget(graceful)
+        # uvicorn's wait, then the app's drain, then as long again for the rest of shutdown
+        assert 0 < uvicorn_timeout and uvicorn_timeout + 2 * drain_timeout == graceful
+
+def test_invalid_loop_rejected():
+    with pytest.raises(SystemExit):
+        parse_args(["--loop", "trio"])
+
+def test_metrics_dir_is_emptied_before_workers_start(tmp_path, monkeypatch):
+    (tmp_path / "counter_123.db").write_bytes(b"stale")
+    monkeypatch.setenv("PROMETHEUS_MULTIPROC_DIR", str(tmp_path))
+    assert prepare_metrics_dir() == str(tmp_path)
+    assert list(tmp_path.iterdir()) == []
+
+def test_stop_signal_marks_worker_not_ready_before_uvicorn_drains():
+    state = ServerState()
+    state.ready = True
+    server = _TimedServer(Config(app=None), lambda: None, state)
+    server.handle_exit(signal.SIGTERM, None)
+    assert (state.ready, state.draining) == (False, True)
+    assert server.should_exit is True
@@ -0,0 +1,59 @@
+import logging
+import pytest
+from sqlalchemy import select, text
+
+from app.models.user_model import User
+from app.utils.server_timing import RequestProfile, ServerTimingMiddleware, _current_profile, statement_shape, timed
+from tests.conftest import AsyncTestingSessionLocal
+
+
+def test_statement_shape_ignores_parameters():
+    first = statement_shape("SELECT users.id FROM users\n WHERE users.email = $1::VARCHAR")
+    second = statement_shape("SELECT users.id FROM users WHERE users.email = $2::VARCHAR")
+    assert first == second == "SELECT users.id FROM users WHERE users.email = ?"
+    assert statement_shape("SELECT 1 WHERE id IN ($1::UUID, $2::UUID, $3::UUID)") == "SELECT 1 WHERE id IN (?)"
+
+def test_timed_outside_request_is_noop():
+    with timed("hash"):
+        pass
+
+@pytest.mark.asyncio
+async def test_server_timing_header(async_client, admin_token):
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    user_data = {"email": "timing@example.com", "password": "sS#fdasrongPassword123!", "role": "AUTHENTICATED"}
+    response = await async_client.post("/users/", json=user_data, headers=headers)
+    assert response.status_code == 201
+    timing = response.headers["server-timing"]
+    assert timing.startswith("db;dur=")
+    assert "queries" in timing and "hash;dur=" in timing and "total;dur=" in timing
+
+@pytest.mark.asyncio
+async def test_repeated_statement_logs_n_plus_one(caplog, setup_database):
+    async def endpoint(scope, receive, send):
+        async with AsyncTestingSessionLocal() as session:
+            for nickname in ("a", "b", "c"):
+                await session.execute(select(User).where(User.nickname == nickname))
+            await session.execute(text("SELECT 1"))
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"ok"})
+
+    messages = []
+    async def send(message):
+        messages.append(message)
+
+    middleware = ServerTimingMiddleware(endpoint, query_warning_threshold=3, repeated_statement_threshold=3)
+    scope = {"type": "http", "method": "GET", "path": "/profiled"}
+    with caplog.at_level(logging.WARNING, logger="app.utils.server_timing"):
+        await middleware(scope, None, send)
+    assert 'desc="4 queries' in dict(messages[0]["headers"])[b"server-timing"].decode()
+    warnings = [record.getMessage() for record in caplog.records]
+    assert any("GET /profiled issued 4 SQL statements" in message for message in warnings)
+    assert any("same statement 3 times, possible N+1" in message for message in warnings)
+    assert _current_profile.get() is None
+
+def test_no_warning_under_thresholds(caplog):
+    profile = RequestProfile()
+    profile.query_count = 2
+    profile.statements.update({"SELECT 1": 2})
+    middleware = ServerTimingMiddleware(None)
+    assert middleware.check({"method": "GET", "path": "/"}, profile) is False
@@ -0,0 +1,18 @@
+from app.dependencies import get_email_service, get_settings
+from app.services.container import ServiceContainer
+from settings.config import Settings
+
+
+def test_dependencies_return_shared_instances():
+    assert get_settings() is get_settings()
+    assert get_email_service() is get_email_service()
+
+def test_reload_updates_settings_in_place(monkeypatch):
+    container = ServiceContainer(Settings())
+    settings = container.settings
+    email_service = container.email_service
+    monkeypatch.setenv("SMTP_SERVER", "smtp.reloaded.example.com")
+    container.reload()
+    assert container.settings is settings
+    assert settings.smtp_server == "smtp.reloaded.example.com"
+    assert container.email_service is not email_service
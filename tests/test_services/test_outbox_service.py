@@ -0,0 +1,73 @@
+from builtins import Exception
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock
+import pytest
+from sqlalchemy import select
+from app.models.email_outbox_model import EmailOutbox, OutboxStatus
+from app.services.email_service import EmailService
+from app.services.outbox_service import OutboxDispatcher, outbox_backlog
+from app.services.user_service import UserService
+from app.utils.nickname_gen import generate_nickname
+from app.utils.template_manager import TemplateManager
+from tests.conftest import AsyncTestingSessionLocal
+
+pytestmark = pytest.mark.asyncio
+
+
+def make_dispatcher(email_service, **kwargs):
+    return OutboxDispatcher(AsyncTestingSessionLocal, lambda: email_service, **kwargs)
+
+async def queue_message(db_session, email="outbox@example.com"):
+    message = EmailOutbox(email_type="account_locked", recipient=email, payload={"name": "Test", "email": email})
+    db_session.add(message)
+    await db_session.commit()
+    return message
+
+async def reload(db_session, message):
+    await db_session.refresh(message)
+    return message
+
+async def test_create_user_queues_verification_email(db_session, user):
+    email_service = EmailService(template_manager=TemplateManager())
+    user_data = {
+        "nickname": generate_nickname(),
+        "email": "outbox_user@example.com",
+        "password": "ValidPassword123!",
+        "role": "AUTHENTICATED",
+    }
+    user = await UserService.create(db_session, user_data, email_service)
+    result = await db_session.execute(select(EmailOutbox).where(EmailOutbox.recipient == user.email))
+    message = result.scalars().one()
+    assert message.email_type == "email_verification"
+    assert user.verification_token in message.payload["verification_url"]
+    assert await outbox_backlog(db_session) == 1
+
+async def test_dispatch_marks_messages_sent(db_session):
+    message = await queue_message(db_session)
+    email_service = AsyncMock(spec=EmailService)
+    assert await make_dispatcher(email_service).dispatch_once() == 1
+    email_service.send_user_email.assert_awaited_once_with(message.payload, "account_locked")
+    message = await reload(db_session, message)
+    assert message.status == OutboxStatus.SENT
+    assert message.attempts == 1
+    assert await outbox_backlog(db_session) == 0
+
+async def test_dispatch_reschedules_failed_send(db_session):
+    message = await queue_message(db_session)
+    email_service = AsyncMock(spec=EmailService)
+    email_service.send_user_email.side_effect = Exception("mail server down")
+    assert await make_dispatcher(email_service, backoff_seconds=60).dispatch_once() == 1
+    message = await reload(db_session, message)
+    assert message.status == OutboxStatus.PENDING
+    assert message.last_error == "mail server down"
+    assert message.next_attempt_at > datetime.now(timezone.utc) + timedelta(seconds=50)
+    # Not due yet, so the next round claims nothing
+    assert await make_dispatcher(email_service).dispatch_once() == 0
+
+async def test_dispatch_gives_up_after_max_attempts(db_session):
+    message = await queue_message(db_session)
+    email_service = AsyncMock(spec=EmailService)
+    email_service.send_user_email.side_effect = Exception("mailbox unavailable")
+    assert await make_dispatcher(email_service, max_attempts=1).dispatch_once() == 1
+    message = await reload(db_session, message)
+    assert message.status == OutboxStatus.FAILED
@@ -0,0 +1,80 @@
+from builtins import len, next
+import os
+import pytest
+from sqlalchemy import select
+
+from app.models.user_model import User
+from app.services.container import container
+from app.utils.server_timing import RequestProfile, _current_profile
+from app.utils.slow_queries import SlowQueryRecorder, parameter_shape
+from tests.conftest import engine
+
+
+@pytest.fixture
+def recorder():
+    # A zero threshold records every statement
+    recorder = SlowQueryRecorder(threshold=0, capture_explain=True, buffer_size=3)
+    recorder.install(engine)
+    yield recorder
+    recorder.uninstall(engine)
+
+def test_parameter_shape_hides_values():
+    assert parameter_shape(("secret@example.com", 3, ["a", "b"])) == ["str", "int", "list[2]"]
+    assert parameter_shape({"email": "secret@example.com"}) == ["email: str"]
+    assert parameter_shape([("a", 1), ("b", 2)], executemany=True) == ["2 rows of (str, int)"]
+
+@pytest.mark.asyncio
+async def test_slow_query_recorded_with_plan(db_session, recorder):
+    await db_session.execute(select(User).where(User.email == "secret@example.com"))
+    await recorder.wait_for_plans()
+    entry = next(entry for entry in recorder.recent() if entry.statement.startswith("SELECT users.id"))
+    assert "secret@example.com" not in entry.statement
+    assert entry.statement.endswith("WHERE users.email = ?")
+    assert entry.parameters == ["str"]
+    assert "Scan" in entry.explain
+    assert len(recorder.entries) <= 3
+
+@pytest.mark.asyncio
+async def test_plan_cached_per_statement_shape(db_session, recorder):
+    for email in ("a@example.com", "b@example.com"):
+        await db_session.execute(select(User).where(User.email == email))
+        await recorder.wait_for_plans()
+    first, second = [entry for entry in recorder.recent() if entry.statement.startswith("SELECT users.id")][:2]
+    assert first.explain is second.explain
+
+@pytest.mark.asyncio
+async def test_slow_queries_endpoint(async_client, admin_token, user_token, monkeypatch):
+    recorder = container.slow_query_recorder
+    monkeypatch.setattr(recorder, "threshold", 0)
+    recorder.install(engine)
+    try:
+        headers = {"Authorization": f"Bearer {admin_token}"}
+        await async_client.get("/users/", headers=headers)
+        response = await async_client.get("/admin/slow-queries", headers=headers)
+        assert response.status_code == 200
+        body = response.json()
+        assert body["threshold_ms"] == 0
+        assert body["worker_pid"] == os.getpid()
+        assert any(item["statement"].startswith("SELECT") for item in body["items"])
+        response = await async_client.delete("/admin/slow-queries", headers=headers)
+        assert response.status_code == 204
+        assert not recorder.entries
+        response = await async_client.get("/admin/slow-queries", headers={"Authorization": f"Bearer {user_token}"})
+        assert response.status_code == 403
+    finally:
+        recorder.uninstall(engine)
+        await recorder.wait_for_plans()
+        recorder.clear()
+
+@pytest.mark.asyncio
+async def test_explain_not_counted_in_request_profile(db_session, recorder):
+    profile = RequestProfile()
+    token = _current_profile.set(profile)
+    try:
+        await db_session.execute(select(User).where(User.email == "secret@example.com"))
+        await recorder.wait_for_plans()
+    finally:
+        _current_profile.reset(token)
+    assert next(entry for entry in recorder.recent() if entry.statement.startswith("SELECT users.id")).explain
+    assert profile.query_count >= 1
+    assert not any(shape.startswith("EXPLAIN") for shape in profile.statements)
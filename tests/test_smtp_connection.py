@@ -0,0 +1,65 @@
+import socket
+import pytest
+from aiosmtpd.controller import Controller
+
+from app.utils.smtp_connection import SMTPClient
+
+pytestmark = pytest.mark.asyncio
+
+
+class RecordingHandler:
+    def __init__(self):
+        self.messages = []
+        self.sessions = 0
+
+    async def handle_EHLO(self, server, session, envelope, hostname, responses):
+        self.sessions += 1
+        session.host_name = hostname
+        return responses
+
+    async def handle_DATA(self, server, session, envelope):
+        self.messages.append((envelope.rcpt_tos, envelope.content))
+        return "250 Message accepted for delivery"
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture
+def smtp_server():
+    handler = RecordingHandler()
+    controller = Controller(handler, hostname="127.0.0.1", port=free_port())
+    controller.start()
+    yield controller
+    if controller.loop.is_running():
+        controller.stop()
+
+
+@pytest.fixture
+def smtp_client(smtp_server):
+    return SMTPClient(server="127.0.0.1", port=smtp_server.port, username="", password="",
+                      start_tls=False, sender="noreply@example.com")
+
+async def test_send_email_reuses_connection(smtp_server, smtp_client):
+    for index in range(3):
+        await smtp_client.send_email("Subject", f"<p>message {index}</p>", f"user{index}@example.com")
+    assert len(smtp_server.handler.messages) == 3
+    assert smtp_server.handler.messages[2][0] == ["user2@example.com"]
+    assert smtp_client.connections_opened == 1
+    await smtp_client.close()
+
+async def test_send_email_reconnects_after_server_restart(smtp_server, smtp_client):
+    await smtp_client.send_email("Subject", "<p>first</p>", "user@example.com")
+    smtp_server.stop()
+    restarted = Controller(smtp_server.handler, hostname="127.0.0.1", port=smtp_server.port)
+    restarted.start()
+    try:
+        await smtp_client.send_email("Subject", "<p>second</p>", "user@example.com")
+    finally:
+        restarted.stop()
+    assert len(smtp_server.handler.messages) == 2
+    assert smtp_client.connections_opened == 2
+    await smtp_client.close()
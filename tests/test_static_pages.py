@@ -0,0 +1,36 @@
+import gzip
+import os
+import pytest
+
+from app.utils.compression import brotli_available, negotiate_encoding
+from app.utils.static_pages import StaticPageCache
+
+
+@pytest.fixture
+def page_cache(tmp_path):
+    (tmp_path / "page.html").write_text("<html><body>" + "hello " * 200 + "</body></html>")
+    cache = StaticPageCache(tmp_path, cache_control="public, max-age=60", watch=True)
+    cache.load_all()
+    return cache
+
+def test_negotiate_encoding_prefers_first_available():
+    assert negotiate_encoding("gzip, br", ["br", "gzip", "identity"]) == "br"
+    assert negotiate_encoding("gzip;q=1.0, br;q=0.5", ["br", "gzip", "identity"]) == "gzip"
+    assert negotiate_encoding(None, ["br", "gzip", "identity"]) == "identity"
+    assert negotiate_encoding("deflate", ["br", "gzip", "identity"]) == "identity"
+    assert negotiate_encoding("*", ["gzip", "identity"]) == "gzip"
+
+def test_static_page_variants(page_cache):
+    page = page_cache.get("page.html")
+    assert gzip.decompress(page.variants["gzip"]) == page.variants["identity"]
+    assert len(set(page.etags.values())) == len(page.etags)
+    assert ("br" in page.variants) == brotli_available()
+
+def test_static_page_reloads_when_changed(page_cache, tmp_path):
+    old_etag = page_cache.get("page.html").etags["identity"]
+    path = tmp_path / "page.html"
+    path.write_text("<html>changed</html>")
+    os.utime(path, ns=(0, 0))
+    page = page_cache.get("page.html")
+    assert page.variants["identity"] == b"<html>changed</html>"
+    assert page.etags["identity"] != old_etag
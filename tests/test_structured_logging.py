@@ -0,0 +1,96 @@
+from builtins import ValueError, len, list, str
+import json
+import logging
+import queue
+import pytest
+
+from app.utils import common
+from app.utils.structured_logging import JsonFormatter, NonBlockingQueueHandler, RequestIdFilter, SamplingFilter, _request_id
+
+
+def make_record(name="app.test", level=logging.INFO, msg="hello %s", args=("world",)):
+    return logging.LogRecord(name, level, __file__, 1, msg, args, None)
+
+def test_json_formatter_includes_request_id_and_extra():
+    record = make_record()
+    token = _request_id.set("abc123")
+    try:
+        RequestIdFilter().filter(record)
+    finally:
+        _request_id.reset(token)
+    record.user_id = "42"
+    entry = json.loads(JsonFormatter().format(record))
+    assert entry["message"] == "hello world"
+    assert entry["level"] == "INFO"
+    assert entry["request_id"] == "abc123"
+    assert entry["user_id"] == "42"
+
+def test_sampling_filter_keeps_warnings():
+    sampler = SamplingFilter({"app.noisy": 0.0})
+    assert not sampler.filter(make_record("app.noisy.child"))
+    assert sampler.filter(make_record("app.noisy", level=logging.WARNING))
+    assert sampler.filter(make_record("app.quiet"))
+
+def test_queue_handler_drops_when_full():
+    handler = NonBlockingQueueHandler(queue.Queue(maxsize=1))
+    handler.handle(make_record())
+    handler.handle(make_record())
+    assert handler.dropped == 1
+    queued = handler.queue.get_nowait()
+    assert queued.msg == "hello world" and queued.args is None
+
+def test_setup_logging_writes_json_from_listener_thread(tmp_path):
+    log_file = tmp_path / "app.log"
+    config = tmp_path / "logging.conf"
+    config.write_text(f"""
+[loggers]
+keys=root
+
+[handlers]
+keys=fileHandler
+
+[formatters]
+keys=jsonFormatter
+
+[logger_root]
+level=INFO
+handlers=fileHandler
+
+[handler_fileHandler]
+class=FileHandler
+formatter=jsonFormatter
+args=({str(log_file)!r},)
+
+[formatter_jsonFormatter]
+class=app.utils.structured_logging.JsonFormatter
+""")
+    root = logging.getLogger()
+    saved_handlers, saved_level = list(root.handlers), root.level
+    try:
+        queue_handler = common.setup_logging(str(config))
+        assert root.handlers == [queue_handler]
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            logging.getLogger("app.test").exception("failed for %s", "user")
+        common.stop_logging()
+        entry = json.loads(log_file.read_text().splitlines()[-1])
+        assert entry["message"] == "failed for user"
+        assert "ValueError: boom" in entry["exception"]
+        # Records logged after the listener stopped are written directly
+        logging.getLogger("app.test").warning("late")
+        assert json.loads(log_file.read_text().splitlines()[-1])["message"] == "late"
+    finally:
+        common.stop_logging()
+        for handler in list(root.handlers):
+            root.removeHandler(handler)
+        for handler in saved_handlers:
+            root.addHandler(handler)
+        root.setLevel(saved_level)
+
+@pytest.mark.asyncio
+async def test_request_id_header(async_client):
+    response = await async_client.get("/", headers={"X-Request-ID": "req-1"})
+    assert response.headers["x-request-id"] == "req-1"
+    response = await async_client.get("/")
+    assert len(response.headers["x-request-id"]) == 32
@@ -0,0 +1,41 @@
+import os
+import pytest
+
+from app.utils.template_manager import TemplateManager
+
+
+@pytest.fixture
+def template_manager(tmp_path):
+    (tmp_path / "header.md").write_text("# Header\n")
+    (tmp_path / "footer.md").write_text("Footer text")
+    (tmp_path / "greeting.md").write_text("Hello {name},\n\n[Open]({url}) - {{literal}}\n")
+    return TemplateManager(templates_dir=tmp_path)
+
+def test_render_substitutes_and_styles(template_manager):
+    html = template_manager.render_template("greeting", name="Ada", url="http://example.com/a?b=1&c=2")
+    assert html.startswith('<div style="font-family')
+    assert '<h1 style="' in html
+    assert "Hello Ada," in html
+    assert 'href="http://example.com/a?b=1&amp;c=2"' in html
+    assert "{literal}" in html
+    assert "Footer text" in html
+
+def test_render_escapes_values(template_manager):
+    html = template_manager.render_template("greeting", name="<b>*Ada*</b>", url="#")
+    assert "&lt;b&gt;*Ada*&lt;/b&gt;" in html
+
+def test_render_missing_value_raises(template_manager):
+    with pytest.raises(KeyError):
+        template_manager.render_template("greeting", name="Ada")
+
+def test_template_compiled_once(template_manager):
+    compiled = template_manager.get_template("greeting")
+    template_manager.render_template("greeting", name="Ada", url="#")
+    assert template_manager.get_template("greeting") is compiled
+
+def test_template_recompiled_when_changed(template_manager, tmp_path):
+    template_manager.render_template("greeting", name="Ada", url="#")
+    path = tmp_path / "footer.md"
+    path.write_text("New footer")
+    os.utime(path, ns=(0, 0))
+    assert "New footer" in template_manager.render_template("greeting", name="Ada", url="#")